@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import SalesReport, ProductPerformance
+from .models import SalesReport, ProductPerformance, RollupWatermark
 
 
 @admin.register(SalesReport)
@@ -20,3 +20,11 @@ class ProductPerformanceAdmin(admin.ModelAdmin):
     list_filter = ('report_date',)
     search_fields = ('product_name', 'product_sku')
     ordering = ('-report_date', '-total_revenue')
+
+
+@admin.register(RollupWatermark)
+class RollupWatermarkAdmin(admin.ModelAdmin):
+    """Admin interface for RollupWatermark model."""
+    
+    list_display = ('name', 'value', 'updated_at')
+    readonly_fields = ('updated_at',)
@@ -0,0 +1,51 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max
+from analytics.models import RollupWatermark
+from analytics.rollup import refresh_days
+from orders.models import Order
+
+WATERMARK_NAME = 'sales_report'
+
+
+class Command(BaseCommand):
+    help = 'Recompute SalesReport rows for days whose orders changed since the last run'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Recompute every day that has orders')
+        parser.add_argument(
+            '--date', action='append', default=[], metavar='YYYY-MM-DD',
+            help='Recompute a specific day (repeatable)'
+        )
+        parser.add_argument('--chunk-days', type=int, default=31, help='Days recomputed per query')
+
+    def handle(self, *args, **options):
+        watermark, _ = RollupWatermark.objects.get_or_create(name=WATERMARK_NAME)
+
+        if options['date']:
+            try:
+                days = [date.fromisoformat(value) for value in options['date']]
+            except ValueError as exc:
+                raise CommandError(f'Invalid --date: {exc}')
+            high = None
+        else:
+            changed = Order.objects.all()
+            if not options['full'] and watermark.value is not None:
+                changed = changed.filter(updated_at__gt=watermark.value)
+            # Read the high-water mark first so changes made while we run are
+            # picked up again on the next run.
+            high = changed.aggregate(high=Max('updated_at'))['high']
+            if high is None:
+                self.stdout.write('No changed orders since the last run.')
+                return
+            days = list(changed.filter(updated_at__lte=high).dates('order_date', 'day'))
+
+        chunk = options['chunk_days']
+        for start in range(0, len(days), chunk):
+            refresh_days(days[start:start + chunk])
+
+        if high is not None:
+            watermark.value = high
+            watermark.save()
+        self.stdout.write(self.style.SUCCESS(f'Recomputed {len(days)} day(s) of sales reports.'))
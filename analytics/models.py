@@ -37,3 +37,14 @@ class ProductPerformance(models.Model):
     
     def __str__(self):
         return f"{self.product_name} - {self.report_date}"
+
+
+class RollupWatermark(models.Model):
+    """Model recording how far a rollup has processed its source rows."""
+    
+    name = models.CharField(max_length=100, unique=True)
+    value = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.name} @ {self.value}"
@@ -0,0 +1,134 @@
+"""
+Incremental materialization of SalesReport rows from orders.
+
+Each order contributes to the SalesReport of the day it was placed:
+
+- total_orders counts every order placed that day.
+- cancelled_orders and returned_orders count orders in those statuses.
+- total_revenue and total_items_sold only include orders that are neither
+  cancelled nor returned.
+- average_order_value is total_revenue divided by those same orders.
+
+Single-row saves apply a delta to the affected day. Set-based writes and the
+rollup_sales_reports command recompute whole days with grouped aggregates.
+"""
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from orders.models import Order, OrderItem
+from .models import SalesReport
+
+EXCLUDED_STATUSES = ('cancelled', 'returned')
+COUNTER_FIELDS = ('total_orders', 'total_revenue', 'total_items_sold', 'cancelled_orders', 'returned_orders')
+
+
+def is_counted(status):
+    """Return whether an order in `status` counts towards revenue and items sold."""
+    return status not in EXCLUDED_STATUSES
+
+
+def order_contribution(status, total_amount, items_sold):
+    """Return the counters a single order adds to its day."""
+    counted = is_counted(status)
+    total_amount = Decimal(str(total_amount))
+    return {
+        'total_orders': 1,
+        'total_revenue': total_amount if counted else Decimal('0'),
+        'total_items_sold': items_sold if counted else 0,
+        'cancelled_orders': int(status == 'cancelled'),
+        'returned_orders': int(status == 'returned'),
+    }
+
+
+def subtract(new, old):
+    return {field: new[field] - old[field] for field in COUNTER_FIELDS}
+
+
+def average_order_value(report):
+    net_orders = report.total_orders - report.cancelled_orders - report.returned_orders
+    if net_orders <= 0:
+        return Decimal('0.00')
+    return (Decimal(report.total_revenue) / net_orders).quantize(Decimal('0.01'))
+
+
+def apply_delta(day, delta):
+    """Add `delta` to the counters of the SalesReport for `day`."""
+    if not any(delta.values()):
+        return
+    with transaction.atomic():
+        report, _ = SalesReport.objects.select_for_update().get_or_create(date=day)
+        for field, value in delta.items():
+            setattr(report, field, getattr(report, field) + value)
+        report.average_order_value = average_order_value(report)
+        report.save(update_fields=[*COUNTER_FIELDS, 'average_order_value'])
+
+
+def day_bounds(day):
+    """Return the aware datetime range covering `day` in the current time zone."""
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, start + timedelta(days=1)
+
+
+def days_filter(days, prefix=''):
+    """Return a Q matching orders placed on any of `days`."""
+    condition = Q()
+    for day in days:
+        start, end = day_bounds(day)
+        condition |= Q(**{f'{prefix}order_date__gte': start, f'{prefix}order_date__lt': end})
+    return condition
+
+
+def refresh_days(days):
+    """
+    Recompute SalesReport rows for `days` from the orders placed on them.
+    
+    Uses one grouped aggregate over orders and one over order items. Both
+    are restricted to order_date ranges so the order date index applies.
+    """
+    days = sorted(set(days))
+    if not days:
+        return
+    
+    order_totals = (
+        Order.objects.filter(days_filter(days))
+        .annotate(day=TruncDate('order_date'))
+        .values('day')
+        .order_by()
+        .annotate(
+            total_orders=Count('id'),
+            total_revenue=Sum('total_amount', filter=~Q(status__in=EXCLUDED_STATUSES)),
+            cancelled_orders=Count('id', filter=Q(status='cancelled')),
+            returned_orders=Count('id', filter=Q(status='returned')),
+        )
+    )
+    rows = {day: {field: 0 for field in COUNTER_FIELDS} for day in days}
+    for row in order_totals:
+        day = row.pop('day')
+        rows[day].update({key: value or 0 for key, value in row.items()})
+    
+    item_totals = (
+        OrderItem.objects.filter(days_filter(days, prefix='order__'))
+        .exclude(order__status__in=EXCLUDED_STATUSES)
+        .annotate(day=TruncDate('order__order_date'))
+        .values('day')
+        .order_by()
+        .annotate(total_items_sold=Sum('quantity'))
+    )
+    for row in item_totals:
+        rows[row['day']]['total_items_sold'] = row['total_items_sold'] or 0
+    
+    reports = []
+    for day, counters in rows.items():
+        report = SalesReport(date=day, **counters)
+        report.average_order_value = average_order_value(report)
+        reports.append(report)
+    SalesReport.objects.bulk_create(
+        reports,
+        update_conflicts=True,
+        unique_fields=['date'],
+        update_fields=[*COUNTER_FIELDS, 'average_order_value'],
+    )
@@ -0,0 +1,73 @@
+from django.db.models import Sum
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from orders.models import Order, OrderItem
+from common.models import loaded_values
+from orders.signals import orders_bulk_changed
+from .rollup import apply_delta, is_counted, order_contribution, refresh_days, subtract
+
+
+# A deferred (None) value makes the save recompute the whole day instead.
+
+@receiver(post_init, sender=Order)
+def remember_order_state(sender, instance, **kwargs):
+    instance._rollup_state = loaded_values(instance, 'status', 'total_amount')
+
+
+@receiver(post_init, sender=OrderItem)
+def remember_item_quantity(sender, instance, **kwargs):
+    instance._rollup_quantity = loaded_values(instance, 'quantity')[0]
+
+
+@receiver(post_save, sender=Order)
+def apply_order_delta(sender, instance, created, **kwargs):
+    day = timezone.localdate(instance.order_date)
+    old_status, old_amount = instance._rollup_state
+    if created:
+        # Items are saved after their order and apply their own deltas.
+        apply_delta(day, order_contribution(instance.status, instance.total_amount, 0))
+    elif old_status is None or old_amount is None:
+        refresh_days([day])
+    elif (old_status, old_amount) != (instance.status, instance.total_amount):
+        items_sold = 0
+        if is_counted(old_status) != is_counted(instance.status):
+            items_sold = instance.items.aggregate(total=Sum('quantity'))['total'] or 0
+        apply_delta(day, subtract(
+            order_contribution(instance.status, instance.total_amount, items_sold),
+            order_contribution(old_status, old_amount, items_sold),
+        ))
+    instance._rollup_state = (instance.status, instance.total_amount)
+
+
+@receiver(post_delete, sender=Order)
+def remove_order_contribution(sender, instance, **kwargs):
+    # Items are deleted first and remove their own quantities.
+    day = timezone.localdate(instance.order_date)
+    contribution = order_contribution(instance.status, instance.total_amount, 0)
+    apply_delta(day, {field: -value for field, value in contribution.items()})
+
+
+@receiver(post_save, sender=OrderItem)
+def apply_item_delta(sender, instance, created, **kwargs):
+    order = instance.order
+    day = timezone.localdate(order.order_date)
+    if not created and instance._rollup_quantity is None:
+        refresh_days([day])
+    else:
+        change = instance.quantity - (0 if created else instance._rollup_quantity)
+        if change and is_counted(order.status):
+            apply_delta(day, {'total_items_sold': change})
+    instance._rollup_quantity = instance.quantity
+
+
+@receiver(post_delete, sender=OrderItem)
+def remove_item_quantity(sender, instance, **kwargs):
+    order = instance.order
+    if is_counted(order.status):
+        apply_delta(timezone.localdate(order.order_date), {'total_items_sold': -instance.quantity})
+
+
+@receiver(orders_bulk_changed)
+def refresh_changed_days(sender, days, **kwargs):
+    refresh_days(days)
@@ -1,3 +1,97 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from orders.models import Order, OrderItem
+from .models import SalesReport
+
+
+def create_order(order_id, total_amount='100.00', quantities=(1,), status='pending'):
+    order = Order.objects.create(
+        order_id=order_id,
+        customer_name='Test Customer',
+        customer_phone='9876543210',
+        customer_address='123 Main St, City',
+        total_amount=Decimal(total_amount),
+        payment_method='UPI',
+        status=status,
+    )
+    for index, quantity in enumerate(quantities):
+        OrderItem.objects.create(
+            order=order,
+            product_name=f'Product {index}',
+            product_sku=f'SKU{index:03d}',
+            quantity=quantity,
+            unit_price=Decimal('10.00'),
+            total_price=Decimal('10.00') * quantity,
+        )
+    return order
+
+
+class SalesReportRollupTests(TestCase):
+    """SalesReport rows are kept up to date from orders."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.today = timezone.localdate()
+
+    def report(self):
+        return SalesReport.objects.get(date=self.today)
+
+    def assertReport(self, **expected):
+        report = self.report()
+        for field, value in expected.items():
+            self.assertEqual(getattr(report, field), value, field)
+
+    def test_order_creation_applies_deltas(self):
+        create_order('R1', '100.00', quantities=(2, 3))
+        create_order('R2', '50.00', quantities=(1,))
+        self.assertReport(
+            total_orders=2, total_revenue=Decimal('150.00'), total_items_sold=6,
+            average_order_value=Decimal('75.00'), cancelled_orders=0,
+        )
+
+    def test_status_changes_move_revenue(self):
+        order = create_order('R1', '100.00', quantities=(2,))
+        create_order('R2', '60.00', quantities=(1,))
+        order.status = 'cancelled'
+        order.save()
+        self.assertReport(
+            total_orders=2, total_revenue=Decimal('60.00'), total_items_sold=1,
+            cancelled_orders=1, average_order_value=Decimal('60.00'),
+        )
+        order.delete()
+        self.assertReport(total_orders=1, cancelled_orders=0, total_items_sold=1)
+
+    def test_bulk_paths_refresh_changed_days(self):
+        payload = [{
+            'order_id': f'B{index}',
+            'customer_name': 'Bulk Customer',
+            'customer_phone': '9876543210',
+            'customer_address': 'Somewhere',
+            'total_amount': '20.00',
+            'payment_method': 'UPI',
+            'status': 'processing',
+            'items': [{'product_name': 'P', 'product_sku': 'SKU', 'quantity': 2,
+                       'unit_price': '10.00', 'total_price': '20.00'}],
+        } for index in range(3)]
+        self.client.post('/api/orders/bulk/', payload, format='json')
+        self.assertReport(total_orders=3, total_revenue=Decimal('60.00'), total_items_sold=6)
+
+        ids = list(Order.objects.values_list('pk', flat=True)[:1])
+        self.client.post('/api/orders/bulk_update_status/', {'status': 'cancelled', 'ids': ids}, format='json')
+        self.assertReport(total_orders=3, total_revenue=Decimal('40.00'), cancelled_orders=1)
 
-# Create your tests here.
+    def test_command_repairs_drift_from_watermark(self):
+        create_order('R1', '100.00', quantities=(1,))
+        call_command('rollup_sales_reports', stdout=StringIO())
+        # Writes that bypass both save() and the bulk signal leave the report stale.
+        Order.objects.filter(order_id='R1').update(
+            status='returned', updated_at=timezone.now()
+        )
+        self.assertReport(returned_orders=0)
+        call_command('rollup_sales_reports', stdout=StringIO())
+        self.assertReport(returned_orders=1, total_revenue=Decimal('0.00'), total_items_sold=0)
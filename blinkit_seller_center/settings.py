@@ -138,3 +138,47 @@ REST_FRAMEWORK = {
         'rest_framework.renderers.BrowsableAPIRenderer',
     ],
 }
+
+# Pending order long-poll feed (see orders/feed.py). Each waiting request
+# holds a worker for up to MAX_TIMEOUT seconds, checking every POLL_INTERVAL.
+ORDER_PENDING_FEED = {
+    'DEFAULT_TIMEOUT': 10,
+    'MAX_TIMEOUT': 25,
+    'POLL_INTERVAL': 1,
+}
+
+# Per-process SKU availability cache (see inventory/cache.py). Set
+# SHARED_CACHE to a CACHES alias to also share entries across processes.
+INVENTORY_AVAILABILITY_CACHE = {
+    'TTL': 5,
+    'MAX_ENTRIES': 100000,
+    'SHARED_CACHE': None,
+}
+
+# Low-stock alerts (see inventory/alerts.py). A SKU is alerted at most once
+# per DEBOUNCE_SECONDS; run dispatch_stock_alerts periodically to deliver
+# alerts held back by the window.
+INVENTORY_LOW_STOCK_ALERTS = {
+    'DEBOUNCE_SECONDS': 300,
+}
+
+# Binary availability snapshot served to storefront edge nodes (see
+# inventory/snapshot.py); rewrite it periodically with
+# write_availability_snapshot.
+INVENTORY_AVAILABILITY_SNAPSHOT = {
+    'PATH': BASE_DIR / 'snapshots' / 'availability.bin',
+}
+
+# Bulk product imports (see products/imports.py). Larger uploads are saved
+# to DIRECTORY and imported by run_product_imports.
+PRODUCT_IMPORTS = {
+    'INLINE_MAX_BYTES': 1024 * 1024,
+    'DIRECTORY': BASE_DIR / 'imports',
+}
+
+# Product facet counts (see products/facets.py), cached for TTL seconds per
+# filter set in the given CACHES alias.
+PRODUCT_FACETS = {
+    'TTL': 30,
+    'CACHE': 'default',
+}
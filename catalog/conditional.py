@@ -0,0 +1,65 @@
+"""
+Conditional GET for catalog listings.
+
+Before a listing query runs, two small queries over the same filtered
+queryset read the latest updated_at and the row count. The ETag hashes them
+with the request's query string and negotiated media type, and the latest
+updated_at is sent as Last-Modified. Clients that send either validator back
+get 304 Not Modified without the listing being queried or serialized.
+
+Inserts and saves move the latest updated_at; deletes change the count, so
+they are only detected through the ETag. Views list conditional_dependencies
+for related models whose changes show up in the listing. Writes that skip
+auto_now, such as queryset.update() without updated_at, are not detected.
+"""
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+class ConditionalListMixin:
+    """Adds ETag/Last-Modified validators and 304 responses to list views."""
+    
+    conditional_field = 'updated_at'
+    # Models whose latest updated_at also invalidates the listing, e.g.
+    # related rows whose fields the listing shows.
+    conditional_dependencies = []
+    
+    def list_validators(self, request, queryset):
+        """Return (etag, last_modified) for a listing of `queryset`."""
+        # Two queries rather than one aggregate: with an index on the field,
+        # the latest row is an index lookup, while MAX() next to COUNT() scans.
+        queryset = queryset.order_by()
+        count = queryset.count()
+        changes = [queryset.order_by(f'-{self.conditional_field}').values_list(
+            self.conditional_field, flat=True
+        ).first()]
+        for model in self.conditional_dependencies:
+            changes.append(model.objects.order_by('-updated_at').values_list('updated_at', flat=True).first())
+        last_modified = max(filter(None, changes), default=None)
+        key = '\n'.join([
+            request.get_full_path(),
+            getattr(request, 'accepted_media_type', '') or '',
+            *[changed.isoformat() if changed else '' for changed in changes],
+            str(count),
+        ])
+        return f'"{hashlib.blake2b(key.encode(), digest_size=16).hexdigest()}"', last_modified
+    
+    def conditional_list(self, request, queryset, respond):
+        """Return 304 if the client's copy of `queryset` is current, else respond()."""
+        etag, last_modified = self.list_validators(request, queryset)
+        # HTTP dates have one-second resolution.
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = respond()
+        response['ETag'] = etag
+        if timestamp is not None:
+            response['Last-Modified'] = http_date(timestamp)
+        return response
+    
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        respond = super().list
+        return self.conditional_list(request, queryset, lambda: respond(request, *args, **kwargs))
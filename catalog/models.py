@@ -1,7 +1,8 @@
 from django.db import models
+from common.models import NamedModelMixin
 
 
-class Category(models.Model):
+class Category(NamedModelMixin, models.Model):
     """Model representing product categories."""
     
     name = models.CharField(max_length=100, unique=True)
@@ -20,7 +21,7 @@ class Category(models.Model):
         return self.name
 
 
-class Brand(models.Model):
+class Brand(NamedModelMixin, models.Model):
     """Model representing product brands."""
     
     name = models.CharField(max_length=100, unique=True)
@@ -28,6 +29,7 @@ class Brand(models.Model):
     logo_url = models.URLField(blank=True)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['name']
@@ -32,7 +32,7 @@ class BrandSerializer(serializers.ModelSerializer):
     class Meta:
         model = Brand
         fields = '__all__'
-        read_only_fields = ('created_at',)
+        read_only_fields = ('created_at', 'updated_at')
 
 
 class BrandListSerializer(serializers.ModelSerializer):
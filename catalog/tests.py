@@ -1,3 +1,75 @@
+from decimal import Decimal
+
 from django.test import TestCase
+from products.models import Product
+from rest_framework.test import APIClient
+from .models import Brand, Category
+
+
+class ConditionalListTests(TestCase):
+    """ETag / Last-Modified validators on category and brand listings."""
+    
+    def setUp(self):
+        self.client = APIClient()
+        self.snacks = Category.objects.create(name='Snacks')
+        Category.objects.create(name='Drinks')
+        self.acme = Brand.objects.create(name='Acme')
+    
+    def test_unchanged_listing_is_not_modified(self):
+        response = self.client.get('/api/categories/')
+        self.assertEqual(response.status_code, 200)
+        with self.assertNumQueries(2):
+            again = self.client.get('/api/categories/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again['ETag'], response['ETag'])
+        
+        by_date = self.client.get('/api/categories/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(by_date.status_code, 304)
+    
+    def test_changes_and_filters_change_the_etag(self):
+        etag = self.client.get('/api/categories/')['ETag']
+        self.assertNotEqual(self.client.get('/api/categories/', {'is_active': 'true'})['ETag'], etag)
+        
+        self.snacks.description = 'Chips and more'
+        self.snacks.save()
+        response = self.client.get('/api/categories/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        
+        etag = response['ETag']
+        Category.objects.filter(name='Drinks').delete()
+        self.assertEqual(self.client.get('/api/categories/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+    
+    def test_active_brands(self):
+        response = self.client.get('/api/brands/active/')
+        self.assertEqual([brand['name'] for brand in response.data], ['Acme'])
+        self.assertEqual(
+            self.client.get('/api/brands/active/', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304
+        )
+        self.acme.is_active = False
+        self.acme.save()
+        self.assertEqual(
+            self.client.get('/api/brands/active/', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200
+        )
+
 
-# Create your tests here.
+class InUseDeleteTests(TestCase):
+    """Categories and brands still used by products cannot be deleted."""
+    
+    def setUp(self):
+        self.client = APIClient()
+        self.snacks = Category.objects.create(name='Snacks')
+        self.acme = Brand.objects.create(name='Acme')
+        Product.objects.create(
+            sku='SKU-1', name='Chips', description='Salted', price=Decimal('10.00'), mrp=Decimal('12.00'),
+            category=self.snacks, brand=self.acme, weight=Decimal('0.10'),
+        )
+    
+    def test_delete_in_use_conflicts(self):
+        for url in [f'/api/categories/{self.snacks.pk}/', f'/api/brands/{self.acme.pk}/']:
+            response = self.client.delete(url)
+            self.assertEqual(response.status_code, 409)
+            self.assertEqual((response.data['product_count'], response.data['products']), (1, ['SKU-1']))
+        self.assertTrue(Category.objects.filter(pk=self.snacks.pk).exists())
+        
+        Product.objects.all().delete()
+        self.assertEqual(self.client.delete(f'/api/categories/{self.snacks.pk}/').status_code, 204)
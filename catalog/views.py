@@ -2,6 +2,8 @@ from rest_framework import viewsets, filters, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
+from django.db.models import ProtectedError
+from .conditional import ConditionalListMixin
 from .models import Category, Brand
 from .serializers import (
     CategorySerializer, 
@@ -10,8 +12,28 @@ from .serializers import (
     BrandListSerializer
 )
 
+# Blocking products listed when a delete is refused.
+MAX_REPORTED_PRODUCTS = 20
 
-class CategoryViewSet(viewsets.ModelViewSet):
+
+class InUseDestroyMixin:
+    """Refuses to delete rows that products still reference with 409 Conflict."""
+    
+    def destroy(self, request, *args, **kwargs):
+        instance = self.get_object()
+        try:
+            self.perform_destroy(instance)
+        except ProtectedError as exc:
+            skus = sorted(product.sku for product in exc.protected_objects)
+            return Response({
+                'detail': f"Cannot delete '{instance.name}' while {len(skus)} product(s) use it.",
+                'product_count': len(skus),
+                'products': skus[:MAX_REPORTED_PRODUCTS],
+            }, status=status.HTTP_409_CONFLICT)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class CategoryViewSet(InUseDestroyMixin, ConditionalListMixin, viewsets.ModelViewSet):
     """
     ViewSet for Category CRUD operations.
     
@@ -21,7 +43,7 @@ class CategoryViewSet(viewsets.ModelViewSet):
     - GET /api/categories/{id}/ - Retrieve a category
     - PUT /api/categories/{id}/ - Update a category
     - PATCH /api/categories/{id}/ - Partial update a category
-    - DELETE /api/categories/{id}/ - Delete a category
+    - DELETE /api/categories/{id}/ - Delete a category (409 while products use it)
     - GET /api/categories/root/ - List root categories
     """
     
@@ -46,7 +68,7 @@ class CategoryViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class BrandViewSet(viewsets.ModelViewSet):
+class BrandViewSet(InUseDestroyMixin, ConditionalListMixin, viewsets.ModelViewSet):
     """
     ViewSet for Brand CRUD operations.
     
@@ -56,7 +78,7 @@ class BrandViewSet(viewsets.ModelViewSet):
     - GET /api/brands/{id}/ - Retrieve a brand
     - PUT /api/brands/{id}/ - Update a brand
     - PATCH /api/brands/{id}/ - Partial update a brand
-    - DELETE /api/brands/{id}/ - Delete a brand
+    - DELETE /api/brands/{id}/ - Delete a brand (409 while products use it)
     - GET /api/brands/active/ - List active brands
     """
     
@@ -77,5 +99,6 @@ class BrandViewSet(viewsets.ModelViewSet):
     def active(self, request):
         """Get all active brands."""
         active_brands = self.queryset.filter(is_active=True)
-        serializer = BrandListSerializer(active_brands, many=True)
-        return Response(serializer.data)
+        return self.conditional_list(
+            request, active_brands, lambda: Response(BrandListSerializer(active_brands, many=True).data)
+        )
@@ -0,0 +1,23 @@
+class NamedModelMixin:
+    """Bulk name-to-id lookups for models with a unique name."""
+    
+    @classmethod
+    def ids_for(cls, names):
+        """Return {name: id} for `names`, creating entries that don't exist yet."""
+        names = set(names)
+        ids = dict(cls.objects.filter(name__in=names).values_list('name', 'id'))
+        missing = names - ids.keys()
+        if missing:
+            cls.objects.bulk_create([cls(name=name) for name in missing], ignore_conflicts=True)
+            ids.update(cls.objects.filter(name__in=missing).values_list('name', 'id'))
+        return ids
+
+
+def loaded_values(instance, *fields):
+    """
+    Return the current values of `fields` on `instance`, None where deferred.
+    
+    Values are read from __dict__, so calling this from post_init does not
+    load deferred fields.
+    """
+    return tuple(instance.__dict__.get(field) for field in fields)
@@ -0,0 +1,71 @@
+"""
+Reading bulk uploads as records and resolving the names they contain.
+
+Stock sync and the product import both accept CSV (with a header row) or
+NDJSON and apply it in chunks. iter_records() turns the byte stream into
+(line_number, record) pairs; NameResolver turns the related-object names in a
+chunk of validated rows into foreign key ids with one lookup per model.
+"""
+import codecs
+import csv
+import json
+
+RECORD_CONTENT_TYPES = ['text/csv', 'application/x-ndjson']
+
+
+class RecordFormatError(ValueError):
+    pass
+
+
+def iter_records(stream, content_type, encoding='utf-8'):
+    """
+    Yield (line_number, record) pairs from a CSV or NDJSON byte stream.
+    
+    Empty CSV cells are left out of the record, so they read as "not
+    provided". Malformed NDJSON lines are yielded as RecordFormatError
+    instances so the caller can report them and carry on.
+    """
+    lines = codecs.iterdecode(stream, encoding)
+    if content_type == 'text/csv':
+        reader = csv.DictReader(lines)
+        for record in reader:
+            yield reader.line_num, {key: value for key, value in record.items() if value not in ('', None)}
+    else:
+        for line_number, line in enumerate(lines, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield line_number, json.loads(line)
+            except ValueError as exc:
+                yield line_number, RecordFormatError(str(exc))
+
+
+def name_of(value):
+    """Return the name in `value`, a plain name or a validated {'name': ...} relation."""
+    return value['name'] if isinstance(value, dict) else value
+
+
+class NameResolver:
+    """
+    Swaps related-object names in a chunk of rows for their ids.
+    
+    `relations` maps a row field to (model, id field); each model provides
+    ids_for(names), which creates the names it does not know yet.
+    """
+    
+    def __init__(self, relations, rows):
+        self.relations = relations
+        rows = list(rows)
+        self.ids = {
+            field: model.ids_for(name_of(row[field]) for row in rows if field in row)
+            for field, (model, _) in relations.items()
+        }
+    
+    def resolve(self, data):
+        """Return a copy of `data` with each named relation replaced by its id field."""
+        data = dict(data)
+        for field, (_, id_field) in self.relations.items():
+            if field in data:
+                data[id_field] = self.ids[field][name_of(data.pop(field))]
+        return data
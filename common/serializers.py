@@ -0,0 +1,23 @@
+class NamedRelationsMixin:
+    """
+    Writes foreign keys by name.
+    
+    `named_relations` maps a field, declared as a CharField with
+    source='<field>.name', to its model. Unknown names create the row, as the
+    free-text columns these relations replaced used to accept any value.
+    """
+    
+    named_relations = {}
+    
+    def create(self, validated_data):
+        return super().create(self.resolve_names(validated_data))
+    
+    def update(self, instance, validated_data):
+        return super().update(instance, self.resolve_names(validated_data))
+    
+    def resolve_names(self, validated_data):
+        for field, model in self.named_relations.items():
+            if field in validated_data:
+                name = validated_data.pop(field)['name']
+                validated_data[field], _ = model.objects.get_or_create(name=name)
+        return validated_data
@@ -1,13 +1,75 @@
 from django.contrib import admin
-from .models import Inventory
+from .models import Inventory, InventoryShard, StockAlert, StockCompaction, StockMovement, StockSnapshot, Warehouse
+
+
+@admin.register(Warehouse)
+class WarehouseAdmin(admin.ModelAdmin):
+    """Admin interface for Warehouse model."""
+    
+    list_display = ('name', 'created_at')
+    search_fields = ('name',)
+    readonly_fields = ('created_at',)
+
+
+class InventoryShardInline(admin.TabularInline):
+    """Read-only view of a hot SKU's stock shards."""
+    
+    model = InventoryShard
+    fields = ('index', 'available_quantity', 'reserved_quantity')
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+    
+    def has_add_permission(self, request, obj=None):
+        return False
 
 
 @admin.register(Inventory)
 class InventoryAdmin(admin.ModelAdmin):
     """Admin interface for Inventory model."""
     
-    list_display = ('product_name', 'product_sku', 'available_quantity', 'reserved_quantity', 'warehouse_location', 'is_low_stock')
-    list_filter = ('warehouse_location',)
+    list_display = ('product_name', 'product_sku', 'available_quantity', 'reserved_quantity', 'warehouse', 'shard_count', 'is_low_stock')
+    list_filter = ('warehouse',)
+    list_select_related = ('warehouse',)
     search_fields = ('product_name', 'product_sku')
     ordering = ('product_name',)
-    readonly_fields = ('updated_at',)
+    # Use the shard_inventory command to change shard_count; it respreads the stock.
+    readonly_fields = ('shard_count', 'updated_at')
+    inlines = [InventoryShardInline]
+
+
+@admin.register(StockMovement)
+class StockMovementAdmin(admin.ModelAdmin):
+    """Admin interface for StockMovement model."""
+    
+    list_display = ('product_sku', 'movement_type', 'available_delta', 'reserved_delta', 'reference', 'applied', 'compaction', 'created_at')
+    list_filter = ('movement_type', 'applied')
+    search_fields = ('product_sku', 'reference')
+    readonly_fields = ('created_at',)
+
+
+@admin.register(StockSnapshot)
+class StockSnapshotAdmin(admin.ModelAdmin):
+    """Admin interface for StockSnapshot model."""
+    
+    list_display = ('product_sku', 'available_quantity', 'reserved_quantity', 'compaction', 'taken_at')
+    search_fields = ('product_sku',)
+    ordering = ('-taken_at',)
+
+
+@admin.register(StockCompaction)
+class StockCompactionAdmin(admin.ModelAdmin):
+    """Admin interface for StockCompaction model."""
+    
+    list_display = ('id', 'movements_folded', 'skus_updated', 'created_at')
+    readonly_fields = ('created_at',)
+
+
+@admin.register(StockAlert)
+class StockAlertAdmin(admin.ModelAdmin):
+    """Admin interface for StockAlert model."""
+    
+    list_display = ('product_sku', 'direction', 'available_quantity', 'low_stock_threshold', 'state', 'created_at', 'delivered_at')
+    list_filter = ('direction', 'state')
+    search_fields = ('product_sku',)
+    readonly_fields = ('created_at', 'delivered_at')
@@ -0,0 +1,119 @@
+"""
+Low-stock threshold-crossing alerts.
+
+Write paths compare each SKU's stock before and after the write and record
+a StockAlert only when available_quantity moves across low_stock_threshold,
+so alert cost scales with the number of crossings rather than the number of
+SKUs.
+
+Recorded alerts are dispatched once the writing transaction commits. Per SKU
+only the latest pending alert is delivered. A SKU delivered less than
+DEBOUNCE_SECONDS ago is held until a later dispatch (the next crossing, or
+the dispatch_stock_alerts command), and an alert that returns a SKU to the
+state it was last delivered in is superseded, so a flapping SKU produces at
+most one alert per window.
+
+Subscribers connect to `stock_threshold_crossed`, or poll
+GET /api/inventory/alerts/ for delivered alerts.
+
+Configured through settings.INVENTORY_LOW_STOCK_ALERTS, e.g.
+    {'DEBOUNCE_SECONDS': 300}
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from django.dispatch import Signal
+from django.utils import timezone
+from .models import StockAlert
+
+logger = logging.getLogger(__name__)
+
+# Sent after delivered alerts are committed. Receivers get `alerts`, the list
+# of StockAlert rows delivered by one dispatch.
+stock_threshold_crossed = Signal()
+
+
+def debounce_window():
+    options = getattr(settings, 'INVENTORY_LOW_STOCK_ALERTS', {})
+    return timedelta(seconds=options.get('DEBOUNCE_SECONDS', 300))
+
+
+def detect_crossing(sku, before, after):
+    """
+    Return an unsaved StockAlert if the stock moved across its threshold.
+    
+    `before` and `after` are (available_quantity, low_stock_threshold) pairs.
+    """
+    was_low = before[0] <= before[1]
+    is_low = after[0] <= after[1]
+    if was_low == is_low:
+        return None
+    return StockAlert(
+        product_sku=sku,
+        direction='low' if is_low else 'recovered',
+        available_quantity=after[0],
+        low_stock_threshold=after[1],
+    )
+
+
+def record_alerts(alerts):
+    """Insert alerts and dispatch them once the current transaction commits."""
+    alerts = [alert for alert in alerts if alert is not None]
+    if not alerts:
+        return []
+    alerts = StockAlert.objects.bulk_create(alerts)
+    transaction.on_commit(dispatch_alerts)
+    return alerts
+
+
+def dispatch_alerts(now=None):
+    """
+    Deliver pending alerts, applying the debounce window per SKU.
+    
+    Returns the delivered alerts.
+    """
+    now = now or timezone.now()
+    window = debounce_window()
+    with transaction.atomic():
+        pending = list(StockAlert.objects.select_for_update().filter(state='pending').order_by('id'))
+        if not pending:
+            return []
+        latest = {alert.product_sku: alert for alert in pending}
+        last_delivered_ids = (
+            StockAlert.objects.filter(state='delivered', product_sku__in=list(latest))
+            .values('product_sku').order_by().annotate(last_id=Max('id')).values('last_id')
+        )
+        last_delivered = {
+            alert.product_sku: alert
+            for alert in StockAlert.objects.filter(id__in=last_delivered_ids)
+        }
+        
+        delivered = []
+        settled = set()
+        for sku, alert in latest.items():
+            last = last_delivered.get(sku)
+            if last is not None and now - last.delivered_at < window:
+                continue
+            settled.add(sku)
+            if last is None or last.direction != alert.direction:
+                alert.state, alert.delivered_at = 'delivered', now
+                delivered.append(alert)
+        superseded = [
+            alert.id for alert in pending
+            if alert.product_sku in settled and alert.state != 'delivered'
+        ]
+        
+        StockAlert.objects.filter(id__in=[alert.id for alert in delivered]).update(state='delivered', delivered_at=now)
+        StockAlert.objects.filter(id__in=superseded).update(state='superseded')
+        if delivered:
+            transaction.on_commit(lambda: notify(delivered))
+    return delivered
+
+
+def notify(alerts):
+    for receiver, result in stock_threshold_crossed.send_robust(sender=StockAlert, alerts=alerts):
+        if isinstance(result, Exception):
+            logger.error('Stock alert receiver %r failed', receiver, exc_info=result)
@@ -0,0 +1,122 @@
+"""
+Read-through cache of SKU availability.
+
+Entries live in a per-process LRU with a TTL and, optionally, in the shared
+Django cache. Every write path invalidates the affected SKUs once its
+transaction commits. Other processes see a change after at most one TTL, or
+immediately when the shared cache is enabled and their local entry has
+expired.
+
+Configured through settings.INVENTORY_AVAILABILITY_CACHE, e.g.
+    {'TTL': 5, 'MAX_ENTRIES': 100000, 'SHARED_CACHE': 'default'}
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from .models import Inventory
+
+SHARED_KEY_PREFIX = 'inventory:availability:'
+
+
+class AvailabilityCache:
+    
+    def __init__(self, ttl=5, max_entries=100000, shared_cache=None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.shared_cache = shared_cache
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def from_settings(cls):
+        options = getattr(settings, 'INVENTORY_AVAILABILITY_CACHE', {})
+        return cls(
+            ttl=options.get('TTL', 5),
+            max_entries=options.get('MAX_ENTRIES', 100000),
+            shared_cache=options.get('SHARED_CACHE'),
+        )
+    
+    def _shared(self):
+        return caches[self.shared_cache] if self.shared_cache else None
+    
+    def get_many(self, skus):
+        """
+        Return {sku: available_quantity} for `skus`, None for unknown SKUs.
+        
+        Local hits are served from memory; misses go to the shared cache
+        and then to the database in a single query.
+        """
+        skus = list(dict.fromkeys(skus))
+        found = {}
+        misses = []
+        now = time.monotonic()
+        with self._lock:
+            for sku in skus:
+                entry = self._entries.get(sku)
+                if entry is not None and entry[0] > now:
+                    self._entries.move_to_end(sku)
+                    found[sku] = entry[1]
+                else:
+                    misses.append(sku)
+        
+        shared = self._shared()
+        if misses and shared is not None:
+            keys = {SHARED_KEY_PREFIX + sku: sku for sku in misses}
+            shared_hits = {keys[key]: value for key, value in shared.get_many(list(keys)).items()}
+            self._store(shared_hits)
+            found.update(shared_hits)
+            misses = [sku for sku in misses if sku not in shared_hits]
+        
+        if misses:
+            # Unknown SKUs are cached as None so repeated misses stay off the database.
+            loaded = dict.fromkeys(misses)
+            loaded.update(
+                Inventory.objects.filter(product_sku__in=misses).with_totals()
+                .values_list('product_sku', 'total_available')
+            )
+            if shared is not None:
+                shared.set_many(
+                    {SHARED_KEY_PREFIX + sku: value for sku, value in loaded.items()},
+                    timeout=self.ttl,
+                )
+            self._store(loaded)
+            found.update(loaded)
+        
+        return {sku: found[sku] for sku in skus}
+    
+    def get(self, sku):
+        return self.get_many([sku])[sku]
+    
+    def _store(self, values):
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            for sku, value in values.items():
+                self._entries[sku] = (expires_at, value)
+                self._entries.move_to_end(sku)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def invalidate(self, skus):
+        skus = list(skus)
+        with self._lock:
+            for sku in skus:
+                self._entries.pop(sku, None)
+        shared = self._shared()
+        if shared is not None and skus:
+            shared.delete_many([SHARED_KEY_PREFIX + sku for sku in skus])
+    
+    def invalidate_on_commit(self, skus):
+        """Invalidate `skus` once the current transaction commits."""
+        skus = list(skus)
+        transaction.on_commit(lambda: self.invalidate(skus))
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+availability_cache = AvailabilityCache.from_settings()
@@ -0,0 +1,13 @@
+from django_filters import rest_framework as filters
+from .models import Inventory
+
+
+class InventoryFilter(filters.FilterSet):
+    """Filters for inventory listings by warehouse id or name."""
+    
+    # ?warehouse_location=<name> keeps working now that warehouses are rows.
+    warehouse_location = filters.CharFilter(field_name='warehouse__name')
+    
+    class Meta:
+        model = Inventory
+        fields = ['warehouse', 'warehouse_location']
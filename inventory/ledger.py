@@ -0,0 +1,225 @@
+"""
+Stock movement ledger.
+
+Every change to a SKU's stock is recorded as a StockMovement. Receipts and
+positive adjustments posted to the ledger are only INSERTed; a periodic
+compaction folds them into the Inventory rows. Everything else changes
+Inventory at write time and records an applied movement alongside it:
+reservations, releases, commits and negative adjustments go through the
+guarded stock operations (see stock.py), so they cannot take stock below
+zero, and absolute writes (saves, sync) record the difference they made.
+
+Compaction stamps the movements it covers with its StockCompaction and
+writes a StockSnapshot per SKU. The stock level at any moment is the
+nearest earlier snapshot plus the movements compacted after it or not yet
+compacted, up to that moment.
+"""
+from itertools import groupby
+
+from django.db import transaction
+from django.db.models import F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from .alerts import detect_crossing, record_alerts
+from .cache import availability_cache
+from .models import Inventory, StockCompaction, StockMovement, StockSnapshot
+from .stock import apply_stock_operation
+
+COMPACTION_CHUNK_SIZE = 1000
+
+# movement type -> (available sign, reserved sign) applied to the quantity
+MOVEMENT_DELTAS = {
+    'receipt': (1, 0),
+    'reservation': (-1, 1),
+    'release': (1, -1),
+    'commit': (0, -1),
+    'adjustment': (1, 0),
+}
+
+# Movements that take stock away, with the stock operation that applies them.
+GUARDED_MOVEMENTS = {
+    'reservation': 'reserve',
+    'release': 'release',
+    'commit': 'commit',
+    'adjustment': 'deduct',
+}
+
+
+def build_movement(sku, movement_type, quantity, reference='', applied=False):
+    """Return an unsaved StockMovement; adjustments take a signed quantity."""
+    available_sign, reserved_sign = MOVEMENT_DELTAS[movement_type]
+    return StockMovement(
+        product_sku=sku,
+        movement_type=movement_type,
+        available_delta=available_sign * quantity,
+        reserved_delta=reserved_sign * quantity,
+        reference=reference,
+        applied=applied,
+    )
+
+
+def record_movements(movements):
+    """Append movements with a single INSERT."""
+    return StockMovement.objects.bulk_create(movements)
+
+
+def guarded_operation(line):
+    """Return the stock operation that must apply `line` at write time, or None to defer it."""
+    if line['movement_type'] == 'adjustment' and line['quantity'] > 0:
+        return None
+    return GUARDED_MOVEMENTS.get(line['movement_type'])
+
+
+def post_movements(lines):
+    """
+    Record a batch of ledger lines in order, all or nothing.
+    
+    Consecutive lines that take stock away are applied per operation with
+    apply_stock_operation(); the rest are appended for compaction. Returns
+    (applied, results), where results lists the guarded lines' outcomes.
+    """
+    results = []
+    with transaction.atomic():
+        for operation, run in groupby(lines, key=guarded_operation):
+            if operation is None:
+                continue
+            run = [{'sku': line['sku'], 'quantity': abs(line['quantity'])} for line in run]
+            applied, run_results = apply_stock_operation(operation, run, record=False)
+            results.extend({**result, 'operation': operation} for result in run_results)
+            if not applied:
+                transaction.set_rollback(True)
+                return False, results
+        record_movements([
+            build_movement(
+                line['sku'], line['movement_type'], line['quantity'], line['reference'],
+                applied=guarded_operation(line) is not None,
+            )
+            for line in lines
+        ])
+    return True, results
+
+
+def sum_deltas(movements):
+    totals = movements.aggregate(available=Sum('available_delta'), reserved=Sum('reserved_delta'))
+    return totals['available'] or 0, totals['reserved'] or 0
+
+
+def delta_total(movements, field):
+    """Subquery summing `field` over `movements` of the outer row's SKU."""
+    return Coalesce(Subquery(
+        movements.filter(product_sku=OuterRef('product_sku'))
+        .order_by().values('product_sku').annotate(total=Sum(field)).values('total')
+    ), 0)
+
+
+def compact(chunk_size=COMPACTION_CHUNK_SIZE):
+    """
+    Fold the movements not yet compacted into inventory and snapshots.
+    
+    The SKUs' Inventory rows are locked before the run is numbered, so
+    writers that apply movements wait for it and, per SKU, compaction ids
+    follow commit order. Each chunk then stamps its SKUs' uncompacted
+    movements with the run, adds the unapplied deltas to Inventory with
+    bulk_update and writes a snapshot per SKU. Movements committed meanwhile
+    stay uncompacted for the next run. Returns the StockCompaction row, or
+    None when there was nothing to fold.
+    """
+    with transaction.atomic():
+        skus = sorted(
+            StockMovement.objects.filter(compaction__isnull=True).order_by()
+            .values_list('product_sku', flat=True).distinct()
+        )
+        if not skus:
+            return None
+        chunks = [skus[start:start + chunk_size] for start in range(0, len(skus), chunk_size)]
+        for chunk in chunks:
+            list(Inventory.objects.select_for_update().filter(product_sku__in=chunk).order_by('product_sku').values_list('pk'))
+        compaction = StockCompaction.objects.create()
+        
+        for chunk in chunks:
+            compaction.movements_folded += StockMovement.objects.filter(
+                compaction__isnull=True, product_sku__in=chunk
+            ).update(compaction=compaction)
+            taken_at = timezone.now()
+            totals = {
+                row['product_sku']: (row['available'], row['reserved'])
+                for row in StockMovement.objects.filter(compaction=compaction, applied=False, product_sku__in=chunk)
+                .values('product_sku').order_by().annotate(available=Sum('available_delta'), reserved=Sum('reserved_delta'))
+            }
+            items = list(
+                Inventory.objects.filter(product_sku__in=chunk)
+                .only('id', 'product_sku', 'available_quantity', 'reserved_quantity', 'low_stock_threshold', 'shard_count')
+                .with_totals()
+            )
+            changed = []
+            alerts = []
+            for item in items:
+                if item.product_sku not in totals:
+                    continue
+                available, reserved = totals[item.product_sku]
+                alerts.append(detect_crossing(
+                    item.product_sku,
+                    (item.total_available, item.low_stock_threshold),
+                    (item.total_available + available, item.low_stock_threshold),
+                ))
+                # Sharded SKUs take the deltas on their Inventory columns.
+                item.available_quantity += available
+                item.reserved_quantity += reserved
+                item.total_available += available
+                item.total_reserved += reserved
+                item.updated_at = taken_at
+                changed.append(item)
+            Inventory.objects.bulk_update(changed, ['available_quantity', 'reserved_quantity', 'updated_at'])
+            StockSnapshot.objects.bulk_create([
+                StockSnapshot(
+                    product_sku=item.product_sku,
+                    available_quantity=item.total_available,
+                    reserved_quantity=item.total_reserved,
+                    compaction=compaction,
+                    taken_at=taken_at,
+                )
+                for item in items
+            ])
+            availability_cache.invalidate_on_commit(item.product_sku for item in changed)
+            record_alerts(alerts)
+            compaction.skus_updated += len(items)
+        
+        compaction.save(update_fields=['movements_folded', 'skus_updated'])
+        return compaction
+
+
+def level_at(sku, at=None):
+    """
+    Return (available, reserved) for `sku` at time `at` (default: now).
+    
+    Starts from the latest snapshot taken at or before `at` and adds the
+    movements up to `at` that it does not include. Without such a snapshot,
+    starts from the current level and subtracts the movements recorded
+    after `at`.
+    """
+    movements = StockMovement.objects.filter(product_sku=sku)
+    if at is not None:
+        snapshot = (
+            StockSnapshot.objects.filter(product_sku=sku, taken_at__lte=at)
+            .order_by('-compaction_id')
+            .first()
+        )
+        if snapshot is not None:
+            available, reserved = sum_deltas(movements.filter(
+                Q(compaction__isnull=True) | Q(compaction_id__gt=snapshot.compaction_id),
+                created_at__lte=at,
+            ))
+            return snapshot.available_quantity + available, snapshot.reserved_quantity + reserved
+    
+    # One statement, so a compaction cannot move deltas between the parts.
+    unfolded = StockMovement.objects.filter(compaction__isnull=True, applied=False)
+    level = {
+        field: F(f'total_{field}') + delta_total(unfolded, f'{field}_delta')
+        for field in ['available', 'reserved']
+    }
+    if at is not None:
+        later = StockMovement.objects.filter(created_at__gt=at)
+        level = {field: value - delta_total(later, f'{field}_delta') for field, value in level.items()}
+    return Inventory.objects.with_totals().annotate(
+        level_available=level['available'], level_reserved=level['reserved'],
+    ).values_list('level_available', 'level_reserved').get(product_sku=sku)
@@ -0,0 +1,102 @@
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection, transaction
+from inventory.models import Inventory, InventoryShard, StockAlert, Warehouse
+from inventory.shards import set_shard_count
+from inventory.stock import apply_stock_operation
+
+BENCH_SKU = 'BENCH-HOT-SKU'
+BENCH_WAREHOUSE = 'Benchmark Warehouse'
+
+
+class Command(BaseCommand):
+    help = 'Benchmark concurrent reservations on one hot SKU, with and without sharded counters'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=16, help='Concurrent reserving threads')
+        parser.add_argument('--reservations', type=int, default=2000, help='Reservations per run')
+        parser.add_argument('--shards', type=int, default=16, help='Shards for the sharded run')
+        parser.add_argument(
+            '--hold-ms', type=float, default=2.0,
+            help='Time each reservation transaction stays open, as in a checkout that also writes the order'
+        )
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.stdout.write(f'Database backend: {connection.vendor}')
+        if connection.vendor == 'sqlite':
+            self.stdout.write(self.style.WARNING(
+                'SQLite allows one writer for the whole database, so sharding cannot reduce '
+                'contention there; run against a row-locking backend to see the gain.'
+            ))
+        try:
+            self.seed()
+            results = {'single row': self.run(0), f'{options["shards"]} shards': self.run(options['shards'])}
+        finally:
+            self.cleanup()
+
+        self.stdout.write(self.style.MIGRATE_HEADING('Summary'))
+        baseline = results['single row'][0]
+        for label, (throughput, retries) in results.items():
+            self.stdout.write(
+                f'  {label:<12} {throughput:>9.0f} reservations/s  ({throughput / baseline:.2f}x, {retries} retries)'
+            )
+
+    def seed(self):
+        warehouse, _ = Warehouse.objects.get_or_create(name=BENCH_WAREHOUSE)
+        Inventory.objects.create(
+            product_sku=BENCH_SKU,
+            product_name='Benchmark hot SKU',
+            warehouse=warehouse,
+            available_quantity=self.options['reservations'] * 10,
+            low_stock_threshold=0,
+        )
+
+    def run(self, shard_count):
+        label = f'{shard_count} shards' if shard_count else 'single row'
+        self.stdout.write(self.style.MIGRATE_HEADING(f'Reserving on {label}'))
+        set_shard_count(BENCH_SKU, shard_count)
+        remaining = [self.options['reservations']]
+        retries = [0]
+        lock = threading.Lock()
+        hold = self.options['hold_ms'] / 1000
+
+        def worker():
+            try:
+                while True:
+                    with lock:
+                        if remaining[0] <= 0:
+                            return
+                        remaining[0] -= 1
+                    while True:
+                        try:
+                            with transaction.atomic():
+                                apply_stock_operation('reserve', [{'sku': BENCH_SKU, 'quantity': 1}])
+                                time.sleep(hold)
+                            break
+                        except OperationalError:
+                            # SQLite reports a busy database instead of waiting for a row lock.
+                            with lock:
+                                retries[0] += 1
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(self.options['workers'])]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        throughput = self.options['reservations'] / elapsed
+        self.stdout.write(f'  {self.options["reservations"]} reservations in {elapsed:.2f}s')
+        return throughput, retries[0]
+
+    def cleanup(self):
+        InventoryShard.objects.filter(inventory__product_sku=BENCH_SKU).delete()
+        Inventory.objects.filter(product_sku=BENCH_SKU).delete()
+        Warehouse.objects.filter(name=BENCH_WAREHOUSE).delete()
+        StockAlert.objects.filter(product_sku=BENCH_SKU).delete()
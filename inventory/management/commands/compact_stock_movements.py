@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from inventory.ledger import COMPACTION_CHUNK_SIZE, compact
+
+
+class Command(BaseCommand):
+    help = 'Fold stock movements not yet compacted into inventory and snapshots'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=COMPACTION_CHUNK_SIZE, help='SKUs updated per statement')
+
+    def handle(self, *args, **options):
+        compaction = compact(chunk_size=options['chunk_size'])
+        if compaction is None:
+            self.stdout.write('No new stock movements.')
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f'{compaction} folded {compaction.movements_folded} movement(s) into {compaction.skus_updated} SKU(s).'
+        ))
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from inventory.alerts import dispatch_alerts
+
+
+class Command(BaseCommand):
+    help = 'Deliver low-stock alerts held back by the debounce window'
+
+    def handle(self, *args, **options):
+        delivered = dispatch_alerts()
+        self.stdout.write(self.style.SUCCESS(f'Delivered {len(delivered)} alert(s).'))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+from inventory.models import Inventory
+from inventory.shards import set_shard_count
+
+
+class Command(BaseCommand):
+    help = 'Split hot SKUs into sharded stock counters, or fold them back with --shards 0'
+
+    def add_arguments(self, parser):
+        parser.add_argument('skus', nargs='+', help='Product SKUs to reshard')
+        parser.add_argument('--shards', type=int, default=8, help='Number of shards (0 disables sharding)')
+
+    def handle(self, *args, **options):
+        shard_count = options['shards']
+        if not 0 <= shard_count <= 256:
+            raise CommandError('--shards must be between 0 and 256.')
+        for sku in options['skus']:
+            try:
+                totals = set_shard_count(sku, shard_count)
+            except Inventory.DoesNotExist:
+                raise CommandError(f'Unknown SKU: {sku}')
+            self.stdout.write(self.style.SUCCESS(
+                f'{sku}: {shard_count} shard(s), available {totals["available_quantity"]}, '
+                f'reserved {totals["reserved_quantity"]}'
+            ))
@@ -0,0 +1,138 @@
+import multiprocessing
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from inventory.models import Inventory, InventoryShard, StockAlert, Warehouse
+from inventory.stress import RESERVE, RESTOCK, percentile, run_worker
+
+STRESS_WAREHOUSE = 'Stress Test Warehouse'
+
+
+class Command(BaseCommand):
+    help = 'Stress stock updates from several processes and check the final quantities'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help='Worker processes')
+        parser.add_argument('--operations', type=int, default=500, help='Requests per worker')
+        parser.add_argument('--hot-skus', type=int, default=2, help='SKUs shared by all workers')
+        parser.add_argument('--own-skus', type=int, default=2, help='SKUs private to each worker')
+        parser.add_argument('--hot-ratio', type=float, default=0.5, help='Share of requests on shared SKUs')
+        parser.add_argument('--restock-ratio', type=float, default=0.3, help='Share of requests that restock')
+        parser.add_argument('--initial', type=int, default=100_000, help='Starting available quantity per SKU')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1 or options['operations'] < 1:
+            raise CommandError('--workers and --operations must be positive.')
+        options['prefix'] = 'STRESS-'
+        self.options = options
+        try:
+            skus = self.seed()
+            outcomes, elapsed = self.run_workers(skus)
+            self.report(outcomes, elapsed)
+            self.check_consistency(outcomes)
+        finally:
+            self.cleanup()
+
+    def seed(self):
+        warehouse, _ = Warehouse.objects.get_or_create(name=STRESS_WAREHOUSE)
+        prefix = self.options['prefix']
+        names = [f'{prefix}HOT-{index}' for index in range(self.options['hot_skus'])]
+        names += [
+            f'{prefix}W{worker}-{index}'
+            for worker in range(self.options['workers'])
+            for index in range(self.options['own_skus'])
+        ]
+        Inventory.objects.bulk_create([
+            Inventory(
+                product_sku=sku, product_name=sku, warehouse=warehouse,
+                available_quantity=self.options['initial'], low_stock_threshold=0,
+            )
+            for sku in names
+        ])
+        return dict(Inventory.objects.filter(product_sku__in=names).values_list('product_sku', 'id'))
+
+    def run_workers(self, skus):
+        context = multiprocessing.get_context('spawn')
+        barrier = context.Barrier(self.options['workers'] + 1)
+        results = context.Queue()
+        worker_options = {
+            key: self.options[key]
+            for key in ('operations', 'hot_ratio', 'restock_ratio', 'seed', 'prefix')
+        }
+        # Connections must not be shared with the worker processes.
+        connections.close_all()
+        processes = [
+            context.Process(target=run_worker, args=(worker_id, worker_options, skus, barrier, results))
+            for worker_id in range(self.options['workers'])
+        ]
+        for process in processes:
+            process.start()
+        self.stdout.write(f'Started {len(processes)} worker processes...')
+        barrier.wait()
+        started = time.time()
+        outcomes = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+        return outcomes, max(outcome['finished'] for outcome in outcomes) - started
+
+    def report(self, outcomes, elapsed):
+        total = sum(
+            len(outcome['stats'][kind]['latencies']) for outcome in outcomes for kind in (RESERVE, RESTOCK)
+        )
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'{total} requests from {len(outcomes)} workers in {elapsed:.2f}s ({total / elapsed:.0f} requests/s)'
+        ))
+        self.stdout.write(
+            f'  {"":<8} {"count":>7} {"p50 ms":>8} {"p99 ms":>8} {"ok":>7} {"rejected":>9} {"locked":>7} {"errors":>7}'
+        )
+        for kind in (RESERVE, RESTOCK):
+            latencies = [value for outcome in outcomes for value in outcome['stats'][kind]['latencies']]
+            counts = {
+                key: sum(outcome['stats'][kind][key] for outcome in outcomes)
+                for key in ('ok', 'rejected', 'locked', 'errors')
+            }
+            self.stdout.write(
+                f'  {kind:<8} {len(latencies):>7} {percentile(latencies, 0.5) * 1000:>8.1f} '
+                f'{percentile(latencies, 0.99) * 1000:>8.1f} {counts["ok"]:>7} {counts["rejected"]:>9} '
+                f'{counts["locked"]:>7} {counts["errors"]:>7}'
+            )
+        self.stdout.write(
+            '  rejected: reservation without enough stock; locked: "database is locked" or lock timeout'
+        )
+
+    def check_consistency(self, outcomes):
+        """Compare final quantities with the initial stock plus every acknowledged change."""
+        expected = {}
+        for outcome in outcomes:
+            for sku, (available, reserved) in outcome['applied'].items():
+                totals = expected.setdefault(sku, [self.options['initial'], 0])
+                totals[0] += available
+                totals[1] += reserved
+        final = {
+            sku: (available, reserved)
+            for sku, available, reserved in Inventory.objects.filter(product_sku__in=list(expected))
+            .with_totals().values_list('product_sku', 'total_available', 'total_reserved')
+        }
+        drifted = {sku: (tuple(values), final[sku]) for sku, values in expected.items() if tuple(values) != final[sku]}
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS(f'Consistent: {len(expected)} SKUs match every acknowledged change.'))
+            return
+        self.stdout.write(self.style.ERROR(f'Inconsistent: {len(drifted)} of {len(expected)} SKUs drifted.'))
+        for sku, ((available, reserved), (final_available, final_reserved)) in sorted(drifted.items()):
+            self.stdout.write(
+                f'  {sku:<20} available {final_available} (expected {available}), '
+                f'reserved {final_reserved} (expected {reserved})'
+            )
+        self.stdout.write(
+            '  Restocks read the level and write it back with update_stock, so a write '
+            'between the read and the write is lost.'
+        )
+
+    def cleanup(self):
+        prefix = self.options['prefix']
+        InventoryShard.objects.filter(inventory__product_sku__startswith=prefix).delete()
+        Inventory.objects.filter(product_sku__startswith=prefix).delete()
+        StockAlert.objects.filter(product_sku__startswith=prefix).delete()
+        Warehouse.objects.filter(name=STRESS_WAREHOUSE).delete()
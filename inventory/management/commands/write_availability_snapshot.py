@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from inventory.snapshot import snapshot_path, write_snapshot
+
+
+class Command(BaseCommand):
+    help = 'Write the binary SKU availability snapshot served at /api/inventory/snapshot/'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', help='Output file (defaults to INVENTORY_AVAILABILITY_SNAPSHOT["PATH"])')
+
+    def handle(self, *args, **options):
+        path = options['path'] or snapshot_path()
+        header = write_snapshot(path)
+        self.stdout.write(self.style.SUCCESS(
+            f'Snapshot {header["version"]:016x}: {header["sku_count"]} SKU(s) in '
+            f'{header["warehouse_count"]} warehouse(s) at {path}'
+        ))
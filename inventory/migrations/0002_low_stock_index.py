@@ -0,0 +1,17 @@
+# Generated by Django 6.0 on 2026-10-18 15:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inventory',
+            index=models.Index(condition=models.Q(('available_quantity__lte', models.F('low_stock_threshold'))), fields=['warehouse_location', 'product_name'], name='inventory_low_stock_idx'),
+        ),
+    ]
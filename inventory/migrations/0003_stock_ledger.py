@@ -0,0 +1,59 @@
+# Generated by Django 6.0 on 2026-10-18 15:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0002_low_stock_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockCompaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('movements_folded', models.IntegerField(default=0)),
+                ('skus_updated', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='StockMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('product_sku', models.CharField(max_length=100)),
+                ('movement_type', models.CharField(choices=[('receipt', 'Receipt'), ('reservation', 'Reservation'), ('release', 'Release'), ('commit', 'Commit'), ('adjustment', 'Adjustment')], max_length=20)),
+                ('available_delta', models.IntegerField(default=0)),
+                ('reserved_delta', models.IntegerField(default=0)),
+                ('reference', models.CharField(blank=True, max_length=100)),
+                ('applied', models.BooleanField(default=False)),
+                ('compaction', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='movements', to='inventory.stockcompaction')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['product_sku', 'created_at'], name='movement_sku_created_idx'), models.Index(condition=models.Q(('compaction__isnull', True)), fields=['product_sku'], name='movement_uncompacted_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='StockSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('product_sku', models.CharField(max_length=100)),
+                ('available_quantity', models.IntegerField()),
+                ('reserved_quantity', models.IntegerField()),
+                ('compaction', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='inventory.stockcompaction')),
+                ('taken_at', models.DateTimeField()),
+            ],
+            options={
+                'ordering': ['-taken_at'],
+                'indexes': [models.Index(fields=['product_sku', '-compaction'], name='snapshot_sku_compaction_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 6.0 on 2026-10-18 16:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_warehouses(apps, schema_editor):
+    Inventory = apps.get_model('inventory', 'Inventory')
+    Warehouse = apps.get_model('inventory', 'Warehouse')
+    names = Inventory.objects.order_by().values_list('warehouse_location', flat=True).distinct()
+    Warehouse.objects.bulk_create([Warehouse(name=name) for name in names], ignore_conflicts=True)
+    Inventory.objects.update(warehouse=Subquery(
+        Warehouse.objects.filter(name=OuterRef('warehouse_location')).values('id')[:1]
+    ))
+
+
+def restore_warehouse_locations(apps, schema_editor):
+    Inventory = apps.get_model('inventory', 'Inventory')
+    Warehouse = apps.get_model('inventory', 'Warehouse')
+    Inventory.objects.update(warehouse_location=Subquery(
+        Warehouse.objects.filter(id=OuterRef('warehouse_id')).values('name')[:1]
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0003_stock_ledger'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Warehouse',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='inventory',
+            name='warehouse',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='inventory_items', to='inventory.warehouse'),
+        ),
+        migrations.RunPython(backfill_warehouses, restore_warehouse_locations),
+        # A default lets the column be re-added before it is restored on reverse.
+        migrations.AlterField(
+            model_name='inventory',
+            name='warehouse_location',
+            field=models.CharField(default='', max_length=255),
+        ),
+        migrations.RemoveIndex(
+            model_name='inventory',
+            name='inventory_low_stock_idx',
+        ),
+        migrations.RemoveField(
+            model_name='inventory',
+            name='warehouse_location',
+        ),
+        migrations.AlterField(
+            model_name='inventory',
+            name='warehouse',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='inventory_items', to='inventory.warehouse'),
+        ),
+        migrations.AddIndex(
+            model_name='inventory',
+            index=models.Index(fields=['warehouse', 'product_sku'], name='inventory_warehouse_sku_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inventory',
+            index=models.Index(condition=models.Q(('available_quantity__lte', models.F('low_stock_threshold'))), fields=['warehouse', 'product_name'], name='inventory_low_stock_idx'),
+        ),
+    ]
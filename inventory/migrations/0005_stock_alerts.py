@@ -0,0 +1,30 @@
+# Generated by Django 6.0 on 2026-10-18 15:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0004_warehouse'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockAlert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('product_sku', models.CharField(max_length=100)),
+                ('direction', models.CharField(choices=[('low', 'Dropped to low stock'), ('recovered', 'Recovered from low stock')], max_length=20)),
+                ('available_quantity', models.IntegerField()),
+                ('low_stock_threshold', models.IntegerField()),
+                ('state', models.CharField(choices=[('pending', 'Pending'), ('delivered', 'Delivered'), ('superseded', 'Superseded')], default='pending', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('delivered_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['state', 'id'], name='alert_state_id_idx'), models.Index(fields=['product_sku', 'state'], name='alert_sku_state_idx')],
+            },
+        ),
+    ]
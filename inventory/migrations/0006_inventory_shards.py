@@ -0,0 +1,33 @@
+# Generated by Django 6.0 on 2026-10-18 16:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0005_stock_alerts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inventory',
+            name='shard_count',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='InventoryShard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('index', models.PositiveSmallIntegerField()),
+                ('available_quantity', models.IntegerField(default=0)),
+                ('reserved_quantity', models.IntegerField(default=0)),
+                ('inventory', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='shards', to='inventory.inventory')),
+            ],
+            options={
+                'ordering': ['inventory', 'index'],
+                'constraints': [models.UniqueConstraint(fields=('inventory', 'index'), name='inventory_shard_unique')],
+            },
+        ),
+    ]
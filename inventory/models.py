@@ -1,4 +1,49 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Coalesce
+from common.models import NamedModelMixin
+
+STOCK_FIELDS = ['available_quantity', 'reserved_quantity']
+
+
+class Warehouse(NamedModelMixin, models.Model):
+    """Model representing a warehouse that holds inventory."""
+    
+    name = models.CharField(max_length=255, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['name']
+    
+    def __str__(self):
+        return self.name
+
+
+def stock_total(field, prefix=''):
+    """
+    Expression for an Inventory stock field including its shards.
+    
+    `prefix` is the lookup path to the Inventory row, e.g. 'inventory_items__'.
+    The shard subquery only runs for rows with shard_count > 0.
+    """
+    column = models.F(f'{prefix}{field}')
+    shard_sum = models.Subquery(
+        InventoryShard.objects.filter(inventory=models.OuterRef(f'{prefix}pk'))
+        .order_by().values('inventory').annotate(total=models.Sum(field)).values('total')
+    )
+    return models.Case(
+        models.When(**{f'{prefix}shard_count': 0}, then=column),
+        default=column + Coalesce(shard_sum, 0),
+    )
+
+
+class InventoryQuerySet(models.QuerySet):
+    
+    def with_totals(self):
+        """Annotate total_available and total_reserved, including shards."""
+        return self.annotate(
+            total_available=stock_total('available_quantity'),
+            total_reserved=stock_total('reserved_quantity'),
+        )
 
 
 class Inventory(models.Model):
@@ -8,18 +53,193 @@ class Inventory(models.Model):
     product_name = models.CharField(max_length=255)
     available_quantity = models.IntegerField(default=0)
     reserved_quantity = models.IntegerField(default=0)
-    warehouse_location = models.CharField(max_length=255)
+    warehouse = models.ForeignKey(Warehouse, on_delete=models.PROTECT, related_name='inventory_items')
     low_stock_threshold = models.IntegerField(default=10)
     last_restocked = models.DateTimeField(null=True, blank=True)
+    # Hot SKUs keep their stock split across this many InventoryShard rows.
+    shard_count = models.PositiveSmallIntegerField(default=0)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = InventoryQuerySet.as_manager()
+    
     class Meta:
         verbose_name_plural = "Inventories"
         ordering = ['product_name']
+        indexes = [
+            models.Index(fields=['warehouse', 'product_sku'], name='inventory_warehouse_sku_idx'),
+            # Partial index holding only low-stock rows.
+            models.Index(
+                fields=['warehouse', 'product_name'],
+                condition=models.Q(available_quantity__lte=models.F('low_stock_threshold')),
+                name='inventory_low_stock_idx',
+            ),
+        ]
     
     def __str__(self):
         return f"{self.product_name} - Available: {self.available_quantity}"
     
+    def save(self, *args, **kwargs):
+        """Save, recording any change to the stock columns in the ledger."""
+        update_fields = kwargs.get('update_fields')
+        written = [field for field in STOCK_FIELDS if update_fields is None or field in update_fields]
+        if not written:
+            return super().save(*args, **kwargs)
+        with transaction.atomic(using=kwargs.get('using')):
+            # Lock the row so the difference is taken against the value being replaced.
+            before = None
+            if not self._state.adding:
+                before = Inventory.objects.select_for_update().filter(pk=self.pk).values(*written).first()
+            before = before or dict.fromkeys(written, 0)
+            super().save(*args, **kwargs)
+            movement = StockMovement.applied_adjustment(
+                self.product_sku, **{field: getattr(self, field) - before[field] for field in written}
+            )
+            if movement is not None:
+                movement.save()
+    
     @property
     def is_low_stock(self):
-        return self.available_quantity <= self.low_stock_threshold
+        return getattr(self, 'total_available', self.available_quantity) <= self.low_stock_threshold
+    
+    @property
+    def warehouse_location(self):
+        return self.warehouse.name
+
+
+class InventoryShard(models.Model):
+    """Model holding one slice of a hot SKU's stock."""
+    
+    inventory = models.ForeignKey(Inventory, on_delete=models.CASCADE, related_name='shards')
+    index = models.PositiveSmallIntegerField()
+    available_quantity = models.IntegerField(default=0)
+    reserved_quantity = models.IntegerField(default=0)
+    
+    class Meta:
+        ordering = ['inventory', 'index']
+        constraints = [
+            models.UniqueConstraint(fields=['inventory', 'index'], name='inventory_shard_unique'),
+        ]
+    
+    def __str__(self):
+        return f"{self.inventory.product_sku} shard {self.index}"
+
+
+class StockMovement(models.Model):
+    """Model representing one append-only change to a SKU's stock."""
+    
+    MOVEMENT_TYPES = [
+        ('receipt', 'Receipt'),
+        ('reservation', 'Reservation'),
+        ('release', 'Release'),
+        ('commit', 'Commit'),
+        ('adjustment', 'Adjustment'),
+    ]
+    
+    product_sku = models.CharField(max_length=100)
+    movement_type = models.CharField(max_length=20, choices=MOVEMENT_TYPES)
+    available_delta = models.IntegerField(default=0)
+    reserved_delta = models.IntegerField(default=0)
+    reference = models.CharField(max_length=100, blank=True)
+    # Whether the writer already changed Inventory; otherwise compaction folds the deltas in.
+    applied = models.BooleanField(default=False)
+    # The compaction run whose snapshots include this movement; null until compacted.
+    compaction = models.ForeignKey(
+        'StockCompaction', null=True, blank=True, on_delete=models.PROTECT, related_name='movements'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['product_sku', 'created_at'], name='movement_sku_created_idx'),
+            # Partial index holding only movements not yet compacted.
+            models.Index(
+                fields=['product_sku'],
+                condition=models.Q(compaction__isnull=True),
+                name='movement_uncompacted_idx',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.product_sku} {self.movement_type} ({self.available_delta:+d}/{self.reserved_delta:+d})"
+    
+    @classmethod
+    def applied_adjustment(cls, sku, available_quantity=0, reserved_quantity=0, reference=''):
+        """Return an unsaved adjustment for a change already written to Inventory, or None if there is none."""
+        if not available_quantity and not reserved_quantity:
+            return None
+        return cls(
+            product_sku=sku,
+            movement_type='adjustment',
+            available_delta=available_quantity,
+            reserved_delta=reserved_quantity,
+            reference=reference,
+            applied=True,
+        )
+
+
+class StockCompaction(models.Model):
+    """Model recording a run that folded stock movements into inventory."""
+    
+    movements_folded = models.IntegerField(default=0)
+    skus_updated = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-id']
+    
+    def __str__(self):
+        return f"Compaction #{self.pk}"
+
+
+class StockSnapshot(models.Model):
+    """Model representing a SKU's stock level as of a compaction run."""
+    
+    product_sku = models.CharField(max_length=100)
+    available_quantity = models.IntegerField()
+    reserved_quantity = models.IntegerField()
+    compaction = models.ForeignKey(StockCompaction, on_delete=models.CASCADE, related_name='snapshots')
+    taken_at = models.DateTimeField()
+    
+    class Meta:
+        ordering = ['-taken_at']
+        indexes = [
+            # Per SKU, compaction ids follow commit order (see ledger.compact).
+            models.Index(fields=['product_sku', '-compaction'], name='snapshot_sku_compaction_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.product_sku} @ {self.taken_at}: {self.available_quantity}"
+
+
+class StockAlert(models.Model):
+    """Model recording a SKU's available quantity crossing its low-stock threshold."""
+    
+    DIRECTIONS = [
+        ('low', 'Dropped to low stock'),
+        ('recovered', 'Recovered from low stock'),
+    ]
+    
+    STATES = [
+        ('pending', 'Pending'),
+        ('delivered', 'Delivered'),
+        ('superseded', 'Superseded'),
+    ]
+    
+    product_sku = models.CharField(max_length=100)
+    direction = models.CharField(max_length=20, choices=DIRECTIONS)
+    available_quantity = models.IntegerField()
+    low_stock_threshold = models.IntegerField()
+    state = models.CharField(max_length=20, choices=STATES, default='pending')
+    created_at = models.DateTimeField(auto_now_add=True)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['state', 'id'], name='alert_state_id_idx'),
+            models.Index(fields=['product_sku', 'state'], name='alert_sku_state_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.product_sku} {self.direction} at {self.available_quantity}"
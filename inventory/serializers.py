@@ -1,21 +1,78 @@
+from common.serializers import NamedRelationsMixin
 from rest_framework import serializers
-from .models import Inventory
+from .models import Inventory, StockAlert, StockMovement, Warehouse
+from .alerts import detect_crossing, record_alerts
+from .shards import clear_shard_fields
 
 
-class InventorySerializer(serializers.ModelSerializer):
+class StockTotalsMixin:
+    """
+    Reports stock including shards and treats written quantities as totals.
+    
+    Sharded hot SKUs keep most of their stock in InventoryShard rows; the
+    API shows and accepts the same totals as for any other SKU.
+    """
+    
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if instance.shard_count:
+            if not hasattr(instance, 'total_available'):
+                instance = Inventory.objects.with_totals().get(pk=instance.pk)
+            totals = {'available_quantity': instance.total_available, 'reserved_quantity': instance.total_reserved}
+            for field, total in totals.items():
+                if field in data:
+                    data[field] = total
+            if 'is_low_stock' in data:
+                data['is_low_stock'] = instance.total_available <= instance.low_stock_threshold
+        return data
+    
+    def update(self, instance, validated_data):
+        if not instance.shard_count:
+            return super().update(instance, validated_data)
+        levels = Inventory.objects.with_totals().values_list('total_available', 'low_stock_threshold')
+        before = levels.get(pk=instance.pk)
+        instance = super().update(instance, validated_data)
+        clear_shard_fields([instance.pk], validated_data)
+        record_alerts([detect_crossing(instance.product_sku, before, levels.get(pk=instance.pk))])
+        return instance
+
+
+class SubmittedFieldsMixin:
+    """
+    Saves only the submitted fields on update.
+    
+    A full-row save would write back quantities read before a concurrent
+    reservation and undo it.
+    """
+    
+    def update(self, instance, validated_data):
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        instance.save(update_fields=[*validated_data, 'updated_at'])
+        return instance
+
+
+class InventorySerializer(StockTotalsMixin, NamedRelationsMixin, SubmittedFieldsMixin, serializers.ModelSerializer):
     """Serializer for Inventory model."""
     
+    named_relations = {'warehouse': Warehouse}
+    
     is_low_stock = serializers.BooleanField(read_only=True)
+    warehouse_location = serializers.CharField(source='warehouse.name', max_length=255)
     
     class Meta:
         model = Inventory
-        fields = '__all__'
-        read_only_fields = ('updated_at',)
+        exclude = ('shard_count',)
+        read_only_fields = ('warehouse', 'updated_at')
 
 
-class InventoryUpdateSerializer(serializers.ModelSerializer):
+class InventoryUpdateSerializer(StockTotalsMixin, NamedRelationsMixin, SubmittedFieldsMixin, serializers.ModelSerializer):
     """Serializer for updating inventory quantities."""
     
+    named_relations = {'warehouse': Warehouse}
+    
+    warehouse_location = serializers.CharField(source='warehouse.name', max_length=255)
+    
     class Meta:
         model = Inventory
         fields = ('available_quantity', 'reserved_quantity', 'warehouse_location', 'last_restocked')
@@ -33,7 +90,7 @@ class InventoryUpdateSerializer(serializers.ModelSerializer):
         return value
 
 
-class InventoryListSerializer(serializers.ModelSerializer):
+class InventoryListSerializer(StockTotalsMixin, serializers.ModelSerializer):
     """Lightweight serializer for inventory listings."""
     
     is_low_stock = serializers.BooleanField(read_only=True)
@@ -41,3 +98,92 @@ class InventoryListSerializer(serializers.ModelSerializer):
     class Meta:
         model = Inventory
         fields = ('id', 'product_sku', 'product_name', 'available_quantity', 'is_low_stock')
+
+
+class StockLineSerializer(serializers.Serializer):
+    """Serializer for one SKU line in a stock operation."""
+    
+    sku = serializers.CharField(max_length=100)
+    quantity = serializers.IntegerField(min_value=1)
+
+
+class StockOperationSerializer(serializers.Serializer):
+    """Serializer for reserve, release and commit requests."""
+    
+    items = StockLineSerializer(many=True, allow_empty=False)
+    allow_partial = serializers.BooleanField(default=False)
+
+
+class InventorySyncRowSerializer(serializers.ModelSerializer):
+    """Serializer for one row of a warehouse stock snapshot."""
+    
+    # Rows are upserted on product_sku, so it must not be validated as unique.
+    product_sku = serializers.CharField(max_length=100)
+    warehouse_location = serializers.CharField(max_length=255, required=False)
+    
+    class Meta:
+        model = Inventory
+        fields = (
+            'product_sku', 'product_name', 'available_quantity', 'reserved_quantity',
+            'warehouse_location', 'low_stock_threshold'
+        )
+        extra_kwargs = {
+            'product_name': {'required': False},
+            'reserved_quantity': {'required': False},
+            'low_stock_threshold': {'required': False},
+        }
+    
+    def validate_available_quantity(self, value):
+        if value < 0:
+            raise serializers.ValidationError("Available quantity cannot be negative.")
+        return value
+    
+    def validate_reserved_quantity(self, value):
+        if value < 0:
+            raise serializers.ValidationError("Reserved quantity cannot be negative.")
+        return value
+
+
+class StockMovementLineSerializer(serializers.Serializer):
+    """Serializer for one movement appended to the stock ledger."""
+    
+    sku = serializers.CharField(max_length=100)
+    movement_type = serializers.ChoiceField(choices=StockMovement.MOVEMENT_TYPES)
+    quantity = serializers.IntegerField()
+    reference = serializers.CharField(max_length=100, required=False, allow_blank=True, default='')
+    
+    def validate(self, data):
+        """Adjustments take a signed quantity; other movements a positive one."""
+        if data['movement_type'] == 'adjustment':
+            if data['quantity'] == 0:
+                raise serializers.ValidationError({'quantity': 'Adjustment quantity cannot be zero.'})
+        elif data['quantity'] <= 0:
+            raise serializers.ValidationError({'quantity': 'Quantity must be greater than zero.'})
+        return data
+
+
+class StockMovementBatchSerializer(serializers.Serializer):
+    """Serializer for appending a batch of stock movements."""
+    
+    movements = StockMovementLineSerializer(many=True, allow_empty=False)
+
+
+class WarehouseStockSerializer(serializers.ModelSerializer):
+    """Serializer for per-warehouse stock totals."""
+    
+    sku_count = serializers.IntegerField(read_only=True)
+    units_on_hand = serializers.IntegerField(read_only=True)
+    units_reserved = serializers.IntegerField(read_only=True)
+    low_stock_count = serializers.IntegerField(read_only=True)
+    
+    class Meta:
+        model = Warehouse
+        fields = ('id', 'name', 'sku_count', 'units_on_hand', 'units_reserved', 'low_stock_count')
+
+
+class StockAlertSerializer(serializers.ModelSerializer):
+    """Serializer for delivered low-stock alerts."""
+    
+    class Meta:
+        model = StockAlert
+        fields = ('id', 'product_sku', 'direction', 'available_quantity', 'low_stock_threshold', 'created_at', 'delivered_at')
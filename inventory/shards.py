@@ -0,0 +1,106 @@
+"""
+Sharded stock counters for hot SKUs.
+
+A SKU with shard_count > 0 keeps its stock split across InventoryShard rows,
+so concurrent reservations update different rows instead of queueing on the
+same one. A reservation starts at a random shard and falls back to its
+siblings; when no single shard can cover it, the SKU is locked and its total
+is respread evenly. Reads add the shards to the Inventory columns (see
+Inventory.objects.with_totals()).
+
+Absolute writes (update_stock, PUT/PATCH, sync) set the Inventory columns
+and clear the matching shard fields, recording the stock removed from the
+shards in the ledger. The next reservation that misses on every shard
+spreads the stock back out.
+"""
+import random
+
+from django.db import transaction
+from django.db.models import F
+from .cache import availability_cache
+from .models import STOCK_FIELDS, Inventory, InventoryShard, StockMovement
+
+
+def spread(item, shards, totals):
+    """Write `totals` evenly across `shards` and zero the Inventory columns."""
+    for field in STOCK_FIELDS:
+        share, remainder = divmod(totals[field], len(shards))
+        for shard in shards:
+            setattr(shard, field, share + (1 if shard.index < remainder else 0))
+    InventoryShard.objects.bulk_update(shards, STOCK_FIELDS)
+    Inventory.objects.filter(pk=item.pk).update(**dict.fromkeys(STOCK_FIELDS, 0))
+
+
+def locked_totals(inventory_id):
+    """Lock a SKU and its shards; return (item, shards, totals)."""
+    item = Inventory.objects.select_for_update().get(pk=inventory_id)
+    shards = list(InventoryShard.objects.select_for_update().filter(inventory=item).order_by('index'))
+    totals = {
+        field: getattr(item, field) + sum(getattr(shard, field) for shard in shards)
+        for field in STOCK_FIELDS
+    }
+    return item, shards, totals
+
+
+def set_shard_count(sku, shard_count):
+    """Split a SKU's stock across `shard_count` shards, or fold it back with 0."""
+    with transaction.atomic():
+        inventory_id = Inventory.objects.values_list('pk', flat=True).get(product_sku=sku)
+        item, shards, totals = locked_totals(inventory_id)
+        InventoryShard.objects.filter(inventory=item).delete()
+        Inventory.objects.filter(pk=item.pk).update(shard_count=shard_count, **totals)
+        if shard_count:
+            shards = InventoryShard.objects.bulk_create([
+                InventoryShard(inventory=item, index=index) for index in range(shard_count)
+            ])
+            spread(item, shards, totals)
+        availability_cache.invalidate_on_commit([sku])
+    return totals
+
+
+def apply_to_shards(inventory_id, shard_count, guard, deltas, quantity):
+    """
+    Apply one stock operation (see stock.STOCK_OPERATIONS) to a sharded SKU.
+    
+    Returns False when the SKU's total cannot cover `quantity`.
+    """
+    start = random.randrange(shard_count)
+    changes = {field: F(field) + sign * quantity for field, sign in deltas.items()}
+    for step in range(shard_count):
+        updated = InventoryShard.objects.filter(
+            inventory_id=inventory_id,
+            index=(start + step) % shard_count,
+            **{f'{guard}__gte': quantity}
+        ).update(**changes)
+        if updated:
+            return True
+    
+    # No single shard covers it: apply to the total and respread.
+    with transaction.atomic():
+        item, shards, totals = locked_totals(inventory_id)
+        if totals[guard] < quantity:
+            return False
+        for field, sign in deltas.items():
+            totals[field] += sign * quantity
+        spread(item, shards, totals)
+    return True
+
+
+def clear_shard_fields(inventory_ids, fields, reference=''):
+    """Zero `fields` on the shards of SKUs whose Inventory columns were set absolutely."""
+    fields = [field for field in fields if field in STOCK_FIELDS]
+    if not inventory_ids or not fields:
+        return
+    with transaction.atomic():
+        shards = InventoryShard.objects.filter(inventory_id__in=inventory_ids)
+        removed = {}
+        for sku, *values in shards.select_for_update(of=('self',)).values_list('inventory__product_sku', *fields):
+            totals = removed.setdefault(sku, dict.fromkeys(fields, 0))
+            for field, value in zip(fields, values):
+                totals[field] += value
+        shards.update(**dict.fromkeys(fields, 0))
+        movements = [
+            StockMovement.applied_adjustment(sku, reference=reference, **{field: -total for field, total in totals.items()})
+            for sku, totals in removed.items()
+        ]
+        StockMovement.objects.bulk_create([movement for movement in movements if movement is not None])
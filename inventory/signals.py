@@ -0,0 +1,29 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from common.models import loaded_values
+from .alerts import detect_crossing, record_alerts
+from .cache import availability_cache
+from .models import Inventory
+
+
+@receiver(post_save, sender=Inventory)
+@receiver(post_delete, sender=Inventory)
+def invalidate_availability(sender, instance, **kwargs):
+    availability_cache.invalidate_on_commit([instance.product_sku])
+
+
+# Saves of instances loaded with either field deferred skip crossing detection.
+
+@receiver(post_init, sender=Inventory)
+def remember_stock_level(sender, instance, **kwargs):
+    instance._stock_level = loaded_values(instance, 'available_quantity', 'low_stock_threshold')
+
+
+@receiver(post_save, sender=Inventory)
+def record_threshold_crossing(sender, instance, created, **kwargs):
+    before = instance._stock_level
+    after = (instance.available_quantity, instance.low_stock_threshold)
+    # Sharded SKUs are checked against their totals by the serializers.
+    if not created and not instance.shard_count and None not in before:
+        record_alerts([detect_crossing(instance.product_sku, before, after)])
+    instance._stock_level = after
@@ -0,0 +1,190 @@
+"""
+Compact binary snapshot of SKU availability per warehouse.
+
+Layout (little-endian):
+
+    header      HEADER struct, see below
+    warehouses  per warehouse: u32 id, u16 name length, UTF-8 name
+    sku index   sku_count keys of sku_width bytes, NUL-padded, sorted bytewise
+    quantities  per warehouse (in table order): sku_count int32 values
+
+The sku index starts 8-byte aligned and each quantity array 4-byte aligned.
+The version is a hash of everything after the header, so it only changes
+when the data does; it doubles as the ETag for conditional downloads.
+
+Readers mmap the file and binary-search the index in place; lookups read one
+key per probe and one int32 per warehouse without loading the file.
+
+Configured through settings.INVENTORY_AVAILABILITY_SNAPSHOT, e.g.
+    {'PATH': BASE_DIR / 'snapshots' / 'availability.bin'}
+"""
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+from array import array
+
+from django.conf import settings
+from .models import Inventory, Warehouse
+
+MAGIC = b'BKAV'
+FORMAT_VERSION = 1
+# magic, format version, sku width, version, generated at, sku count,
+# warehouse count, sku index offset, quantities offset
+HEADER = struct.Struct('<4sHHQdIIII')
+
+
+class SnapshotFormatError(ValueError):
+    pass
+
+
+def snapshot_path():
+    options = getattr(settings, 'INVENTORY_AVAILABILITY_SNAPSHOT', {})
+    return os.fspath(options.get('PATH', os.path.join(settings.BASE_DIR, 'snapshots', 'availability.bin')))
+
+
+def align(offset, boundary):
+    return -(-offset // boundary) * boundary
+
+
+def build_snapshot():
+    """Return the snapshot file contents for the current stock levels."""
+    warehouses = list(Warehouse.objects.order_by('id').values_list('id', 'name'))
+    columns = {warehouse_id: column for column, (warehouse_id, _) in enumerate(warehouses)}
+    rows = sorted(
+        (sku.encode(), warehouse_id, available)
+        for sku, warehouse_id, available in Inventory.objects.with_totals()
+        .values_list('product_sku', 'warehouse_id', 'total_available').iterator(chunk_size=5000)
+    )
+    sku_width = max((len(sku) for sku, _, _ in rows), default=1)
+    quantities = [array('i', bytes(4 * len(rows))) for _ in warehouses]
+    for position, (_, warehouse_id, available) in enumerate(rows):
+        quantities[columns[warehouse_id]][position] = available
+    
+    table = b''.join(
+        struct.pack('<IH', warehouse_id, len(name.encode())) + name.encode()
+        for warehouse_id, name in warehouses
+    )
+    index_offset = align(HEADER.size + len(table), 8)
+    quantities_offset = align(index_offset + sku_width * len(rows), 4)
+    body = bytearray(quantities_offset - HEADER.size)
+    body[:len(table)] = table
+    for position, (sku, _, _) in enumerate(rows):
+        start = index_offset - HEADER.size + position * sku_width
+        body[start:start + len(sku)] = sku
+    for column in quantities:
+        if sys.byteorder == 'big':
+            column.byteswap()
+        body += column.tobytes()
+    
+    version = int.from_bytes(hashlib.blake2b(body, digest_size=8).digest(), 'little')
+    header = HEADER.pack(
+        MAGIC, FORMAT_VERSION, sku_width, version, time.time(),
+        len(rows), len(warehouses), index_offset, quantities_offset,
+    )
+    return header + bytes(body)
+
+
+def write_snapshot(path=None):
+    """
+    Write the snapshot atomically and return its header values.
+    
+    An unchanged snapshot is left in place so its Last-Modified stays put.
+    """
+    path = path or snapshot_path()
+    data = build_snapshot()
+    new_header = read_header(data)
+    try:
+        with open(path, 'rb') as existing:
+            current = read_header(existing.read(HEADER.size))
+        if current['version'] == new_header['version']:
+            return current
+    except (OSError, SnapshotFormatError):
+        pass
+    
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix='.availability-')
+    try:
+        with os.fdopen(fd, 'wb') as temp:
+            temp.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    return new_header
+
+
+def read_header(buffer):
+    if len(buffer) < HEADER.size:
+        raise SnapshotFormatError('Snapshot is truncated.')
+    (magic, format_version, sku_width, version, generated_at, sku_count,
+     warehouse_count, index_offset, quantities_offset) = HEADER.unpack_from(buffer)
+    if magic != MAGIC or format_version != FORMAT_VERSION:
+        raise SnapshotFormatError('Not an availability snapshot of a supported version.')
+    return {
+        'sku_width': sku_width,
+        'version': version,
+        'generated_at': generated_at,
+        'sku_count': sku_count,
+        'warehouse_count': warehouse_count,
+        'index_offset': index_offset,
+        'quantities_offset': quantities_offset,
+    }
+
+
+class SnapshotReader:
+    """Memory-mapped lookups in an availability snapshot."""
+    
+    def __init__(self, path=None):
+        with open(path or snapshot_path(), 'rb') as snapshot:
+            self._map = mmap.mmap(snapshot.fileno(), 0, access=mmap.ACCESS_READ)
+        header = read_header(self._map)
+        self.__dict__.update(header)
+        self.warehouses = []
+        offset = HEADER.size
+        for _ in range(self.warehouse_count):
+            warehouse_id, length = struct.unpack_from('<IH', self._map, offset)
+            offset += 6
+            self.warehouses.append((warehouse_id, self._map[offset:offset + length].decode()))
+            offset += length
+    
+    def close(self):
+        self._map.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def position(self, sku):
+        """Return the index of `sku`, or None if it is not in the snapshot."""
+        key = sku.encode()
+        if len(key) > self.sku_width:
+            return None
+        key = key.ljust(self.sku_width, b'\0')
+        low, high = 0, self.sku_count
+        while low < high:
+            middle = (low + high) // 2
+            start = self.index_offset + middle * self.sku_width
+            probe = self._map[start:start + self.sku_width]
+            if probe < key:
+                low = middle + 1
+            elif probe > key:
+                high = middle
+            else:
+                return middle
+        return None
+    
+    def lookup(self, sku):
+        """Return {warehouse name: available quantity} for `sku`, or None if unknown."""
+        position = self.position(sku)
+        if position is None:
+            return None
+        return {
+            name: struct.unpack_from('<i', self._map, self.quantities_offset + 4 * (column * self.sku_count + position))[0]
+            for column, (_, name) in enumerate(self.warehouses)
+        }
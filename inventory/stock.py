@@ -0,0 +1,130 @@
+"""
+Atomic stock reservation, release and commit.
+
+Each line is applied with a single conditional UPDATE that adjusts the
+quantities relative to their current values, so concurrent writers never
+overwrite each other and no rows are read or locked from Python. Sharded hot
+SKUs are updated on one of their shards instead (see shards.py). The applied
+lines are recorded as stock movements in the same transaction (see ledger.py).
+"""
+from collections import OrderedDict
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from .alerts import detect_crossing, record_alerts
+from .cache import availability_cache
+from .models import Inventory, StockMovement
+from .shards import apply_to_shards
+
+# operation -> (guard, field deltas); the guard field must cover the quantity.
+STOCK_OPERATIONS = {
+    'reserve': ('available_quantity', {'available_quantity': -1, 'reserved_quantity': 1}),
+    'release': ('reserved_quantity', {'available_quantity': 1, 'reserved_quantity': -1}),
+    'commit': ('reserved_quantity', {'reserved_quantity': -1}),
+    'deduct': ('available_quantity', {'available_quantity': -1}),
+}
+
+# operation -> the StockMovement type it is recorded as
+OPERATION_MOVEMENTS = {
+    'reserve': 'reservation',
+    'release': 'release',
+    'commit': 'commit',
+    'deduct': 'adjustment',
+}
+
+
+def merge_lines(lines):
+    """Sum quantities per SKU, keeping first-seen order."""
+    merged = OrderedDict()
+    for line in lines:
+        merged[line['sku']] = merged.get(line['sku'], 0) + line['quantity']
+    return merged
+
+
+def apply_stock_operation(operation, lines, allow_partial=False, record=True):
+    """
+    Apply `operation` to each (sku, quantity) line in one transaction.
+    
+    Returns (applied, results). Without `allow_partial`, any failed line
+    rolls back the whole request and the successful lines are reported as
+    'rolled_back'. With `record=False` the caller records the movements.
+    """
+    guard, deltas = STOCK_OPERATIONS[operation]
+    merged = merge_lines(lines)
+    results = []
+    
+    with transaction.atomic():
+        availability_cache.invalidate_on_commit(merged)
+        now = timezone.now()
+        for sku, quantity in merged.items():
+            updated = Inventory.objects.filter(
+                product_sku=sku, shard_count=0, **{f'{guard}__gte': quantity}
+            ).update(
+                updated_at=now,
+                **{field: F(field) + sign * quantity for field, sign in deltas.items()}
+            )
+            results.append({'sku': sku, 'quantity': quantity, 'status': 'ok' if updated else 'insufficient'})
+        
+        failed = [result['sku'] for result in results if result['status'] != 'ok']
+        if failed:
+            existing = {
+                sku: (pk, shard_count)
+                for sku, pk, shard_count in Inventory.objects.filter(product_sku__in=failed)
+                .values_list('product_sku', 'pk', 'shard_count')
+            }
+            for result in results:
+                if result['status'] == 'ok':
+                    continue
+                if result['sku'] not in existing:
+                    result['status'] = 'not_found'
+                    continue
+                pk, shard_count = existing[result['sku']]
+                if shard_count and apply_to_shards(pk, shard_count, guard, deltas, result['quantity']):
+                    result['status'] = 'ok'
+            failed = [result['sku'] for result in results if result['status'] != 'ok']
+            if failed and not allow_partial:
+                transaction.set_rollback(True)
+                for result in results:
+                    if result['status'] == 'ok':
+                        result['status'] = 'rolled_back'
+        
+        if allow_partial or not failed:
+            applied = {result['sku']: result['quantity'] for result in results if result['status'] == 'ok'}
+            if record and applied:
+                record_operation(operation, applied)
+            if deltas.get('available_quantity'):
+                record_threshold_crossings(applied, deltas['available_quantity'])
+    
+    return not failed, results
+
+
+def record_operation(operation, applied):
+    """Record the `applied` quantities of `operation` as applied movements."""
+    deltas = STOCK_OPERATIONS[operation][1]
+    StockMovement.objects.bulk_create([
+        StockMovement(
+            product_sku=sku,
+            movement_type=OPERATION_MOVEMENTS[operation],
+            available_delta=deltas.get('available_quantity', 0) * quantity,
+            reserved_delta=deltas.get('reserved_quantity', 0) * quantity,
+            applied=True,
+        )
+        for sku, quantity in applied.items()
+    ])
+
+
+def record_threshold_crossings(applied, sign):
+    """
+    Record low-stock crossings caused by moving `applied` quantities.
+    
+    The levels before the update are derived from the updated rows, so this
+    costs one query for the changed SKUs.
+    """
+    rows = Inventory.objects.filter(product_sku__in=list(applied)).with_totals().values_list(
+        'product_sku', 'total_available', 'low_stock_threshold'
+    )
+    record_alerts(
+        detect_crossing(sku, (available - sign * applied[sku], threshold), (available, threshold))
+        for sku, available, threshold in rows
+    )
@@ -0,0 +1,83 @@
+"""
+Worker side of the stress_stock_updates command.
+
+Workers run in separate processes started with the 'spawn' method, so this
+module must not import models at import time: each worker sets Django up
+itself and then drives the WSGI app through django.test.Client.
+"""
+import random
+import time
+
+import django
+
+RESERVE = 'reserve'
+RESTOCK = 'restock'
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run_worker(worker_id, options, skus, barrier, results):
+    """
+    Issue interleaved reservations and restocks and put a summary on `results`.
+    
+    `skus` maps product_sku to inventory id. Restocks read the current level
+    and write it back with update_stock, as a client would; reservations use
+    the atomic reserve action.
+    """
+    django.setup()
+    from django.db import OperationalError
+    from django.test import Client
+    
+    client = Client(SERVER_NAME='localhost')
+    rng = random.Random(options['seed'] + worker_id)
+    hot = [sku for sku in skus if sku.startswith(f'{options["prefix"]}HOT-')]
+    own = [sku for sku in skus if sku.startswith(f'{options["prefix"]}W{worker_id}-')]
+    stats = {
+        kind: {'latencies': [], 'ok': 0, 'rejected': 0, 'locked': 0, 'errors': 0}
+        for kind in (RESERVE, RESTOCK)
+    }
+    # sku -> [available delta, reserved delta] for requests that succeeded
+    applied = {}
+    
+    barrier.wait()
+    for _ in range(options['operations']):
+        sku = rng.choice(hot if hot and rng.random() < options['hot_ratio'] else own or hot)
+        kind = RESTOCK if rng.random() < options['restock_ratio'] else RESERVE
+        quantity = rng.randint(1, 3) if kind == RESERVE else rng.randint(5, 20)
+        started = time.perf_counter()
+        try:
+            if kind == RESERVE:
+                response = client.post(
+                    '/api/inventory/reserve/', {'items': [{'sku': sku, 'quantity': quantity}]},
+                    content_type='application/json'
+                )
+                succeeded = response.status_code == 200
+                change = (-quantity, quantity)
+            else:
+                current = client.get(f'/api/inventory/{skus[sku]}/').json()['available_quantity']
+                response = client.post(
+                    f'/api/inventory/{skus[sku]}/update_stock/', {'available_quantity': current + quantity},
+                    content_type='application/json'
+                )
+                succeeded = response.status_code == 200
+                change = (quantity, 0)
+        except OperationalError as exc:
+            outcome = 'locked' if 'locked' in str(exc) else 'errors'
+        except Exception:
+            outcome = 'errors'
+        else:
+            outcome = 'ok' if succeeded else 'rejected'
+            if succeeded:
+                totals = applied.setdefault(sku, [0, 0])
+                totals[0] += change[0]
+                totals[1] += change[1]
+        stats[kind]['latencies'].append(time.perf_counter() - started)
+        stats[kind][outcome] += 1
+    
+    results.put({'worker': worker_id, 'stats': stats, 'applied': applied, 'finished': time.time()})
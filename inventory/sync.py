@@ -0,0 +1,159 @@
+"""
+Streaming stock snapshot sync keyed on product_sku.
+
+Snapshots arrive as CSV (with a header row) or NDJSON and are read line by
+line (see common.records.iter_records). They are processed in chunks: one
+query loads the existing rows of the chunk, unchanged rows are skipped, and
+the rest are upserted with bulk_create(update_conflicts=True). Columns
+missing from a row keep their current values, or the model defaults for new
+SKUs. The existing rows are locked while the chunk is applied, and the stock
+each row gains or loses is recorded in the ledger as an applied adjustment.
+"""
+from django.db import transaction
+from common.records import RECORD_CONTENT_TYPES, NameResolver
+from rest_framework import serializers
+from .alerts import detect_crossing, record_alerts
+from .cache import availability_cache
+from .models import STOCK_FIELDS, Inventory, StockMovement, Warehouse
+from .serializers import InventorySyncRowSerializer
+from .shards import clear_shard_fields
+
+SYNC_CONTENT_TYPES = RECORD_CONTENT_TYPES
+SYNC_CHUNK_SIZE = 2000
+MAX_REPORTED_ERRORS = 100
+SYNC_FIELDS = [
+    'product_name', 'available_quantity', 'reserved_quantity',
+    'warehouse_id', 'low_stock_threshold',
+]
+# A new stock row needs a product name and a warehouse; the quantities default to 0.
+REQUIRED_FOR_INSERT = ['product_name', 'warehouse_location']
+# Snapshot rows give the warehouse by name.
+SYNC_RELATIONS = {'warehouse_location': (Warehouse, 'warehouse_id')}
+
+
+class SnapshotSync:
+    """Accumulates counts and errors while applying a snapshot."""
+    
+    def __init__(self, chunk_size=SYNC_CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self.inserted = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.failed = 0
+        self.errors = []
+        self.validator = InventorySyncRowSerializer()
+    
+    def run(self, records):
+        chunk = {}
+        for line_number, record in records:
+            data = self.validate(line_number, record)
+            if data is None:
+                continue
+            # Later rows for the same SKU win.
+            chunk[data['product_sku']] = (line_number, data)
+            if len(chunk) >= self.chunk_size:
+                self.apply(chunk)
+                chunk = {}
+        if chunk:
+            self.apply(chunk)
+        return self
+    
+    def error(self, line_number, errors):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line_number, 'errors': errors})
+    
+    def validate(self, line_number, record):
+        if isinstance(record, Exception):
+            self.error(line_number, {'non_field_errors': [str(record)]})
+            return None
+        try:
+            return self.validator.run_validation(record)
+        except serializers.ValidationError as exc:
+            self.error(line_number, exc.detail)
+            return None
+    
+    def apply(self, chunk):
+        with transaction.atomic():
+            existing = {}
+            # Sharded SKUs: sku -> (pk, totals including shards).
+            sharded = {}
+            rows = (
+                Inventory.objects.filter(product_sku__in=list(chunk))
+                .select_for_update(of=('self',))
+                .with_totals()
+                .values('product_sku', *SYNC_FIELDS, 'pk', 'shard_count', 'total_available', 'total_reserved')
+            )
+            for row in rows:
+                pk, shard_count = row.pop('pk'), row.pop('shard_count')
+                totals = {'available_quantity': row.pop('total_available'), 'reserved_quantity': row.pop('total_reserved')}
+                if shard_count:
+                    sharded[row['product_sku']] = (pk, totals)
+                existing[row['product_sku']] = row
+            accepted = []
+            for sku, (line_number, data) in chunk.items():
+                missing = [field for field in REQUIRED_FOR_INSERT if field not in data] if sku not in existing else []
+                if missing:
+                    self.error(line_number, {field: ['This field is required for new SKUs.'] for field in missing})
+                    continue
+                accepted.append((sku, data))
+            # A snapshot usually names a handful of warehouses across thousands of rows;
+            # rejected rows must not create theirs.
+            warehouses = NameResolver(SYNC_RELATIONS, (data for _, data in accepted))
+            upserts = []
+            movements = []
+            alerts = []
+            cleared = {field: [] for field in STOCK_FIELDS}
+            for sku, data in accepted:
+                current = existing.get(sku)
+                data = warehouses.resolve(data)
+                if current is None:
+                    item = Inventory(**data)
+                    upserts.append(item)
+                    movements.append(StockMovement.applied_adjustment(
+                        sku, reference='sync', **{field: getattr(item, field) for field in STOCK_FIELDS}
+                    ))
+                    self.inserted += 1
+                    continue
+                # Quantities in the snapshot are totals; compare them with the sharded totals.
+                pk, totals = sharded.get(sku, (None, {}))
+                shown = {**current, **totals}
+                if all(shown[field] == value for field, value in data.items()):
+                    self.unchanged += 1
+                    continue
+                upserts.append(Inventory(**{**current, **data}))
+                # Against the Inventory columns; clear_shard_fields() records what leaves the shards.
+                movements.append(StockMovement.applied_adjustment(
+                    sku, reference='sync', **{field: data[field] - current[field] for field in STOCK_FIELDS if field in data}
+                ))
+                after = {**shown, **data}
+                alerts.append(detect_crossing(
+                    sku,
+                    (shown['available_quantity'], shown['low_stock_threshold']),
+                    (after['available_quantity'], after['low_stock_threshold']),
+                ))
+                for field in cleared:
+                    if pk is not None and field in data:
+                        cleared[field].append(pk)
+                self.updated += 1
+            
+            availability_cache.invalidate_on_commit(item.product_sku for item in upserts)
+            Inventory.objects.bulk_create(
+                upserts,
+                update_conflicts=True,
+                unique_fields=['product_sku'],
+                update_fields=[*SYNC_FIELDS, 'updated_at'],
+            )
+            StockMovement.objects.bulk_create([movement for movement in movements if movement is not None])
+            for field, pks in cleared.items():
+                clear_shard_fields(pks, [field], reference='sync')
+            record_alerts(alerts)
+    
+    def summary(self):
+        return {
+            'inserted': self.inserted,
+            'updated': self.updated,
+            'unchanged': self.unchanged,
+            'failed': self.failed,
+            'errors': self.errors,
+        }
@@ -1,3 +1,568 @@
-from django.test import TestCase
+import json
+import os
+import shutil
+import tempfile
+from datetime import timedelta
 
-# Create your tests here.
+from django.db.models import F
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from .alerts import dispatch_alerts, stock_threshold_crossed
+from .cache import AvailabilityCache, availability_cache
+from .ledger import compact, level_at
+from .models import Inventory, InventoryShard, StockAlert, StockMovement, StockSnapshot, Warehouse
+from .serializers import InventoryUpdateSerializer
+from .shards import set_shard_count
+from .snapshot import SnapshotReader, write_snapshot
+
+
+def create_inventory(sku, available, threshold=10, warehouse='Warehouse A', reserved=0):
+    return Inventory.objects.create(
+        product_sku=sku,
+        product_name=f'Product {sku}',
+        available_quantity=available,
+        reserved_quantity=reserved,
+        warehouse=Warehouse.objects.get_or_create(name=warehouse)[0],
+        low_stock_threshold=threshold,
+    )
+
+
+class LowStockTests(TestCase):
+    """The low-stock check runs in the database against a partial index."""
+
+    def setUp(self):
+        self.client = APIClient()
+        for index in range(15):
+            create_inventory(f'LOW{index:02d}', available=index % 5, warehouse='Warehouse A')
+        create_inventory('LOW-B', available=1, warehouse='Warehouse B')
+        for index in range(10):
+            create_inventory(f'OK{index:02d}', available=100)
+
+    def test_low_stock_is_paginated(self):
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/inventory/low_stock/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 16)
+        self.assertEqual(len(response.data['results']), 10)
+        self.assertTrue(all(row['is_low_stock'] for row in response.data['results']))
+
+    def test_low_stock_filters_by_warehouse(self):
+        response = self.client.get('/api/inventory/low_stock/', {'warehouse_location': 'Warehouse B'})
+        self.assertEqual([row['product_sku'] for row in response.data['results']], ['LOW-B'])
+
+    def test_low_stock_uses_partial_index(self):
+        plan = Inventory.objects.filter(
+            warehouse=Warehouse.objects.get(name='Warehouse A'), available_quantity__lte=F('low_stock_threshold')
+        ).explain()
+        self.assertIn('inventory_low_stock_idx', plan)
+
+
+class StockOperationTests(TestCase):
+    """Atomic multi-SKU reserve, release and commit."""
+
+    def setUp(self):
+        self.client = APIClient()
+        create_inventory('SKU-A', available=10)
+        create_inventory('SKU-B', available=2)
+
+    def post(self, operation, items, **extra):
+        return self.client.post(
+            f'/api/inventory/{operation}/', {'items': items, **extra}, format='json'
+        )
+
+    def quantities(self, sku):
+        item = Inventory.objects.get(product_sku=sku)
+        return item.available_quantity, item.reserved_quantity
+
+    def test_reserve_release_commit(self):
+        response = self.post('reserve', [{'sku': 'SKU-A', 'quantity': 4}, {'sku': 'SKU-B', 'quantity': 2}])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.quantities('SKU-A'), (6, 4))
+        self.assertEqual(self.quantities('SKU-B'), (0, 2))
+
+        self.post('release', [{'sku': 'SKU-A', 'quantity': 1}])
+        self.assertEqual(self.quantities('SKU-A'), (7, 3))
+        self.post('commit', [{'sku': 'SKU-A', 'quantity': 3}])
+        self.assertEqual(self.quantities('SKU-A'), (7, 0))
+
+    def test_all_or_nothing_rolls_back(self):
+        response = self.post('reserve', [
+            {'sku': 'SKU-A', 'quantity': 4},
+            {'sku': 'SKU-B', 'quantity': 3},
+            {'sku': 'MISSING', 'quantity': 1},
+        ])
+        self.assertEqual(response.status_code, 409)
+        statuses = [result['status'] for result in response.data['results']]
+        self.assertEqual(statuses, ['rolled_back', 'insufficient', 'not_found'])
+        self.assertEqual(self.quantities('SKU-A'), (10, 0))
+
+    def test_partial_applies_successful_lines(self):
+        response = self.post(
+            'reserve',
+            [{'sku': 'SKU-A', 'quantity': 4}, {'sku': 'SKU-B', 'quantity': 3}],
+            allow_partial=True,
+        )
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(self.quantities('SKU-A'), (6, 4))
+        self.assertEqual(self.quantities('SKU-B'), (2, 0))
+
+    def test_duplicate_lines_are_merged(self):
+        self.post('reserve', [{'sku': 'SKU-A', 'quantity': 4}, {'sku': 'SKU-A', 'quantity': 5}])
+        self.assertEqual(self.quantities('SKU-A'), (1, 9))
+
+    def test_release_cannot_exceed_reserved(self):
+        response = self.post('release', [{'sku': 'SKU-A', 'quantity': 1}])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(self.quantities('SKU-A'), (10, 0))
+
+    def test_update_stock_keeps_concurrent_reservation(self):
+        stale = Inventory.objects.get(product_sku='SKU-A')
+        self.post('reserve', [{'sku': 'SKU-A', 'quantity': 4}])
+        serializer = InventoryUpdateSerializer(stale, data={'available_quantity': 20}, partial=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        self.assertEqual(self.quantities('SKU-A'), (20, 4))
+
+
+class InventorySyncTests(TestCase):
+    """Bulk stock snapshot upsert keyed by SKU."""
+
+    def setUp(self):
+        self.client = APIClient()
+        create_inventory('SYNC-1', available=5, warehouse='Warehouse A')
+        create_inventory('SYNC-2', available=7, warehouse='Warehouse A')
+
+    def sync(self, body, content_type):
+        return self.client.generic('POST', '/api/inventory/sync/', body, content_type=content_type)
+
+    def test_csv_snapshot_counts(self):
+        body = (
+            'product_sku,product_name,available_quantity,warehouse_location\n'
+            'SYNC-1,Product SYNC-1,5,Warehouse A\n'
+            'SYNC-2,Product SYNC-2,20,Warehouse A\n'
+            'SYNC-3,New Product,9,Warehouse B\n'
+            'SYNC-4,Broken,-1,Warehouse B\n'
+        )
+        response = self.sync(body, 'text/csv')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            {key: response.data[key] for key in ('inserted', 'updated', 'unchanged', 'failed')},
+            {'inserted': 1, 'updated': 1, 'unchanged': 1, 'failed': 1},
+        )
+        self.assertEqual(response.data['errors'][0]['line'], 5)
+        self.assertEqual(Inventory.objects.get(product_sku='SYNC-2').available_quantity, 20)
+        self.assertEqual(Inventory.objects.get(product_sku='SYNC-3').warehouse_location, 'Warehouse B')
+
+    def test_ndjson_snapshot_keeps_missing_columns(self):
+        body = '\n'.join([
+            json.dumps({'product_sku': 'SYNC-1', 'available_quantity': 50}),
+            'not json',
+            json.dumps({'product_sku': 'SYNC-NEW', 'available_quantity': 1}),
+        ])
+        response = self.sync(body, 'application/x-ndjson')
+        self.assertEqual(response.data['updated'], 1)
+        # The malformed line and the new SKU without a name and warehouse both fail.
+        self.assertEqual(response.data['failed'], 2)
+        item = Inventory.objects.get(product_sku='SYNC-1')
+        self.assertEqual((item.available_quantity, item.product_name), (50, 'Product SYNC-1'))
+
+    def test_rejected_rows_create_no_warehouses(self):
+        row = {'product_sku': 'SYNC-NEW', 'warehouse_location': 'Warehouse Z'}
+        response = self.sync(json.dumps(row), 'application/x-ndjson')
+        self.assertEqual(response.data['failed'], 1)
+        self.assertFalse(Warehouse.objects.filter(name='Warehouse Z').exists())
+
+    def test_sync_query_count_is_per_chunk(self):
+        rows = ''.join(f'SKU{index},Product {index},{index},Warehouse A\n' for index in range(50))
+        body = 'product_sku,product_name,available_quantity,warehouse_location\n' + rows
+        # Savepoint, warehouse lookup, existing-row lookup, upsert, ledger insert, release.
+        with self.assertNumQueries(6):
+            response = self.sync(body, 'text/csv')
+        self.assertEqual(response.data['inserted'], 50)
+
+    def test_sync_rejects_other_content_types(self):
+        response = self.client.post('/api/inventory/sync/', {'rows': []}, format='json')
+        self.assertEqual(response.status_code, 415)
+
+
+class AvailabilityCacheTests(TestCase):
+    """Read-through SKU availability cache with write-through invalidation."""
+
+    def setUp(self):
+        self.client = APIClient()
+        availability_cache.clear()
+        self.item = create_inventory('AV-1', available=10)
+        create_inventory('AV-2', available=0)
+
+    def tearDown(self):
+        availability_cache.clear()
+
+    def test_hot_reads_skip_the_database(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/inventory/availability/', {'skus': 'AV-1,AV-2,NOPE'})
+        self.assertEqual(response.data['AV-1'], {'available_quantity': 10, 'in_stock': True})
+        self.assertEqual(response.data['AV-2']['in_stock'], False)
+        self.assertIsNone(response.data['NOPE']['available_quantity'])
+        with self.assertNumQueries(0):
+            self.client.get('/api/inventory/availability/', {'skus': 'AV-1,AV-2,NOPE'})
+
+    def test_save_invalidates(self):
+        availability_cache.get_many(['AV-1'])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f'/api/inventory/{self.item.pk}/update_stock/', {'available_quantity': 3}, format='json')
+        self.assertEqual(availability_cache.get('AV-1'), 3)
+
+    def test_reservation_and_sync_invalidate(self):
+        availability_cache.get_many(['AV-1', 'AV-2'])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/api/inventory/reserve/', {'items': [{'sku': 'AV-1', 'quantity': 4}]}, format='json')
+        self.assertEqual(availability_cache.get('AV-1'), 6)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.generic(
+                'POST', '/api/inventory/sync/', json.dumps({'product_sku': 'AV-2', 'available_quantity': 8}),
+                content_type='application/x-ndjson'
+            )
+        self.assertEqual(availability_cache.get('AV-2'), 8)
+
+    def test_lru_eviction(self):
+        cache = AvailabilityCache(ttl=60, max_entries=1)
+        cache.get_many(['AV-1', 'AV-2'])
+        with self.assertNumQueries(1):
+            cache.get('AV-1')
+        with self.assertNumQueries(0):
+            cache.get('AV-1')
+
+    def test_shared_cache_is_used_across_instances(self):
+        AvailabilityCache(ttl=60, shared_cache='default').get_many(['AV-1', 'NOPE'])
+        with self.assertNumQueries(0):
+            values = AvailabilityCache(ttl=60, shared_cache='default').get_many(['AV-1', 'NOPE'])
+        self.assertEqual(values, {'AV-1': 10, 'NOPE': None})
+        AvailabilityCache(shared_cache='default').invalidate(['AV-1', 'NOPE'])
+
+
+class StockLedgerTests(TestCase):
+    """Stock movements, applied at once or folded in by periodic compaction."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.item = create_inventory('LG-1', 10)
+        create_inventory('LG-2', 5)
+
+    def post_movements(self, movements):
+        return self.client.post('/api/inventory/movements/', {'movements': movements}, format='json')
+
+    def test_receipts_are_deferred_and_takes_applied(self):
+        response = self.post_movements([
+            {'sku': 'LG-1', 'movement_type': 'receipt', 'quantity': 5},
+            {'sku': 'LG-1', 'movement_type': 'reservation', 'quantity': 3, 'reference': 'ORD-1'},
+            {'sku': 'LG-2', 'movement_type': 'adjustment', 'quantity': -2},
+        ])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['recorded'], 3)
+        self.item.refresh_from_db()
+        self.assertEqual((self.item.available_quantity, self.item.reserved_quantity), (7, 3))
+        self.assertEqual(Inventory.objects.get(product_sku='LG-2').available_quantity, 3)
+        self.assertEqual(level_at('LG-1'), (12, 3))
+
+    def test_takes_cannot_exceed_stock(self):
+        recorded = StockMovement.objects.count()
+        response = self.post_movements([
+            {'sku': 'LG-1', 'movement_type': 'receipt', 'quantity': 50},
+            {'sku': 'LG-1', 'movement_type': 'reservation', 'quantity': 11},
+        ])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['results'][0]['status'], 'insufficient')
+        response = self.post_movements([{'sku': 'LG-2', 'movement_type': 'adjustment', 'quantity': -6}])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(StockMovement.objects.count(), recorded)
+        self.assertEqual(level_at('LG-1'), (10, 0))
+
+    def test_rejects_unknown_skus_and_bad_quantities(self):
+        recorded = StockMovement.objects.count()
+        response = self.post_movements([{'sku': 'NOPE', 'movement_type': 'receipt', 'quantity': 1}])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['unknown_skus'], ['NOPE'])
+        response = self.post_movements([{'sku': 'LG-1', 'movement_type': 'receipt', 'quantity': -1}])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(StockMovement.objects.count(), recorded)
+
+    def test_compaction_folds_movements_once(self):
+        self.post_movements([
+            {'sku': 'LG-1', 'movement_type': 'reservation', 'quantity': 4},
+            {'sku': 'LG-1', 'movement_type': 'commit', 'quantity': 4},
+            {'sku': 'LG-2', 'movement_type': 'receipt', 'quantity': 7},
+        ])
+        compaction = compact()
+        # The two creations are compacted too.
+        self.assertEqual((compaction.movements_folded, compaction.skus_updated), (5, 2))
+        self.item.refresh_from_db()
+        self.assertEqual((self.item.available_quantity, self.item.reserved_quantity), (6, 0))
+        self.assertEqual(Inventory.objects.get(product_sku='LG-2').available_quantity, 12)
+        self.assertEqual(StockSnapshot.objects.count(), 2)
+        self.assertIsNone(compact())
+        self.assertEqual(level_at('LG-1'), (6, 0))
+
+    def test_history_matches_the_present_after_in_place_writes(self):
+        self.post_movements([{'sku': 'LG-1', 'movement_type': 'receipt', 'quantity': 10}])
+        compact()
+        self.client.post('/api/inventory/reserve/', {'items': [{'sku': 'LG-1', 'quantity': 5}]}, format='json')
+        self.client.post(f'/api/inventory/{self.item.pk}/update_stock/', {'available_quantity': 500}, format='json')
+        self.client.generic(
+            'POST', '/api/inventory/sync/', json.dumps({'product_sku': 'LG-1', 'reserved_quantity': 2}),
+            content_type='application/x-ndjson'
+        )
+        self.assertEqual(level_at('LG-1'), (500, 2))
+        self.assertEqual(level_at('LG-1', timezone.now()), (500, 2))
+        compact()
+        self.assertEqual(level_at('LG-1', timezone.now()), (500, 2))
+
+    def test_level_at_point_in_time(self):
+        self.post_movements([{'sku': 'LG-1', 'movement_type': 'receipt', 'quantity': 5}])
+        compact()
+        checkpoint = timezone.now()
+        self.post_movements([{'sku': 'LG-1', 'movement_type': 'receipt', 'quantity': 20}])
+        StockMovement.objects.filter(movement_type='receipt', available_delta=20).update(
+            created_at=checkpoint + timedelta(seconds=1)
+        )
+        response = self.client.get(f'/api/inventory/{self.item.pk}/level/', {'at': checkpoint.isoformat()})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['available_quantity'], 15)
+        response = self.client.get(f'/api/inventory/{self.item.pk}/level/')
+        self.assertEqual(response.data['available_quantity'], 35)
+        response = self.client.get(f'/api/inventory/{self.item.pk}/level/', {'at': 'yesterday'})
+        self.assertEqual(response.status_code, 400)
+
+
+class WarehouseTests(TestCase):
+    """Warehouses are rows referenced by inventory, with per-warehouse totals."""
+
+    def setUp(self):
+        self.client = APIClient()
+        create_inventory('WH-1', available=50, reserved=5, warehouse='Warehouse A')
+        create_inventory('WH-2', available=3, reserved=1, warehouse='Warehouse A')
+        create_inventory('WH-3', available=8, warehouse='Warehouse B')
+        Warehouse.objects.create(name='Warehouse C')
+
+    def test_totals_per_warehouse_in_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/inventory/warehouses/')
+        self.assertEqual(response.status_code, 200)
+        totals = {row['name']: row for row in response.data}
+        self.assertEqual(
+            [totals['Warehouse A'][key] for key in ('sku_count', 'units_on_hand', 'units_reserved', 'low_stock_count')],
+            [2, 53, 6, 1]
+        )
+        self.assertEqual(totals['Warehouse B']['low_stock_count'], 1)
+        self.assertEqual(totals['Warehouse C']['units_on_hand'], 0)
+
+    def test_create_by_warehouse_name(self):
+        response = self.client.post('/api/inventory/', {
+            'product_sku': 'WH-4',
+            'product_name': 'Product WH-4',
+            'available_quantity': 5,
+            'warehouse_location': 'Warehouse D',
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['warehouse_location'], 'Warehouse D')
+        self.assertEqual(Inventory.objects.get(product_sku='WH-4').warehouse.name, 'Warehouse D')
+        response = self.client.get('/api/inventory/', {'warehouse_location': 'Warehouse D'})
+        self.assertEqual(response.data['count'], 1)
+
+    def test_ids_for_creates_missing_warehouses(self):
+        ids = Warehouse.ids_for(['Warehouse A', 'Warehouse E'])
+        self.assertEqual(ids['Warehouse A'], Warehouse.objects.get(name='Warehouse A').id)
+        self.assertTrue(Warehouse.objects.filter(id=ids['Warehouse E']).exists())
+
+
+class StockAlertTests(TestCase):
+    """Low-stock crossings are detected on the write path and debounced."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.item = create_inventory('AL-1', available=20, threshold=10)
+        create_inventory('AL-2', available=50, threshold=10)
+        self.received = []
+        stock_threshold_crossed.connect(self.receive)
+        self.addCleanup(stock_threshold_crossed.disconnect, self.receive)
+
+    def receive(self, sender, alerts, **kwargs):
+        self.received.extend((alert.product_sku, alert.direction) for alert in alerts)
+
+    def update_stock(self, available):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f'/api/inventory/{self.item.pk}/update_stock/', {'available_quantity': available}, format='json')
+
+    def test_update_stock_crossing_is_delivered(self):
+        self.update_stock(15)
+        self.assertFalse(StockAlert.objects.exists())
+        self.update_stock(4)
+        self.assertEqual(self.received, [('AL-1', 'low')])
+        alert = StockAlert.objects.get()
+        self.assertEqual((alert.state, alert.available_quantity), ('delivered', 4))
+
+    def test_reservation_and_sync_crossings(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/api/inventory/reserve/', {'items': [
+                {'sku': 'AL-1', 'quantity': 15}, {'sku': 'AL-2', 'quantity': 5}
+            ]}, format='json')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.generic(
+                'POST', '/api/inventory/sync/', json.dumps({'product_sku': 'AL-2', 'available_quantity': 3}),
+                content_type='application/x-ndjson'
+            )
+        self.assertEqual(self.received, [('AL-1', 'low'), ('AL-2', 'low')])
+
+    def test_rolled_back_reservation_records_nothing(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/api/inventory/reserve/', {'items': [
+                {'sku': 'AL-1', 'quantity': 15}, {'sku': 'AL-2', 'quantity': 500}
+            ]}, format='json')
+        self.assertFalse(StockAlert.objects.exists())
+
+    def test_flapping_sku_is_debounced(self):
+        self.update_stock(4)
+        self.update_stock(20)
+        self.update_stock(5)
+        self.update_stock(25)
+        self.assertEqual(self.received, [('AL-1', 'low')])
+        self.assertEqual(StockAlert.objects.filter(state='pending').count(), 3)
+
+        with override_settings(INVENTORY_LOW_STOCK_ALERTS={'DEBOUNCE_SECONDS': 0}):
+            with self.captureOnCommitCallbacks(execute=True):
+                dispatch_alerts()
+        self.assertEqual(self.received, [('AL-1', 'low'), ('AL-1', 'recovered')])
+        self.assertEqual(StockAlert.objects.filter(state='superseded').count(), 2)
+
+    @override_settings(INVENTORY_LOW_STOCK_ALERTS={'DEBOUNCE_SECONDS': 0})
+    def test_flap_back_to_delivered_state_is_superseded(self):
+        self.update_stock(4)
+        # Not dispatched on commit: both crossings are still pending below.
+        self.client.post(f'/api/inventory/{self.item.pk}/update_stock/', {'available_quantity': 20}, format='json')
+        self.client.post(f'/api/inventory/{self.item.pk}/update_stock/', {'available_quantity': 3}, format='json')
+        with self.captureOnCommitCallbacks(execute=True):
+            dispatch_alerts()
+        self.assertEqual(self.received, [('AL-1', 'low')])
+        self.assertFalse(StockAlert.objects.filter(state='pending').exists())
+
+    def test_alerts_feed(self):
+        self.update_stock(4)
+        self.client.post('/api/inventory/reserve/', {'items': [{'sku': 'AL-2', 'quantity': 45}]}, format='json')
+        with self.captureOnCommitCallbacks(execute=True):
+            dispatch_alerts()
+        response = self.client.get('/api/inventory/alerts/')
+        self.assertEqual([row['product_sku'] for row in response.data['results']], ['AL-1', 'AL-2'])
+        response = self.client.get('/api/inventory/alerts/', {'after': response.data['results'][0]['id']})
+        self.assertEqual([row['product_sku'] for row in response.data['results']], ['AL-2'])
+        self.assertFalse(response.data['has_more'])
+
+
+class ShardedInventoryTests(TestCase):
+    """Hot SKUs split their stock across shards; the API shows the totals."""
+
+    def setUp(self):
+        self.client = APIClient()
+        availability_cache.clear()
+        self.item = create_inventory('HOT-1', available=100, reserved=4, threshold=10)
+        create_inventory('COLD-1', available=50)
+        set_shard_count('HOT-1', 4)
+
+    def reserve(self, quantity, sku='HOT-1'):
+        return self.client.post('/api/inventory/reserve/', {'items': [{'sku': sku, 'quantity': quantity}]}, format='json')
+
+    def shard_values(self, field='available_quantity'):
+        return list(InventoryShard.objects.filter(inventory=self.item).values_list(field, flat=True))
+
+    def test_sharding_spreads_and_folds_back(self):
+        self.assertEqual(self.shard_values(), [25, 25, 25, 25])
+        self.assertEqual(self.shard_values('reserved_quantity'), [1, 1, 1, 1])
+        self.item.refresh_from_db()
+        self.assertEqual((self.item.available_quantity, self.item.reserved_quantity, self.item.shard_count), (0, 0, 4))
+        set_shard_count('HOT-1', 0)
+        self.item.refresh_from_db()
+        self.assertEqual((self.item.available_quantity, self.item.reserved_quantity), (100, 4))
+        self.assertFalse(InventoryShard.objects.exists())
+
+    def test_reservation_touches_one_shard(self):
+        response = self.reserve(5)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(self.shard_values()), [20, 25, 25, 25])
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.available_quantity, 0)
+        response = self.client.get(f'/api/inventory/{self.item.pk}/')
+        self.assertEqual((response.data['available_quantity'], response.data['reserved_quantity']), (95, 9))
+        self.assertNotIn('shard_count', response.data)
+        self.assertEqual(availability_cache.get('HOT-1'), 95)
+
+    def test_reservation_larger_than_a_shard_respreads(self):
+        self.assertEqual(self.reserve(60).status_code, 200)
+        self.assertEqual(self.shard_values(), [10, 10, 10, 10])
+        self.assertEqual(self.reserve(41).data['results'][0]['status'], 'insufficient')
+        self.assertEqual(sum(self.shard_values()), 40)
+
+    def test_absolute_write_replaces_the_total(self):
+        self.client.post(f'/api/inventory/{self.item.pk}/update_stock/', {'available_quantity': 30}, format='json')
+        self.assertEqual(self.shard_values(), [0, 0, 0, 0])
+        response = self.client.get(f'/api/inventory/{self.item.pk}/')
+        self.assertEqual((response.data['available_quantity'], response.data['reserved_quantity']), (30, 4))
+        self.assertEqual(level_at('HOT-1'), (30, 4))
+        self.assertEqual(self.reserve(30).status_code, 200)
+        self.assertEqual(self.client.get(f'/api/inventory/{self.item.pk}/').data['available_quantity'], 0)
+
+    def test_low_stock_and_warehouse_totals_use_shards(self):
+        response = self.client.get('/api/inventory/low_stock/')
+        self.assertEqual(response.data['count'], 0)
+        self.reserve(92)
+        response = self.client.get('/api/inventory/low_stock/')
+        self.assertEqual([row['product_sku'] for row in response.data['results']], ['HOT-1'])
+        self.assertEqual(response.data['results'][0]['available_quantity'], 8)
+        row = self.client.get('/api/inventory/warehouses/').data[0]
+        self.assertEqual((row['units_on_hand'], row['units_reserved'], row['low_stock_count']), (58, 96, 1))
+
+
+class AvailabilitySnapshotTests(TestCase):
+    """Binary availability snapshot with mmap lookups and conditional GET."""
+
+    def setUp(self):
+        self.client = APIClient()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, 'availability.bin')
+        settings = override_settings(INVENTORY_AVAILABILITY_SNAPSHOT={'PATH': self.path})
+        settings.enable()
+        self.addCleanup(settings.disable)
+        create_inventory('SNAP-B', available=7, warehouse='Warehouse A')
+        create_inventory('SNAP-A', available=12, warehouse='Warehouse B')
+        create_inventory('SNAP-C', available=0, warehouse='Warehouse A')
+
+    def test_reader_looks_up_every_warehouse(self):
+        write_snapshot()
+        with SnapshotReader() as reader:
+            self.assertEqual(reader.sku_count, 3)
+            self.assertEqual(reader.lookup('SNAP-A'), {'Warehouse A': 0, 'Warehouse B': 12})
+            self.assertEqual(reader.lookup('SNAP-B'), {'Warehouse A': 7, 'Warehouse B': 0})
+            self.assertIsNone(reader.lookup('SNAP'))
+            self.assertIsNone(reader.lookup('SNAP-ZZZZ'))
+
+    def test_version_only_changes_with_data(self):
+        first = write_snapshot()
+        self.assertEqual(write_snapshot()['version'], first['version'])
+        Inventory.objects.filter(product_sku='SNAP-C').update(available_quantity=3)
+        self.assertNotEqual(write_snapshot()['version'], first['version'])
+
+    def test_conditional_get(self):
+        self.assertEqual(self.client.get('/api/inventory/snapshot/').status_code, 404)
+        write_snapshot()
+        response = self.client.get('/api/inventory/snapshot/')
+        self.assertEqual(response.status_code, 200)
+        with open(self.path, 'rb') as snapshot:
+            self.assertEqual(b''.join(response.streaming_content), snapshot.read())
+        etag = response['ETag']
+        response = self.client.get('/api/inventory/snapshot/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        Inventory.objects.filter(product_sku='SNAP-A').update(available_quantity=1)
+        write_snapshot()
+        response = self.client.get('/api/inventory/snapshot/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        response.close()
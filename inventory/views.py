@@ -1,13 +1,37 @@
+import os
+
 from rest_framework import viewsets, filters, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import Inventory
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce
+from django.db.models.lookups import LessThanOrEqual
+from django.http import FileResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.dateparse import parse_datetime
+from django.utils.http import http_date
+from common.records import iter_records
+from .cache import availability_cache
+from .filters import InventoryFilter
+from .ledger import level_at, post_movements
+from .models import Inventory, StockAlert, Warehouse, stock_total
 from .serializers import (
     InventorySerializer, 
     InventoryListSerializer, 
-    InventoryUpdateSerializer
+    InventoryUpdateSerializer,
+    StockOperationSerializer,
+    StockMovementBatchSerializer,
+    WarehouseStockSerializer,
+    StockAlertSerializer
 )
+from .snapshot import HEADER, SnapshotFormatError, read_header, snapshot_path
+from .stock import apply_stock_operation
+from .sync import SYNC_CONTENT_TYPES, SnapshotSync
+
+MAX_AVAILABILITY_SKUS = 500
+ALERT_PAGE_SIZE = 500
 
 
 class InventoryViewSet(viewsets.ModelViewSet):
@@ -23,12 +47,22 @@ class InventoryViewSet(viewsets.ModelViewSet):
     - DELETE /api/inventory/{id}/ - Delete an inventory item
     - GET /api/inventory/low_stock/ - List low stock items
     - POST /api/inventory/{id}/update_stock/ - Update stock levels
+    - POST /api/inventory/reserve/ - Reserve stock for a list of SKUs
+    - POST /api/inventory/release/ - Release reserved stock for a list of SKUs
+    - POST /api/inventory/commit/ - Commit reserved stock for a list of SKUs
+    - POST /api/inventory/sync/ - Upsert a CSV or NDJSON stock snapshot by SKU
+    - GET /api/inventory/availability/?skus= - Cached availability for SKUs
+    - POST /api/inventory/movements/ - Append movements to the stock ledger
+    - GET /api/inventory/{id}/level/?at= - Stock level at a point in time
+    - GET /api/inventory/warehouses/ - Stock totals per warehouse
+    - GET /api/inventory/alerts/?after= - Delivered low-stock alerts
+    - GET /api/inventory/snapshot/ - Binary availability snapshot (conditional GET)
     """
     
-    queryset = Inventory.objects.all()
+    queryset = Inventory.objects.select_related('warehouse').with_totals()
     serializer_class = InventorySerializer
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['warehouse_location']
+    filterset_class = InventoryFilter
     search_fields = ['product_sku', 'product_name']
     ordering_fields = ['available_quantity', 'updated_at']
     
@@ -38,12 +72,24 @@ class InventoryViewSet(viewsets.ModelViewSet):
             return InventoryListSerializer
         elif self.action == 'update_stock':
             return InventoryUpdateSerializer
+        elif self.action in ['reserve', 'release', 'commit']:
+            return StockOperationSerializer
+        elif self.action == 'movements':
+            return StockMovementBatchSerializer
         return InventorySerializer
     
     @action(detail=False, methods=['get'])
     def low_stock(self, request):
-        """Get all low stock items."""
-        low_stock_items = [item for item in self.queryset.all() if item.is_low_stock]
+        """Get low stock items, paginated and filterable by warehouse."""
+        # The column test uses the partial index; sharded SKUs are then checked on their totals.
+        low_stock_items = self.filter_queryset(self.get_queryset()).filter(
+            Q(shard_count=0) | Q(total_available__lte=F('low_stock_threshold')),
+            available_quantity__lte=F('low_stock_threshold'),
+        )
+        page = self.paginate_queryset(low_stock_items)
+        if page is not None:
+            serializer = InventoryListSerializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
         serializer = InventoryListSerializer(low_stock_items, many=True)
         return Response(serializer.data)
     
@@ -56,3 +102,192 @@ class InventoryViewSet(viewsets.ModelViewSet):
             serializer.save()
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    @action(detail=False, methods=['get'])
+    def availability(self, request):
+        """Get available quantities for comma-separated SKUs from the cache."""
+        skus = [sku.strip() for sku in request.query_params.get('skus', '').split(',') if sku.strip()]
+        if not skus:
+            return Response({'skus': ['This parameter is required.']}, status=status.HTTP_400_BAD_REQUEST)
+        if len(skus) > MAX_AVAILABILITY_SKUS:
+            return Response(
+                {'skus': [f'At most {MAX_AVAILABILITY_SKUS} SKUs per request.']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        quantities = availability_cache.get_many(skus)
+        return Response({
+            sku: {
+                'available_quantity': quantity,
+                'in_stock': bool(quantity and quantity > 0),
+            }
+            for sku, quantity in quantities.items()
+        })
+    
+    def _stock_operation(self, request, operation):
+        serializer = StockOperationSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        allow_partial = serializer.validated_data['allow_partial']
+        applied, results = apply_stock_operation(
+            operation, serializer.validated_data['items'], allow_partial
+        )
+        if applied:
+            response_status = status.HTTP_200_OK
+        elif allow_partial:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_409_CONFLICT
+        return Response({
+            'operation': operation,
+            'applied': applied,
+            'results': results,
+        }, status=response_status)
+    
+    @action(detail=False, methods=['post'])
+    def reserve(self, request):
+        """Move quantities from available to reserved stock."""
+        return self._stock_operation(request, 'reserve')
+    
+    @action(detail=False, methods=['post'])
+    def release(self, request):
+        """Move quantities from reserved back to available stock."""
+        return self._stock_operation(request, 'release')
+    
+    @action(detail=False, methods=['post'])
+    def commit(self, request):
+        """Remove reserved quantities once the goods have left the warehouse."""
+        return self._stock_operation(request, 'commit')
+    
+    @action(detail=False, methods=['post'])
+    def sync(self, request):
+        """
+        Apply a full or partial stock snapshot keyed on product_sku.
+        
+        The body is streamed as CSV (text/csv, with a header row) or NDJSON
+        (application/x-ndjson) and upserted in chunks; rows whose values are
+        unchanged are skipped.
+        """
+        content_type = request.content_type.split(';')[0].strip()
+        if content_type not in SYNC_CONTENT_TYPES:
+            return Response(
+                {'detail': f"Content type must be one of: {', '.join(SYNC_CONTENT_TYPES)}"},
+                status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+            )
+        stream = request.stream if request.stream is not None else []
+        records = iter_records(stream, content_type, request.encoding or 'utf-8')
+        result = SnapshotSync().run(records)
+        return Response(result.summary(), status=status.HTTP_200_OK)
+    
+    @action(detail=False, methods=['post'])
+    def movements(self, request):
+        """
+        Append movements to the stock ledger, all or nothing.
+        
+        Receipts and positive adjustments are only inserted; inventory
+        quantities change when the compact_stock_movements command folds them
+        in. Reservations, releases, commits and negative adjustments are
+        applied at once and fail with 409 when the stock cannot cover them.
+        """
+        serializer = StockMovementBatchSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        lines = serializer.validated_data['movements']
+        
+        skus = {line['sku'] for line in lines}
+        known = set(Inventory.objects.filter(product_sku__in=skus).values_list('product_sku', flat=True))
+        unknown = sorted(skus - known)
+        if unknown:
+            return Response({'unknown_skus': unknown}, status=status.HTTP_400_BAD_REQUEST)
+        
+        applied, results = post_movements(lines)
+        if not applied:
+            return Response({'applied': False, 'results': results}, status=status.HTTP_409_CONFLICT)
+        return Response({'recorded': len(lines)}, status=status.HTTP_201_CREATED)
+    
+    @action(detail=True, methods=['get'])
+    def level(self, request, pk=None):
+        """Get stock level including unfolded movements, optionally as of ?at=."""
+        inventory = self.get_object()
+        at = None
+        if 'at' in request.query_params:
+            at = parse_datetime(request.query_params['at'])
+            if at is None:
+                return Response({'at': ['Must be an ISO 8601 datetime.']}, status=status.HTTP_400_BAD_REQUEST)
+            if timezone.is_naive(at):
+                at = timezone.make_aware(at)
+        available, reserved = level_at(inventory.product_sku, at)
+        return Response({
+            'product_sku': inventory.product_sku,
+            'at': at or timezone.now(),
+            'available_quantity': available,
+            'reserved_quantity': reserved,
+        })
+    
+    @action(detail=False, methods=['get'])
+    def warehouses(self, request):
+        """Get SKU counts, units on hand, units reserved and low-stock counts per warehouse."""
+        available = stock_total('available_quantity', 'inventory_items__')
+        warehouses = Warehouse.objects.annotate(
+            sku_count=Count('inventory_items'),
+            units_on_hand=Coalesce(Sum(available), 0),
+            units_reserved=Coalesce(Sum(stock_total('reserved_quantity', 'inventory_items__')), 0),
+            low_stock_count=Count(
+                'inventory_items',
+                filter=LessThanOrEqual(available, F('inventory_items__low_stock_threshold'))
+            ),
+        ).order_by('name')
+        serializer = WarehouseStockSerializer(warehouses, many=True)
+        return Response(serializer.data)
+    
+    @action(detail=False, methods=['get'])
+    def alerts(self, request):
+        """
+        Get delivered low-stock threshold-crossing alerts, oldest first.
+        
+        Subscribers poll with ?after=<id of the last alert seen>.
+        """
+        try:
+            after = int(request.query_params.get('after', 0))
+        except ValueError:
+            return Response({'after': ['Must be an integer.']}, status=status.HTTP_400_BAD_REQUEST)
+        alerts = list(
+            StockAlert.objects.filter(state='delivered', id__gt=after).order_by('id')[:ALERT_PAGE_SIZE + 1]
+        )
+        has_more = len(alerts) > ALERT_PAGE_SIZE
+        alerts = alerts[:ALERT_PAGE_SIZE]
+        return Response({
+            'after': alerts[-1].id if alerts else after,
+            'has_more': has_more,
+            'results': StockAlertSerializer(alerts, many=True).data,
+        })
+    
+    @action(detail=False, methods=['get'])
+    def snapshot(self, request):
+        """
+        Download the binary availability snapshot (see inventory/snapshot.py).
+        
+        The ETag is the snapshot version; clients sending it back in
+        If-None-Match get 304 Not Modified until a new version is written.
+        """
+        try:
+            snapshot_file = open(snapshot_path(), 'rb')
+        except FileNotFoundError:
+            return Response({'detail': 'No availability snapshot has been written yet.'}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            header = read_header(snapshot_file.read(HEADER.size))
+        except SnapshotFormatError as exc:
+            snapshot_file.close()
+            return Response({'detail': str(exc)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        
+        etag = f'"{header["version"]:016x}"'
+        last_modified = int(os.fstat(snapshot_file.fileno()).st_mtime)
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is not None:
+            snapshot_file.close()
+        else:
+            snapshot_file.seek(0)
+            response = FileResponse(snapshot_file, content_type='application/octet-stream')
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        response['Cache-Control'] = 'no-cache'
+        return response
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Order, OrderItem
+from .models import Order, OrderItem, OrderReconciliationIssue
 
 
 class OrderItemInline(admin.TabularInline):
@@ -26,3 +26,15 @@ class OrderItemAdmin(admin.ModelAdmin):
     
     list_display = ('order', 'product_name', 'quantity', 'unit_price', 'total_price')
     search_fields = ('product_name', 'product_sku')
+
+
+@admin.register(OrderReconciliationIssue)
+class OrderReconciliationIssueAdmin(admin.ModelAdmin):
+    """Admin interface for OrderReconciliationIssue model."""
+    
+    list_display = ('order', 'recorded_total', 'items_total', 'computed_total', 'mismatched_lines', 'repaired', 'detected_at')
+    list_filter = ('repaired', 'detected_at')
+    search_fields = ('order__order_id',)
+    list_select_related = ('order',)
+    ordering = ('-detected_at',)
+    readonly_fields = ('detected_at',)
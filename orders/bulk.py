@@ -0,0 +1,91 @@
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+from .models import Order, OrderItem, next_pending_sequence, normalize_phone
+from .serializers import OrderBulkSerializer
+from .signals import orders_bulk_changed
+
+BULK_CHUNK_SIZE = 1000
+
+
+def ingest_orders(rows, chunk_size=BULK_CHUNK_SIZE):
+    """
+    Validate and insert a batch of orders with nested items.
+    
+    Rows are validated up front with a single serializer instance. Valid rows
+    are inserted in chunks, each chunk in its own transaction, using one
+    uniqueness query and two bulk inserts per chunk. Returns one result dict
+    per input row, in input order.
+    """
+    results = [None] * len(rows)
+    valid = []
+    seen = set()
+    validator = OrderBulkSerializer()
+    
+    for index, row in enumerate(rows):
+        try:
+            data = validator.run_validation(row)
+        except serializers.ValidationError as exc:
+            results[index] = {'index': index, 'status': 'error', 'errors': exc.detail}
+            continue
+        if data['order_id'] in seen:
+            results[index] = {
+                'index': index,
+                'status': 'error',
+                'errors': {'order_id': ['Duplicate order_id in batch.']},
+            }
+            continue
+        seen.add(data['order_id'])
+        valid.append((index, data))
+    
+    for start in range(0, len(valid), chunk_size):
+        _insert_chunk(valid[start:start + chunk_size], results)
+    return results
+
+
+def _insert_chunk(chunk, results):
+    """Insert one chunk of validated rows and record their results."""
+    order_ids = [data['order_id'] for _, data in chunk]
+    with transaction.atomic():
+        existing = set(
+            Order.objects.filter(order_id__in=order_ids).values_list('order_id', flat=True)
+        )
+        pending = []
+        for index, data in chunk:
+            if data['order_id'] in existing:
+                results[index] = {
+                    'index': index,
+                    'status': 'error',
+                    'errors': {'order_id': ['Order with this order_id already exists.']},
+                }
+                continue
+            items = data.pop('items', [])
+            # bulk_create bypasses Order.save(), so normalize and number queue moves here.
+            order = Order(**data, customer_phone_normalized=normalize_phone(data['customer_phone']))
+            pending.append((index, order, items))
+        
+        queued = [order for _, order, _ in pending if order.status == 'pending']
+        if queued:
+            sequence = next_pending_sequence()
+            for order in queued:
+                order.pending_sequence = sequence
+        orders = Order.objects.bulk_create([order for _, order, _ in pending])
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, **item)
+            for order, (_, _, items) in zip(orders, pending)
+            for item in items
+        ])
+    
+    if orders:
+        orders_bulk_changed.send(
+            sender=Order, days={timezone.localdate(order.order_date) for order in orders}
+        )
+    
+    for order, (index, _, items) in zip(orders, pending):
+        results[index] = {
+            'index': index,
+            'status': 'created',
+            'id': order.pk,
+            'order_id': order.order_id,
+            'items_count': len(items),
+        }
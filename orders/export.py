@@ -0,0 +1,66 @@
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_FIELDS = [
+    'order_id', 'order_date', 'status', 'payment_method', 'customer_name',
+    'customer_phone', 'total_amount', 'product_sku', 'product_name',
+    'quantity', 'unit_price', 'total_price',
+]
+
+
+def iter_order_rows(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield one flat dict per order line item.
+    
+    Orders are fetched in chunks with their items prefetched per chunk, so
+    memory use does not depend on the size of the export. Orders without
+    items produce a single row with empty item columns.
+    """
+    for order in queryset.prefetch_related('items').iterator(chunk_size=chunk_size):
+        base = {
+            'order_id': order.order_id,
+            'order_date': order.order_date,
+            'status': order.status,
+            'payment_method': order.payment_method,
+            'customer_name': order.customer_name,
+            'customer_phone': order.customer_phone,
+            'total_amount': order.total_amount,
+        }
+        items = order.items.all()
+        if not items:
+            yield {**base, 'product_sku': None, 'product_name': None, 'quantity': None,
+                   'unit_price': None, 'total_price': None}
+            continue
+        for item in items:
+            yield {
+                **base,
+                'product_sku': item.product_sku,
+                'product_name': item.product_name,
+                'quantity': item.quantity,
+                'unit_price': item.unit_price,
+                'total_price': item.total_price,
+            }
+
+
+class Echo:
+    """File-like object whose write() returns the value instead of buffering it."""
+    
+    def write(self, value):
+        return value
+
+
+def stream_csv(queryset):
+    writer = csv.DictWriter(Echo(), fieldnames=EXPORT_FIELDS)
+    yield writer.writeheader()
+    for row in iter_order_rows(queryset):
+        row['order_date'] = row['order_date'].isoformat()
+        yield writer.writerow(row)
+
+
+def stream_ndjson(queryset):
+    for row in iter_order_rows(queryset):
+        yield json.dumps(row, cls=DjangoJSONEncoder) + '\n'
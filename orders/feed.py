@@ -0,0 +1,67 @@
+import base64
+import binascii
+
+from django.conf import settings
+from .models import Order
+
+FEED_PAGE_SIZE = 500
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def feed_options():
+    options = getattr(settings, 'ORDER_PENDING_FEED', {})
+    return {
+        'DEFAULT_TIMEOUT': options.get('DEFAULT_TIMEOUT', 10),
+        'MAX_TIMEOUT': options.get('MAX_TIMEOUT', 25),
+        'POLL_INTERVAL': options.get('POLL_INTERVAL', 1),
+    }
+
+
+def encode_cursor(sequence, pk):
+    """Encode a (pending_sequence, id) position as an opaque cursor string."""
+    raw = f'{sequence}|{pk}'.encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        sequence, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return int(sequence), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursor('Invalid cursor.')
+
+
+def current_cursor():
+    """Return a cursor positioned after the latest pending queue change."""
+    latest = (
+        Order.objects.filter(pending_sequence__isnull=False)
+        .order_by('-pending_sequence', '-id').values_list('pending_sequence', 'id').first()
+    )
+    return encode_cursor(*(latest or (0, 0)))
+
+
+def changes_since(cursor, limit=FEED_PAGE_SIZE):
+    """
+    Return orders that entered or left the pending queue after `cursor`,
+    oldest first, and the next cursor.
+    
+    Only queue moves number pending_sequence, so the seek on its index costs
+    in proportion to pending queue changes, not to all order updates. The
+    numbers follow commit order (see models.next_pending_sequence), so no
+    move can appear behind a cursor that was already handed out.
+    """
+    sequence, pk = decode_cursor(cursor)
+    changed = (
+        Order.objects.filter(pending_sequence__gte=sequence)
+        .exclude(pending_sequence=sequence, id__lte=pk)
+        .order_by('pending_sequence', 'id')
+    )
+    orders = list(changed[:limit + 1])
+    has_more = len(orders) > limit
+    orders = orders[:limit]
+    if orders:
+        cursor = encode_cursor(orders[-1].pending_sequence, orders[-1].pk)
+    return orders, cursor, has_more
@@ -0,0 +1,13 @@
+from django_filters import rest_framework as filters
+from .models import Order
+
+
+class OrderFilter(filters.FilterSet):
+    """Filters for order listings, including an order date range."""
+    
+    # ?order_date_after=YYYY-MM-DD&order_date_before=YYYY-MM-DD
+    order_date = filters.DateFromToRangeFilter()
+    
+    class Meta:
+        model = Order
+        fields = ['status', 'payment_method', 'order_date']
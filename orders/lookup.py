@@ -0,0 +1,30 @@
+import re
+
+from django.db.models import Q
+from .models import normalize_phone
+
+PHONE_PATTERN = re.compile(r'^\+?[\d\s\-()]+$')
+
+
+def prefix_filter(field, prefix):
+    """
+    Build an index-friendly prefix match as a half-open range.
+    
+    `startswith` becomes LIKE on SQLite, which cannot use a plain index
+    because LIKE is case-insensitive there; a range comparison can.
+    """
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return Q(**{f'{field}__gte': prefix, f'{field}__lt': upper})
+
+
+def lookup_filter(query, mode='exact', include_name=False):
+    """Return a Q matching orders by order_id or normalized phone."""
+    match = (lambda field, value: Q(**{field: value})) if mode == 'exact' else prefix_filter
+    condition = match('order_id', query)
+    if PHONE_PATTERN.match(query):
+        phone = normalize_phone(query)
+        if phone:
+            condition |= match('customer_phone_normalized', phone)
+    if include_name:
+        condition |= Q(customer_name__icontains=query)
+    return condition
@@ -0,0 +1,147 @@
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+from orders.models import Order, OrderItem, normalize_phone
+
+HOT_INDEXES = [
+    (Order, 'order_status_date_idx'),
+    (Order, 'order_payment_date_idx'),
+    (OrderItem, 'orderitem_sku_idx'),
+]
+STATUSES = [choice for choice, _ in Order.STATUS_CHOICES]
+PAYMENT_METHODS = ['UPI', 'CARD', 'COD', 'WALLET', 'NETBANKING']
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the order hot-filter indexes on a synthetic order table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orders', type=int, default=1_000_000, help='Number of synthetic orders')
+        parser.add_argument('--skus', type=int, default=5_000, help='Number of distinct product SKUs')
+        parser.add_argument('--repeat', type=int, default=20, help='Timed runs per query')
+        parser.add_argument('--batch-size', type=int, default=50_000)
+
+    def handle(self, *args, **options):
+        self.options = options
+        try:
+            with transaction.atomic():
+                self.seed()
+            self.stdout.write(self.style.MIGRATE_HEADING('Without hot-filter indexes'))
+            self.toggle_indexes(present=False)
+            before = self.run_queries()
+            self.stdout.write(self.style.MIGRATE_HEADING('With hot-filter indexes'))
+            self.toggle_indexes(present=True)
+            after = self.run_queries()
+        finally:
+            self.cleanup()
+
+        self.stdout.write(self.style.MIGRATE_HEADING('Summary (median ms)'))
+        for label in before:
+            speedup = before[label] / after[label] if after[label] else float('inf')
+            self.stdout.write(
+                f'  {label:<28} {before[label]:>10.3f} -> {after[label]:>8.3f}  ({speedup:.0f}x)'
+            )
+
+    def seed(self):
+        """Insert synthetic orders with one line item each using raw executemany."""
+        total = self.options['orders']
+        batch_size = self.options['batch_size']
+        skus = self.options['skus']
+        rng = random.Random(42)
+        now = timezone.now()
+        order_table = Order._meta.db_table
+        item_table = OrderItem._meta.db_table
+        self.stdout.write(f'Seeding {total} orders...')
+        started = time.perf_counter()
+
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT COALESCE(MAX(id), 0) FROM {order_table}')
+            next_id = cursor.fetchone()[0] + 1
+            for start in range(0, total, batch_size):
+                orders = []
+                items = []
+                for offset in range(min(batch_size, total - start)):
+                    pk = next_id + start + offset
+                    placed = now - timedelta(seconds=rng.randrange(90 * 86400))
+                    # Most historical orders are closed; a small queue stays pending.
+                    status = 'pending' if rng.random() < 0.01 else rng.choice(STATUSES[1:])
+                    phone = f'+9198{pk:08d}'
+                    orders.append((
+                        pk, f'BENCH{pk}', 'Bench Customer', phone, normalize_phone(phone), 'Bench Address',
+                        '100.00', status, rng.choice(PAYMENT_METHODS), placed, placed,
+                    ))
+                    items.append((
+                        pk, 'Bench Product', f'SKU{rng.randrange(skus):06d}', 1, '100.00', '100.00',
+                    ))
+                cursor.executemany(
+                    f'INSERT INTO {order_table} (id, order_id, customer_name, customer_phone, '
+                    'customer_phone_normalized, customer_address, total_amount, status, payment_method, '
+                    'order_date, updated_at) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)',
+                    orders,
+                )
+                cursor.executemany(
+                    f'INSERT INTO {item_table} (order_id, product_name, product_sku, quantity, '
+                    'unit_price, total_price) VALUES (%s, %s, %s, %s, %s, %s)',
+                    items,
+                )
+            if connection.vendor == 'sqlite':
+                cursor.execute('ANALYZE')
+        self.stdout.write(f'Seeded in {time.perf_counter() - started:.1f}s')
+
+    def toggle_indexes(self, present):
+        with connection.schema_editor() as editor:
+            for model, name in HOT_INDEXES:
+                index = next(index for index in model._meta.indexes if index.name == name)
+                if present:
+                    editor.add_index(model, index)
+                else:
+                    editor.remove_index(model, index)
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+    def cleanup(self):
+        """Delete the synthetic rows and make sure every index is back in place."""
+        self.stdout.write('Removing synthetic data...')
+        with connection.cursor() as cursor:
+            existing = connection.introspection.get_constraints(cursor, Order._meta.db_table)
+            existing.update(connection.introspection.get_constraints(cursor, OrderItem._meta.db_table))
+        missing = [(model, name) for model, name in HOT_INDEXES if name not in existing]
+        if missing:
+            with connection.schema_editor() as editor:
+                for model, name in missing:
+                    editor.add_index(model, next(i for i in model._meta.indexes if i.name == name))
+        order_table = Order._meta.db_table
+        item_table = OrderItem._meta.db_table
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {item_table} WHERE order_id IN '
+                f'(SELECT id FROM {order_table} WHERE order_id LIKE %s)',
+                ['BENCH%'],
+            )
+            cursor.execute(f'DELETE FROM {order_table} WHERE order_id LIKE %s', ['BENCH%'])
+
+    def run_queries(self):
+        queries = {
+            'pending queue': lambda: Order.objects.filter(status='pending').order_by('-order_date'),
+            'payment method (first page)': lambda: Order.objects.filter(payment_method='COD').order_by('-order_date')[:10],
+            'items for one SKU': lambda: OrderItem.objects.filter(product_sku='SKU000042'),
+        }
+        timings = {}
+        for label, build in queries.items():
+            self.stdout.write(f'  {label}')
+            for line in build().explain().splitlines():
+                self.stdout.write(f'    {line}')
+            samples = []
+            for _ in range(self.options['repeat']):
+                started = time.perf_counter()
+                list(build())
+                samples.append((time.perf_counter() - started) * 1000)
+            timings[label] = statistics.median(samples)
+            self.stdout.write(f'    median {timings[label]:.3f} ms over {len(samples)} runs')
+        return timings
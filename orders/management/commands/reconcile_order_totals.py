@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from orders.reconcile import RECONCILE_CHUNK_SIZE, reconcile
+
+
+class Command(BaseCommand):
+    help = 'Find orders whose totals disagree with their line items, optionally repairing them'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repair', action='store_true', help='Rewrite line and order totals from quantity * unit_price')
+        parser.add_argument('--chunk-size', type=int, default=RECONCILE_CHUNK_SIZE, help='Orders per primary-key chunk')
+
+    def handle(self, *args, **options):
+        def progress(position, high, found):
+            if options['verbosity'] > 1:
+                self.stdout.write(f'  scanned up to id {min(position, high)} of {high}, {found} mismatched')
+
+        found = reconcile(chunk_size=options['chunk_size'], fix=options['repair'], progress=progress)
+        if found:
+            action = 'Repaired' if options['repair'] else 'Found'
+            self.stdout.write(self.style.WARNING(f'{action} {found} mismatched order(s); see Order reconciliation issues in the admin.'))
+        else:
+            self.stdout.write(self.style.SUCCESS('All order totals match their line items.'))
@@ -0,0 +1,46 @@
+# Generated by Django 6.0 on 2026-10-18 15:47
+
+import re
+
+from django.db import migrations, models
+
+
+def normalize_phone(phone):
+    # Frozen copy of orders.models.normalize_phone, so later changes to it
+    # don't change what this migration does.
+    phone = (phone or '').strip()
+    digits = re.sub(r'\D', '', phone)
+    international = phone.startswith('+') or digits.startswith('00')
+    digits = digits.lstrip('0')
+    if digits.startswith('91') and (international or len(digits) > 10):
+        digits = digits[2:]
+    return digits[-10:]
+
+
+def backfill_customer_phone_normalized(apps, schema_editor):
+    Order = apps.get_model('orders', 'Order')
+    batch = []
+    for order in Order.objects.only('id', 'customer_phone').iterator(chunk_size=2000):
+        order.customer_phone_normalized = normalize_phone(order.customer_phone)
+        batch.append(order)
+        if len(batch) >= 2000:
+            Order.objects.bulk_update(batch, ['customer_phone_normalized'])
+            batch = []
+    if batch:
+        Order.objects.bulk_update(batch, ['customer_phone_normalized'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_updated_at_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='customer_phone_normalized',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=20),
+        ),
+        migrations.RunPython(backfill_customer_phone_normalized, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 6.0 on 2026-10-18 15:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0005_customer_phone_normalized'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderReconciliationIssue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recorded_total', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('items_total', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('computed_total', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('mismatched_lines', models.IntegerField(default=0)),
+                ('repaired', models.BooleanField(default=False)),
+                ('detected_at', models.DateTimeField(auto_now_add=True)),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reconciliation_issues', to='orders.order')),
+            ],
+            options={
+                'ordering': ['-detected_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 6.0 on 2026-10-18 16:40
+
+from django.db import migrations, models
+
+
+def backfill_pending_sequence(apps, schema_editor):
+    # Pending orders, and orders whose last update may have taken them out of
+    # the queue, share the first number; spurious 'removed' events are harmless.
+    Order = apps.get_model('orders', 'Order')
+    PendingQueueSequence = apps.get_model('orders', 'PendingQueueSequence')
+    Order.objects.filter(status__in=['pending', 'confirmed', 'cancelled']).update(pending_sequence=1)
+    PendingQueueSequence.objects.create(pk=1, value=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0006_orderreconciliationissue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingQueueSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='pending_sequence',
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_pending_sequence, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['pending_sequence', 'id'], name='order_pending_sequence_idx'),
+        ),
+    ]
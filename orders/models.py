@@ -1,4 +1,48 @@
-from django.db import models
+import re
+
+from django.db import models, transaction
+from django.db.models import F
+
+
+def normalize_phone(phone):
+    """
+    Reduce a phone number to its national digits.
+    
+    Drops the 0 trunk prefix and the 91 country code when it is written as
+    +91/0091 or precedes ten more digits, so partial numbers such as
+    '+91 98765' normalize to a prefix of the full number.
+    """
+    phone = (phone or '').strip()
+    digits = re.sub(r'\D', '', phone)
+    international = phone.startswith('+') or digits.startswith('00')
+    digits = digits.lstrip('0')
+    if digits.startswith('91') and (international or len(digits) > 10):
+        digits = digits[2:]
+    return digits[-10:]
+
+
+class PendingQueueSequence(models.Model):
+    """Single-row counter numbering the transactions that move orders into or out of the pending queue."""
+    
+    value = models.BigIntegerField(default=0)
+    
+    def __str__(self):
+        return f"Pending queue sequence {self.value}"
+
+
+def next_pending_sequence():
+    """
+    Number the current transaction's pending queue moves.
+    
+    Must run inside a transaction and before any order rows are locked. The
+    counter row stays locked until the transaction ends, so numbers follow
+    commit order and a feed cursor never passes a move that commits later.
+    """
+    counter = PendingQueueSequence.objects.filter(pk=1)
+    if not counter.update(value=F('value') + 1):
+        PendingQueueSequence.objects.get_or_create(pk=1)
+        counter.update(value=F('value') + 1)
+    return counter.values_list('value', flat=True).get()
 
 
 class Order(models.Model):
@@ -14,9 +58,21 @@ class Order(models.Model):
         ('returned', 'Returned'),
     ]
     
+    # Allowed status transitions; terminal statuses have no successors.
+    STATUS_TRANSITIONS = {
+        'pending': ('confirmed', 'cancelled'),
+        'confirmed': ('processing', 'cancelled'),
+        'processing': ('shipped', 'cancelled'),
+        'shipped': ('delivered', 'returned'),
+        'delivered': ('returned',),
+        'cancelled': (),
+        'returned': (),
+    }
+    
     order_id = models.CharField(max_length=100, unique=True)
     customer_name = models.CharField(max_length=255)
     customer_phone = models.CharField(max_length=20)
+    customer_phone_normalized = models.CharField(max_length=20, blank=True, editable=False, db_index=True)
     customer_address = models.TextField()
     total_amount = models.DecimalField(max_digits=10, decimal_places=2)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
@@ -24,12 +80,58 @@ class Order(models.Model):
     order_date = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     delivery_date = models.DateTimeField(null=True, blank=True)
+    # Sequence number of the transaction that last moved the order into or out
+    # of the pending queue (see next_pending_sequence); null if never pending.
+    pending_sequence = models.BigIntegerField(null=True, blank=True, editable=False)
     
     class Meta:
         ordering = ['-order_date']
+        indexes = [
+            models.Index(fields=['-order_date', '-id'], name='order_date_id_idx'),
+            models.Index(fields=['status', '-order_date'], name='order_status_date_idx'),
+            models.Index(fields=['payment_method', '-order_date'], name='order_payment_date_idx'),
+            models.Index(fields=['updated_at', 'id'], name='order_updated_id_idx'),
+            models.Index(fields=['pending_sequence', 'id'], name='order_pending_sequence_idx'),
+        ]
     
     def __str__(self):
         return f"Order {self.order_id} - {self.customer_name}"
+    
+    def save(self, *args, **kwargs):
+        self.customer_phone_normalized = normalize_phone(self.customer_phone)
+        derived = {'customer_phone': 'customer_phone_normalized'}
+        moves_queue = self.changes_pending_queue()
+        if moves_queue:
+            derived['status'] = 'pending_sequence'
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, *(derived[field] for field in update_fields if field in derived)}
+        if moves_queue:
+            with transaction.atomic(using=kwargs.get('using')):
+                self.pending_sequence = next_pending_sequence()
+                super().save(*args, **kwargs)
+        else:
+            super().save(*args, **kwargs)
+        self._loaded_status = self.status
+    
+    def changes_pending_queue(self):
+        """Whether saving moves the order into or out of the pending queue."""
+        if self._state.adding:
+            return self.status == 'pending'
+        # Set by orders.signals on init; None if status was deferred, so stamp to be safe.
+        loaded = getattr(self, '_loaded_status', None)
+        return loaded is None or (loaded == 'pending') != (self.status == 'pending')
+    
+    @classmethod
+    def allowed_predecessors(cls, status):
+        """Return the statuses an order may move to `status` from."""
+        return [
+            source for source, targets in cls.STATUS_TRANSITIONS.items()
+            if status in targets
+        ]
+    
+    def can_transition_to(self, status):
+        return status in self.STATUS_TRANSITIONS.get(self.status, ())
 
 
 class OrderItem(models.Model):
@@ -42,5 +144,28 @@ class OrderItem(models.Model):
     unit_price = models.DecimalField(max_digits=10, decimal_places=2)
     total_price = models.DecimalField(max_digits=10, decimal_places=2)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['product_sku'], name='orderitem_sku_idx'),
+        ]
+    
     def __str__(self):
         return f"{self.product_name} x {self.quantity}"
+
+
+class OrderReconciliationIssue(models.Model):
+    """Model recording an order whose totals disagree with its line items."""
+    
+    order = models.ForeignKey(Order, related_name='reconciliation_issues', on_delete=models.CASCADE)
+    recorded_total = models.DecimalField(max_digits=10, decimal_places=2)
+    items_total = models.DecimalField(max_digits=12, decimal_places=2)
+    computed_total = models.DecimalField(max_digits=12, decimal_places=2)
+    mismatched_lines = models.IntegerField(default=0)
+    repaired = models.BooleanField(default=False)
+    detected_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-detected_at']
+    
+    def __str__(self):
+        return f"Order #{self.order_id}: {self.recorded_total} vs {self.computed_total}"
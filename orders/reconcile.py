@@ -0,0 +1,107 @@
+"""
+Set-based reconciliation of order totals against their line items.
+
+A line item is consistent when total_price equals quantity * unit_price, and
+an order is consistent when total_amount equals the sum of its line items.
+Orders without any line items are not checked. All checks and repairs run as
+grouped aggregates and UPDATE statements, so no model instances are loaded.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Max, Min, OuterRef, Q, Subquery, Sum, Value
+from django.utils import timezone
+from .models import Order, OrderItem, OrderReconciliationIssue
+from .signals import orders_bulk_changed
+
+RECONCILE_CHUNK_SIZE = 10000
+
+# Decimals may be stored as floating point (e.g. on SQLite), so compare
+# with a tolerance below one paisa.
+TOLERANCE = Value(Decimal('0.005'))
+
+LINE_TOTAL = ExpressionWrapper(
+    F('quantity') * F('unit_price'),
+    output_field=DecimalField(max_digits=12, decimal_places=2),
+)
+
+
+def find_mismatches(start_pk, end_pk):
+    """
+    Return totals for mismatched orders with start_pk <= id < end_pk.
+    
+    Runs a single grouped aggregate over the chunk's line items.
+    """
+    return list(
+        OrderItem.objects.filter(order_id__gte=start_pk, order_id__lt=end_pk)
+        .values('order_id', 'order__total_amount')
+        .order_by()
+        .annotate(
+            items_total=Sum('total_price'),
+            computed_total=Sum(LINE_TOTAL),
+            mismatched_lines=Count('id', filter=(
+                Q(total_price__gt=LINE_TOTAL + TOLERANCE) | Q(total_price__lt=LINE_TOTAL - TOLERANCE)
+            )),
+        )
+        .filter(
+            Q(mismatched_lines__gt=0)
+            | Q(computed_total__gt=F('order__total_amount') + TOLERANCE)
+            | Q(computed_total__lt=F('order__total_amount') - TOLERANCE)
+        )
+    )
+
+
+def repair(order_pks):
+    """
+    Make line totals and order totals consistent for `order_pks`.
+    
+    Line items are treated as the source of truth: total_price is reset to
+    quantity * unit_price, then total_amount to the sum of the lines.
+    """
+    with transaction.atomic():
+        OrderItem.objects.filter(order_id__in=order_pks).update(total_price=LINE_TOTAL)
+        items_total = (
+            OrderItem.objects.filter(order=OuterRef('pk'))
+            .values('order')
+            .annotate(total=Sum('total_price'))
+            .values('total')
+        )
+        orders = Order.objects.filter(pk__in=order_pks)
+        days = set(orders.dates('order_date', 'day')) if orders_bulk_changed.has_listeners() else set()
+        orders.update(total_amount=Subquery(items_total), updated_at=timezone.now())
+        orders_bulk_changed.send(sender=Order, days=days)
+
+
+def reconcile(chunk_size=RECONCILE_CHUNK_SIZE, fix=False, progress=None):
+    """
+    Sweep all orders in primary-key chunks and record mismatches.
+    
+    Previous unrepaired issues are replaced by this run's findings. Returns
+    the number of mismatched orders found.
+    """
+    OrderReconciliationIssue.objects.filter(repaired=False).delete()
+    bounds = Order.objects.aggregate(low=Min('pk'), high=Max('pk'))
+    if bounds['low'] is None:
+        return 0
+    
+    found = 0
+    for start_pk in range(bounds['low'], bounds['high'] + 1, chunk_size):
+        rows = find_mismatches(start_pk, start_pk + chunk_size)
+        if rows:
+            if fix:
+                repair([row['order_id'] for row in rows])
+            OrderReconciliationIssue.objects.bulk_create([
+                OrderReconciliationIssue(
+                    order_id=row['order_id'],
+                    recorded_total=row['order__total_amount'],
+                    items_total=row['items_total'],
+                    computed_total=row['computed_total'],
+                    mismatched_lines=row['mismatched_lines'],
+                    repaired=fix,
+                )
+                for row in rows
+            ])
+            found += len(rows)
+        if progress is not None:
+            progress(start_pk + chunk_size - 1, bounds['high'], found)
+    return found
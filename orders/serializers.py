@@ -18,21 +18,39 @@ class OrderSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Order
-        fields = '__all__'
+        exclude = ('customer_phone_normalized',)
         read_only_fields = ('order_date', 'updated_at')
+    
+    def validate_status(self, value):
+        """Apply Order.STATUS_TRANSITIONS to updates; unchanged statuses pass."""
+        if self.instance is not None and value != self.instance.status and not self.instance.can_transition_to(value):
+            raise serializers.ValidationError(
+                f"Cannot change status from '{self.instance.status}' to '{value}'."
+            )
+        return value
 
 
 class OrderListSerializer(serializers.ModelSerializer):
     """Lightweight serializer for order listings."""
     
-    items_count = serializers.SerializerMethodField()
+    items_count = serializers.IntegerField(read_only=True)
     
     class Meta:
         model = Order
         fields = ('id', 'order_id', 'customer_name', 'total_amount', 'status', 'order_date', 'items_count')
+
+
+class OrderFeedSerializer(serializers.ModelSerializer):
+    """Serializer for pending-queue change events."""
+    
+    event = serializers.SerializerMethodField()
     
-    def get_items_count(self, obj):
-        return obj.items.count()
+    class Meta:
+        model = Order
+        fields = ('event', 'id', 'order_id', 'customer_name', 'total_amount', 'status', 'order_date', 'updated_at')
+    
+    def get_event(self, obj):
+        return 'added' if obj.status == 'pending' else 'removed'
 
 
 class OrderStatusUpdateSerializer(serializers.ModelSerializer):
@@ -44,7 +62,47 @@ class OrderStatusUpdateSerializer(serializers.ModelSerializer):
     
     def validate_status(self, value):
         """Validate status transitions."""
-        valid_statuses = ['pending', 'confirmed', 'processing', 'shipped', 'delivered', 'cancelled', 'returned']
+        valid_statuses = [choice for choice, _ in Order.STATUS_CHOICES]
         if value not in valid_statuses:
             raise serializers.ValidationError(f"Status must be one of: {', '.join(valid_statuses)}")
+        if self.instance is not None and not self.instance.can_transition_to(value):
+            raise serializers.ValidationError(
+                f"Cannot change status from '{self.instance.status}' to '{value}'."
+            )
         return value
+
+
+class OrderBulkStatusUpdateSerializer(serializers.Serializer):
+    """Serializer for applying a status transition to many orders."""
+    
+    status = serializers.ChoiceField(choices=Order.STATUS_CHOICES)
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False)
+    
+    def validate_status(self, value):
+        """Reject target statuses that no status can transition into."""
+        if not Order.allowed_predecessors(value):
+            raise serializers.ValidationError(f"No order can be moved to '{value}'.")
+        return value
+
+
+class OrderItemBulkSerializer(serializers.ModelSerializer):
+    """Serializer for line items nested in a bulk order payload."""
+    
+    class Meta:
+        model = OrderItem
+        fields = ('product_name', 'product_sku', 'quantity', 'unit_price', 'total_price')
+
+
+class OrderBulkSerializer(serializers.ModelSerializer):
+    """Serializer for a single order row in a bulk ingestion batch."""
+    
+    # Uniqueness is checked once per chunk instead of once per row.
+    order_id = serializers.CharField(max_length=100)
+    items = OrderItemBulkSerializer(many=True, required=False)
+    
+    class Meta:
+        model = Order
+        fields = (
+            'order_id', 'customer_name', 'customer_phone', 'customer_address',
+            'total_amount', 'status', 'payment_method', 'delivery_date', 'items'
+        )
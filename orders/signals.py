@@ -0,0 +1,15 @@
+from django.db.models.signals import post_init
+from django.dispatch import Signal, receiver
+from common.models import loaded_values
+from .models import Order
+
+# Sent after set-based writes that bypass Model.save(), such as bulk_create
+# and queryset.update(). Receivers get `days`, the set of order dates (in the
+# current time zone) whose orders were inserted or changed.
+orders_bulk_changed = Signal()
+
+
+@receiver(post_init, sender=Order)
+def remember_status(sender, instance, **kwargs):
+    # Order.save() compares against this to detect pending queue moves.
+    instance._loaded_status = loaded_values(instance, 'status')[0]
@@ -1,3 +1,434 @@
+import json
+from decimal import Decimal
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from .lookup import lookup_filter
+from .models import Order, OrderItem, OrderReconciliationIssue, normalize_phone
+from .reconcile import reconcile
+
+
+def create_order(order_id, status='pending', items=2):
+    """Create an order with the given number of line items."""
+    order = Order.objects.create(
+        order_id=order_id,
+        customer_name='Test Customer',
+        customer_phone='+919876543210',
+        customer_address='123 Main St, City',
+        total_amount=Decimal('100.00') * items,
+        status=status,
+        payment_method='UPI',
+    )
+    for index in range(items):
+        OrderItem.objects.create(
+            order=order,
+            product_name=f'Product {index}',
+            product_sku=f'SKU{index:03d}',
+            quantity=1,
+            unit_price=Decimal('100.00'),
+            total_price=Decimal('100.00'),
+        )
+    return order
+
+
+class OrderQueryCountTests(TestCase):
+    """Query counts for order endpoints must not grow with the number of orders."""
+
+    def setUp(self):
+        self.client = APIClient()
+        for index in range(8):
+            create_order(f'ORD{index:03d}', items=index % 3 + 1)
+
+    def test_list_query_count(self):
+        # One COUNT for pagination and one SELECT for the page.
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/orders/')
+        self.assertEqual(response.status_code, 200)
+        counts = {row['order_id']: row['items_count'] for row in response.data['results']}
+        self.assertEqual(counts['ORD004'], 2)
+
+    def test_pending_query_count(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/orders/pending/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 8)
+        self.assertEqual(sum(row['items_count'] for row in response.data), 15)
+
+    def test_retrieve_query_count(self):
+        order = Order.objects.get(order_id='ORD002')
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/api/orders/{order.pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['items']), 3)
+
+
+class OrderBulkIngestTests(TestCase):
+    """Bulk ingestion of orders with nested items."""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def order_payload(self, order_id, items=2):
+        return {
+            'order_id': order_id,
+            'customer_name': 'Bulk Customer',
+            'customer_phone': '+919876543210',
+            'customer_address': '123 Main St, City',
+            'total_amount': '200.00',
+            'payment_method': 'UPI',
+            'items': [
+                {
+                    'product_name': f'Product {index}',
+                    'product_sku': f'SKU{index:03d}',
+                    'quantity': 1,
+                    'unit_price': '100.00',
+                    'total_price': '100.00',
+                }
+                for index in range(items)
+            ],
+        }
+
+    def test_bulk_json_array(self):
+        payload = [self.order_payload(f'BULK{index:03d}') for index in range(50)]
+        response = self.client.post('/api/orders/bulk/', payload, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created'], 50)
+        self.assertEqual(Order.objects.count(), 50)
+        self.assertEqual(OrderItem.objects.count(), 100)
+
+    def test_bulk_query_count_is_independent_of_batch_size(self):
+        query_counts = []
+        for prefix, size in (('SMALL', 5), ('LARGE', 40)):
+            payload = [self.order_payload(f'{prefix}{index:03d}') for index in range(size)]
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.post('/api/orders/bulk/', payload, format='json')
+            self.assertEqual(response.data['created'], size)
+            query_counts.append(len(context.captured_queries))
+        self.assertEqual(query_counts[0], query_counts[1])
+
+    def test_bulk_ndjson_stream(self):
+        body = '\n'.join(json.dumps(self.order_payload(f'ND{index}')) for index in range(3))
+        response = self.client.post(
+            '/api/orders/bulk/', body, content_type='application/x-ndjson'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Order.objects.filter(order_id__startswith='ND').count(), 3)
+
+    def test_bulk_reports_per_row_errors(self):
+        create_order('EXISTING')
+        invalid = self.order_payload('BAD')
+        invalid['total_amount'] = 'not-a-number'
+        payload = [
+            self.order_payload('OK1'),
+            invalid,
+            self.order_payload('EXISTING'),
+            self.order_payload('OK1'),
+        ]
+        response = self.client.post('/api/orders/bulk/', payload, format='json')
+        self.assertEqual(response.status_code, 207)
+        statuses = [result['status'] for result in response.data['results']]
+        self.assertEqual(statuses, ['created', 'error', 'error', 'error'])
+        self.assertIn('total_amount', response.data['results'][1]['errors'])
+        self.assertFalse(Order.objects.filter(order_id='BAD').exists())
+
+
+class OrderCursorPaginationTests(TestCase):
+    """Opt-in keyset pagination for the orders feed."""
+
+    def setUp(self):
+        self.client = APIClient()
+        for index in range(25):
+            create_order(f'CUR{index:03d}', items=1)
+
+    def test_cursor_pages_cover_all_orders_without_count(self):
+        seen = []
+        url = '/api/orders/?pagination=cursor'
+        while url:
+            # One SELECT per page; no COUNT and no OFFSET scan.
+            with self.assertNumQueries(1):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('count', response.data)
+            seen.extend(row['order_id'] for row in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(len(seen), 25)
+        self.assertEqual(len(set(seen)), 25)
+
+    def test_default_pagination_is_unchanged(self):
+        response = self.client.get('/api/orders/')
+        self.assertEqual(response.data['count'], 25)
+
+
+class OrderStatusTransitionTests(TestCase):
+    """Status changes follow Order.STATUS_TRANSITIONS."""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_update_status_rejects_invalid_transition(self):
+        order = create_order('SM001', status='pending')
+        response = self.client.post(
+            f'/api/orders/{order.pk}/update_status/', {'status': 'shipped'}, format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(
+            f'/api/orders/{order.pk}/update_status/', {'status': 'confirmed'}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        order.refresh_from_db()
+        self.assertEqual(order.status, 'confirmed')
+
+    def test_order_update_applies_transitions(self):
+        order = create_order('SM002', status='pending', items=0)
+        response = self.client.patch(f'/api/orders/{order.pk}/', {'status': 'delivered'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.patch(
+            f'/api/orders/{order.pk}/', {'status': 'pending', 'customer_name': 'Renamed'}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        response = self.client.patch(f'/api/orders/{order.pk}/', {'status': 'confirmed'}, format='json')
+        self.assertEqual(response.data['status'], 'confirmed')
+
+    def test_bulk_update_status_by_ids(self):
+        processing = [create_order(f'P{index}', status='processing', items=0) for index in range(3)]
+        delivered = create_order('D1', status='delivered', items=0)
+        ids = [order.pk for order in processing] + [delivered.pk, 999999]
+        response = self.client.post(
+            '/api/orders/bulk_update_status/', {'status': 'shipped', 'ids': ids}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['updated'], 3)
+        self.assertEqual([row['id'] for row in response.data['skipped']], [delivered.pk])
+        self.assertEqual(response.data['not_found'], [999999])
+        self.assertEqual(Order.objects.filter(status='shipped').count(), 3)
+
+    def test_bulk_update_status_by_filter(self):
+        for index in range(4):
+            create_order(f'F{index}', status='processing', items=0)
+        create_order('F-PENDING', status='pending', items=0)
+        response = self.client.post(
+            '/api/orders/bulk_update_status/?status=processing',
+            {'status': 'shipped'},
+            format='json'
+        )
+        self.assertEqual(response.data['updated'], 4)
+        self.assertEqual(Order.objects.get(order_id='F-PENDING').status, 'pending')
+
+    def test_bulk_update_status_not_found_ignores_filters(self):
+        pending = create_order('NF-PENDING', status='pending', items=0)
+        processing = create_order('NF-PROCESSING', status='processing', items=0)
+        response = self.client.post(
+            '/api/orders/bulk_update_status/?status=pending',
+            {'status': 'confirmed', 'ids': [pending.pk, processing.pk, 999999]},
+            format='json'
+        )
+        self.assertEqual(response.data['updated'], 1)
+        self.assertEqual(response.data['not_found'], [999999])
+        self.assertEqual(Order.objects.get(pk=processing.pk).status, 'processing')
+
+    def test_bulk_update_status_requires_target(self):
+        response = self.client.post(
+            '/api/orders/bulk_update_status/', {'status': 'shipped'}, format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class OrderExportTests(TestCase):
+    """Streaming order export with one row per line item."""
+
+    def setUp(self):
+        self.client = APIClient()
+        for index in range(5):
+            create_order(f'EXP{index}', status='pending', items=2)
+        create_order('EXP-SHIPPED', status='shipped', items=3)
+        create_order('EXP-EMPTY', status='pending', items=0)
+
+    def read_streaming(self, response):
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv_export_flattens_items(self):
+        response = self.client.get('/api/orders/export/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        lines = self.read_streaming(response).strip().splitlines()
+        # Header, 5 * 2 + 3 item rows and one row for the order without items.
+        self.assertEqual(len(lines), 1 + 13 + 1)
+        self.assertTrue(lines[0].startswith('order_id,order_date,status'))
+
+    def test_ndjson_export_honours_filters(self):
+        response = self.client.get('/api/orders/export/?file_format=ndjson&status=shipped')
+        rows = [json.loads(line) for line in self.read_streaming(response).splitlines()]
+        self.assertEqual(len(rows), 3)
+        self.assertEqual({row['order_id'] for row in rows}, {'EXP-SHIPPED'})
+
+    def test_export_date_range(self):
+        response = self.client.get('/api/orders/export/?file_format=ndjson&order_date_before=2000-01-01')
+        self.assertEqual(self.read_streaming(response), '')
+
+    def test_export_query_count_is_constant(self):
+        response = self.client.get('/api/orders/export/')
+        # One query for the orders and one for their prefetched items.
+        with self.assertNumQueries(2):
+            self.read_streaming(response)
+
+    def test_export_rejects_unknown_format(self):
+        response = self.client.get('/api/orders/export/?file_format=xml')
+        self.assertEqual(response.status_code, 400)
+
+
+class OrderPendingFeedTests(TestCase):
+    """Change-cursor feed of the pending queue."""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_feed_emits_only_changes_since_cursor(self):
+        create_order('FEED1', items=0)
+        create_order('FEED2', items=0)
+        response = self.client.get('/api/orders/pending_feed/')
+        self.assertEqual(len(response.data['events']), 2)
+        cursor = response.data['cursor']
+
+        response = self.client.get('/api/orders/pending_feed/', {'cursor': cursor, 'timeout': 0})
+        self.assertEqual(response.data['events'], [])
+        self.assertEqual(response.data['cursor'], cursor)
+
+        create_order('FEED3', items=0)
+        confirmed = Order.objects.get(order_id='FEED1')
+        self.client.post(f'/api/orders/{confirmed.pk}/update_status/', {'status': 'confirmed'}, format='json')
+
+        response = self.client.get('/api/orders/pending_feed/', {'cursor': cursor, 'timeout': 0})
+        events = {event['order_id']: event['event'] for event in response.data['events']}
+        self.assertEqual(events, {'FEED3': 'added', 'FEED1': 'removed'})
+
+        response = self.client.get(
+            '/api/orders/pending_feed/', {'cursor': response.data['cursor'], 'timeout': 0}
+        )
+        self.assertEqual(response.data['events'], [])
+
+    def test_feed_ignores_orders_outside_the_queue(self):
+        shipped = create_order('FEED-SHIPPED', status='shipped', items=0)
+        self.assertIsNone(shipped.pending_sequence)
+        cursor = self.client.get('/api/orders/pending_feed/').data['cursor']
+        self.client.post(f'/api/orders/{shipped.pk}/update_status/', {'status': 'delivered'}, format='json')
+        self.client.post(
+            '/api/orders/bulk_update_status/', {'status': 'returned', 'ids': [shipped.pk]}, format='json'
+        )
+        response = self.client.get('/api/orders/pending_feed/', {'cursor': cursor, 'timeout': 0})
+        self.assertEqual(response.data['events'], [])
+
+        pending = create_order('FEED-BULK', items=0)
+        cursor = self.client.get('/api/orders/pending_feed/').data['cursor']
+        self.client.post(
+            '/api/orders/bulk_update_status/', {'status': 'confirmed', 'ids': [pending.pk]}, format='json'
+        )
+        response = self.client.get('/api/orders/pending_feed/', {'cursor': cursor, 'timeout': 0})
+        events = [(event['order_id'], event['event']) for event in response.data['events']]
+        self.assertEqual(events, [('FEED-BULK', 'removed')])
+
+    def test_queue_moves_are_numbered_per_transaction(self):
+        self.client.post('/api/orders/bulk/', [
+            {'order_id': f'SEQ{index}', 'customer_name': 'Test', 'customer_phone': '9876543210',
+             'customer_address': 'Somewhere', 'total_amount': '10.00', 'payment_method': 'cod'}
+            for index in range(2)
+        ], format='json')
+        first, second = Order.objects.filter(order_id__startswith='SEQ').order_by('id')
+        self.assertEqual(first.pending_sequence, second.pending_sequence)
+        first.status = 'confirmed'
+        first.save()
+        self.assertGreater(first.pending_sequence, second.pending_sequence)
+        second.customer_name = 'Renamed'
+        second.save()
+        self.assertLess(second.pending_sequence, first.pending_sequence)
+
+    def test_feed_rejects_invalid_cursor(self):
+        response = self.client.get('/api/orders/pending_feed/', {'cursor': 'garbage', 'timeout': 0})
+        self.assertEqual(response.status_code, 400)
+
+    def test_feed_rejects_non_finite_timeout(self):
+        cursor = self.client.get('/api/orders/pending_feed/').data['cursor']
+        for timeout in ['nan', 'inf', 'soon']:
+            response = self.client.get('/api/orders/pending_feed/', {'cursor': cursor, 'timeout': timeout})
+            self.assertEqual(response.status_code, 400)
+        response = self.client.get('/api/orders/pending_feed/', {'cursor': cursor, 'timeout': -5})
+        self.assertEqual(response.data['events'], [])
+
+
+class OrderLookupTests(TestCase):
+    """Indexed lookup by order ID and normalized customer phone."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.first = create_order('LK-1001', items=0)
+        self.second = create_order('LK-1002', items=0)
+        self.second.customer_phone = '098765 00000'
+        self.second.customer_name = 'Asha Verma'
+        self.second.save()
+
+    def lookup(self, **params):
+        response = self.client.get('/api/orders/lookup/', params)
+        self.assertEqual(response.status_code, 200)
+        return sorted(row['order_id'] for row in response.data['results'])
+
+    def test_phone_is_normalized_on_save(self):
+        self.assertEqual(self.first.customer_phone_normalized, '9876543210')
+        self.assertEqual(Order.objects.get(pk=self.second.pk).customer_phone_normalized, '9876500000')
+
+    def test_exact_phone_lookup_ignores_formatting(self):
+        self.assertEqual(self.lookup(q='+91 98765-43210'), ['LK-1001'])
+
+    def test_prefix_lookup(self):
+        self.assertEqual(self.lookup(q='98765', mode='prefix'), ['LK-1001', 'LK-1002'])
+        self.assertEqual(self.lookup(q='LK-100', mode='prefix'), ['LK-1001', 'LK-1002'])
+        self.assertEqual(self.lookup(q='LK-1002'), ['LK-1002'])
+
+    def test_prefix_lookup_with_country_code(self):
+        self.assertEqual(normalize_phone('+91 98765'), '98765')
+        self.assertEqual(normalize_phone('919876543210'), '9876543210')
+        self.assertEqual(normalize_phone('9198765432'), '9198765432')
+        self.assertEqual(self.lookup(q='+91 98765', mode='prefix'), ['LK-1001', 'LK-1002'])
+        self.assertEqual(self.lookup(q='0098765', mode='prefix'), ['LK-1001', 'LK-1002'])
+
+    def test_name_search_is_opt_in(self):
+        self.assertEqual(self.lookup(q='asha'), [])
+        self.assertEqual(self.lookup(q='asha', include_name='true'), ['LK-1002'])
+
+    def test_phone_lookup_uses_index(self):
+        plan = Order.objects.filter(lookup_filter('98765', 'prefix')).explain()
+        self.assertNotIn('SCAN orders_order', plan)
+
+
+class OrderReconciliationTests(TestCase):
+    """Set-based reconciliation of order and line-item totals."""
+
+    def setUp(self):
+        self.good = create_order('REC-GOOD', items=2)
+        self.bad_total = create_order('REC-TOTAL', items=2)
+        Order.objects.filter(pk=self.bad_total.pk).update(total_amount=Decimal('150.00'))
+        self.bad_line = create_order('REC-LINE', items=1)
+        OrderItem.objects.filter(order=self.bad_line).update(quantity=3)
+
+    def test_reconcile_records_mismatches(self):
+        found = reconcile(chunk_size=2)
+        self.assertEqual(found, 2)
+        issues = {issue.order_id: issue for issue in OrderReconciliationIssue.objects.all()}
+        self.assertEqual(set(issues), {self.bad_total.pk, self.bad_line.pk})
+        self.assertEqual(issues[self.bad_line.pk].mismatched_lines, 1)
+        self.assertEqual(issues[self.bad_line.pk].computed_total, Decimal('300.00'))
+        self.assertFalse(issues[self.bad_total.pk].repaired)
+
+    def test_reconcile_query_count_per_chunk(self):
+        # Cleanup and bounds, one aggregate per chunk, one insert per chunk with issues.
+        with self.assertNumQueries(2 + 3 + 2):
+            reconcile(chunk_size=1)
 
-# Create your tests here.
+    def test_reconcile_repairs_totals(self):
+        self.assertEqual(reconcile(fix=True), 2)
+        self.bad_total.refresh_from_db()
+        self.bad_line.refresh_from_db()
+        self.assertEqual(self.bad_total.total_amount, Decimal('200.00'))
+        self.assertEqual(self.bad_line.total_amount, Decimal('300.00'))
+        self.assertEqual(self.bad_line.items.get().total_price, Decimal('300.00'))
+        self.assertEqual(reconcile(), 0)
@@ -1,14 +1,32 @@
+import math
+import time
+
 from rest_framework import viewsets, filters, status
 from rest_framework.decorators import action
+from rest_framework.parsers import JSONParser
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import Order, OrderItem
+from django.db import transaction
+from django.db.models import BigIntegerField, Case, Count, F, Value, When
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from .bulk import ingest_orders
+from .export import stream_csv, stream_ndjson
+from .feed import InvalidCursor, changes_since, current_cursor, feed_options
+from .filters import OrderFilter
+from .lookup import lookup_filter
+from .models import Order, OrderItem, next_pending_sequence
+from .pagination import OrderCursorPagination
+from .parsers import NDJSONParser
 from .serializers import (
     OrderSerializer, 
     OrderListSerializer, 
     OrderStatusUpdateSerializer,
+    OrderBulkStatusUpdateSerializer,
+    OrderFeedSerializer,
     OrderItemSerializer
 )
+from .signals import orders_bulk_changed
 
 
 class OrderViewSet(viewsets.ModelViewSet):
@@ -17,6 +35,7 @@ class OrderViewSet(viewsets.ModelViewSet):
     
     Endpoints:
     - GET /api/orders/ - List all orders
+    - GET /api/orders/?pagination=cursor - List orders with cursor pagination
     - POST /api/orders/ - Create a new order
     - GET /api/orders/{id}/ - Retrieve an order
     - PUT /api/orders/{id}/ - Update an order
@@ -24,21 +43,47 @@ class OrderViewSet(viewsets.ModelViewSet):
     - DELETE /api/orders/{id}/ - Delete an order
     - POST /api/orders/{id}/update_status/ - Update order status
     - GET /api/orders/pending/ - List pending orders
+    - POST /api/orders/bulk/ - Create orders with nested items in bulk
+    - POST /api/orders/bulk_update_status/ - Update the status of many orders
+    - GET /api/orders/export/ - Stream orders as CSV or NDJSON, one row per item
+    - GET /api/orders/pending_feed/ - Long-poll for changes to the pending queue
+    - GET /api/orders/lookup/?q= - Indexed lookup by order ID or customer phone
     """
     
     queryset = Order.objects.all()
     serializer_class = OrderSerializer
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['status', 'payment_method']
+    filterset_class = OrderFilter
     search_fields = ['order_id', 'customer_name', 'customer_phone']
     ordering_fields = ['order_date', 'total_amount']
     
+    @property
+    def paginator(self):
+        """Switch to keyset pagination when the client opts in."""
+        if not hasattr(self, '_paginator') and self.request is not None:
+            params = self.request.query_params
+            if params.get('pagination') == 'cursor' or 'cursor' in params:
+                self._paginator = OrderCursorPagination()
+        return super().paginator
+    
+    def get_queryset(self):
+        """Annotate item counts for listings and prefetch items otherwise."""
+        queryset = super().get_queryset()
+        if self.action in ['list', 'pending', 'lookup']:
+            # Meta.ordering is dropped from GROUP BY queries, so restate it.
+            return queryset.annotate(items_count=Count('items')).order_by(*Order._meta.ordering)
+        if self.action in ['bulk_update_status', 'export']:
+            return queryset
+        return queryset.prefetch_related('items')
+    
     def get_serializer_class(self):
         """Return appropriate serializer based on action."""
-        if self.action == 'list':
+        if self.action in ['list', 'lookup']:
             return OrderListSerializer
         elif self.action == 'update_status':
             return OrderStatusUpdateSerializer
+        elif self.action == 'bulk_update_status':
+            return OrderBulkStatusUpdateSerializer
         return OrderSerializer
     
     @action(detail=True, methods=['post'])
@@ -54,6 +99,190 @@ class OrderViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def pending(self, request):
         """Get all pending orders."""
-        pending_orders = self.queryset.filter(status='pending')
+        pending_orders = self.get_queryset().filter(status='pending')
         serializer = OrderListSerializer(pending_orders, many=True)
         return Response(serializer.data)
+    
+    @action(detail=False, methods=['post'], parser_classes=[JSONParser, NDJSONParser])
+    def bulk(self, request):
+        """Create orders with nested items from a JSON array or NDJSON stream."""
+        rows = request.data
+        if not isinstance(rows, list):
+            return Response(
+                {'detail': 'Expected a list of orders.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        results = ingest_orders(rows)
+        created = sum(1 for result in results if result['status'] == 'created')
+        if created == len(results):
+            response_status = status.HTTP_201_CREATED
+        elif created:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        return Response({
+            'created': created,
+            'failed': len(results) - created,
+            'results': results,
+        }, status=response_status)
+    
+    @action(detail=False, methods=['post'])
+    def bulk_update_status(self, request):
+        """
+        Move many orders to a new status with one conditional UPDATE.
+        
+        Targets either the order ids in the request body or every order
+        matching the list filters in the query string. Only orders whose
+        current status may transition to the new one are updated; the rest
+        are reported as skipped.
+        """
+        serializer = OrderBulkStatusUpdateSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        new_status = serializer.validated_data['status']
+        ids = serializer.validated_data.get('ids')
+        
+        filter_prefixes = tuple(self.filterset_class.base_filters) + ('search',)
+        if ids is None and not any(param.startswith(filter_prefixes) for param in request.query_params):
+            return Response(
+                {'detail': 'Provide order ids or at least one filter.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        targets = self.filter_queryset(self.get_queryset()).order_by()
+        not_found = []
+        if ids is not None:
+            targets = targets.filter(pk__in=ids)
+            # Ids that exist but fail the query-string filters are not missing.
+            found = set(Order.objects.filter(pk__in=ids).values_list('pk', flat=True))
+            not_found = [pk for pk in ids if pk not in found]
+        predecessors = Order.allowed_predecessors(new_status)
+        
+        with transaction.atomic():
+            # Taken before any order row is locked; see next_pending_sequence().
+            sequence = next_pending_sequence() if 'pending' in predecessors else None
+            skipped = list(
+                targets.exclude(status__in=predecessors)
+                .select_for_update()
+                .values('id', 'order_id', 'status')
+            )
+            eligible = targets.filter(status__in=predecessors)
+            days = set(eligible.dates('order_date', 'day')) if orders_bulk_changed.has_listeners() else set()
+            changes = {'status': new_status, 'updated_at': timezone.now()}
+            if sequence is not None:
+                # Nothing moves into pending, so only orders leaving it are numbered.
+                changes['pending_sequence'] = Case(
+                    When(status='pending', then=Value(sequence, BigIntegerField())), default=F('pending_sequence')
+                )
+            updated = eligible.update(**changes)
+            if updated:
+                orders_bulk_changed.send(sender=Order, days=days)
+        
+        return Response({
+            'status': new_status,
+            'updated': updated,
+            'skipped': skipped,
+            'not_found': not_found,
+        }, status=status.HTTP_200_OK)
+    
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Stream filtered orders with one row per line item.
+        
+        Accepts the list filters plus ?file_format=csv (default) or ndjson.
+        """
+        file_format = request.query_params.get('file_format', 'csv')
+        if file_format not in ['csv', 'ndjson']:
+            return Response(
+                {'file_format': ['Must be one of: csv, ndjson']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        queryset = self.filter_queryset(self.get_queryset())
+        if file_format == 'csv':
+            response = StreamingHttpResponse(stream_csv(queryset), content_type='text/csv')
+        else:
+            response = StreamingHttpResponse(stream_ndjson(queryset), content_type='application/x-ndjson')
+        response['Content-Disposition'] = f'attachment; filename="orders.{file_format}"'
+        return response
+    
+    @action(detail=False, methods=['get'])
+    def pending_feed(self, request):
+        """
+        Long-poll feed of orders entering or leaving the pending queue.
+        
+        Without a cursor, returns the current pending queue and a cursor to
+        resume from. With ?cursor=, waits up to ?timeout= seconds for orders
+        that entered or left the queue since that cursor and returns them as
+        'added' (now pending) or 'removed' (no longer pending) events. The
+        default and maximum wait come from settings.ORDER_PENDING_FEED; each
+        waiting request holds a worker, so keep them short under WSGI.
+        
+        Queue moves are numbered under a counter row that stays locked until
+        the writing transaction commits, so the cursor never passes a move
+        that commits later. The cost is that transactions moving orders into
+        or out of the queue commit one at a time. Status changes written with
+        a plain queryset.update() are not numbered and never reach the feed.
+        """
+        cursor = request.query_params.get('cursor')
+        if cursor is None:
+            cursor = current_cursor()
+            snapshot = Order.objects.filter(status='pending').order_by('order_date', 'id')
+            return Response({
+                'cursor': cursor,
+                'has_more': False,
+                'events': OrderFeedSerializer(snapshot, many=True).data,
+            })
+        
+        options = feed_options()
+        try:
+            timeout = float(request.query_params.get('timeout', options['DEFAULT_TIMEOUT']))
+        except ValueError:
+            timeout = math.nan
+        # nan and inf would never reach the deadline and hold the worker indefinitely.
+        if not math.isfinite(timeout):
+            return Response({'timeout': ['Must be a finite number.']}, status=status.HTTP_400_BAD_REQUEST)
+        timeout = min(max(timeout, 0), options['MAX_TIMEOUT'])
+        
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                orders, next_cursor, has_more = changes_since(cursor)
+            except InvalidCursor as exc:
+                return Response({'cursor': [str(exc)]}, status=status.HTTP_400_BAD_REQUEST)
+            if orders or time.monotonic() >= deadline:
+                break
+            time.sleep(min(options['POLL_INTERVAL'], max(deadline - time.monotonic(), 0)))
+        
+        return Response({
+            'cursor': next_cursor,
+            'has_more': has_more,
+            'events': OrderFeedSerializer(orders, many=True).data,
+        })
+    
+    @action(detail=False, methods=['get'])
+    def lookup(self, request):
+        """
+        Find orders by order ID or customer phone using indexes.
+        
+        ?mode=exact (default) or prefix. Phone numbers are matched on their
+        normalized national digits. Name matching is only added with
+        ?include_name=true since it cannot use an index.
+        """
+        query = request.query_params.get('q', '').strip()
+        mode = request.query_params.get('mode', 'exact')
+        if not query:
+            return Response({'q': ['This parameter is required.']}, status=status.HTTP_400_BAD_REQUEST)
+        if mode not in ['exact', 'prefix']:
+            return Response({'mode': ['Must be one of: exact, prefix']}, status=status.HTTP_400_BAD_REQUEST)
+        include_name = request.query_params.get('include_name', '').lower() in ['1', 'true', 'yes']
+        
+        orders = self.get_queryset().filter(lookup_filter(query, mode, include_name))
+        page = self.paginate_queryset(orders)
+        if page is not None:
+            serializer = OrderListSerializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        serializer = OrderListSerializer(orders, many=True)
+        return Response(serializer.data)
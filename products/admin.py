@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Product
+from .models import Product, ProductImport
 
 
 @admin.register(Product)
@@ -11,3 +11,12 @@ class ProductAdmin(admin.ModelAdmin):
     search_fields = ('name', 'sku', 'description')
     ordering = ('-created_at',)
     readonly_fields = ('created_at', 'updated_at')
+
+
+@admin.register(ProductImport)
+class ProductImportAdmin(admin.ModelAdmin):
+    """Admin interface for ProductImport model."""
+    
+    list_display = ('id', 'status', 'content_type', 'rows_processed', 'inserted', 'updated', 'failed', 'created_at')
+    list_filter = ('status',)
+    readonly_fields = [field.name for field in ProductImport._meta.fields]
@@ -0,0 +1,88 @@
+"""
+Product counts per category, brand and status.
+
+One grouped query counts the filtered products per (category, brand,
+status) combination, reading only the product_facet_idx covering index when
+there are no other filters. The per-facet counts are summed from those
+groups, and a second query fetches the category and brand names. Results
+are cached in the Django cache for a few seconds, keyed by the request's
+filter parameters, so dashboards refreshing the same view share one query.
+
+Configured through settings.PRODUCT_FACETS, e.g.
+    {'TTL': 30, 'CACHE': 'default'}
+"""
+import hashlib
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count, Value
+from catalog.models import Brand, Category
+
+CACHE_KEY_PREFIX = 'products:facets:'
+# Query parameters that do not change which products are counted.
+IGNORED_PARAMS = {'page', 'ordering', 'format'}
+FACET_FIELDS = {
+    'category': 'category_id',
+    'brand': 'brand_id',
+    'status': 'status',
+}
+# Facets stored as ids, with the catalog model that names them.
+NAMED_FACETS = {'category': Category, 'brand': Brand}
+
+
+def facet_options():
+    options = getattr(settings, 'PRODUCT_FACETS', {})
+    return {'TTL': options.get('TTL', 30), 'CACHE': options.get('CACHE', 'default')}
+
+
+def facet_cache_key(query_params):
+    params = sorted(
+        (key, value) for key in query_params if key not in IGNORED_PARAMS
+        for value in query_params.getlist(key)
+    )
+    return CACHE_KEY_PREFIX + hashlib.blake2b(repr(params).encode(), digest_size=16).hexdigest()
+
+
+def facet_counts(queryset):
+    """Return the product total and {facet: [{'value', 'count'}, ...]} for `queryset`."""
+    groups = queryset.order_by().values(*FACET_FIELDS.values()).annotate(count=Count('pk'))
+    counters = {facet: Counter() for facet in FACET_FIELDS}
+    for group in groups:
+        for facet, field in FACET_FIELDS.items():
+            counters[facet][group[field]] += group['count']
+    
+    # Category and brand names in one query.
+    name_queries = [
+        model.objects.filter(pk__in=list(counters[facet])).order_by()
+        .annotate(facet=Value(facet)).values_list('facet', 'pk', 'name')
+        for facet, model in NAMED_FACETS.items() if counters[facet]
+    ]
+    names = {}
+    if name_queries:
+        for facet, pk, name in name_queries[0].union(*name_queries[1:], all=True):
+            names[facet, pk] = name
+    for facet in NAMED_FACETS:
+        counters[facet] = Counter({names[facet, pk]: count for pk, count in counters[facet].items()})
+    return {
+        'count': sum(counters['status'].values()),
+        'facets': {
+            facet: [
+                {'value': value, 'count': count}
+                for value, count in sorted(counter.items(), key=lambda item: (-item[1], item[0]))
+            ]
+            for facet, counter in counters.items()
+        },
+    }
+
+
+def cached_facet_counts(queryset, query_params):
+    """facet_counts(), cached for PRODUCT_FACETS['TTL'] seconds per filter set."""
+    options = facet_options()
+    cache = caches[options['CACHE']]
+    key = facet_cache_key(query_params)
+    result = cache.get(key)
+    if result is None:
+        result = facet_counts(queryset)
+        cache.set(key, result, options['TTL'])
+    return result
@@ -0,0 +1,16 @@
+from django_filters import rest_framework as filters
+from .models import Product
+
+
+class ProductFilter(filters.FilterSet):
+    """Filters for product listings by status and by category or brand name or id."""
+    
+    # ?category=<name> and ?brand=<name> keep working now that they are catalog rows.
+    category = filters.CharFilter(field_name='category__name')
+    brand = filters.CharFilter(field_name='brand__name')
+    category_id = filters.NumberFilter(field_name='category')
+    brand_id = filters.NumberFilter(field_name='brand')
+    
+    class Meta:
+        model = Product
+        fields = ['status', 'category', 'brand', 'category_id', 'brand_id']
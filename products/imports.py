@@ -0,0 +1,229 @@
+"""
+Bulk product catalog import keyed on sku.
+
+Files arrive as CSV (with a header row) or NDJSON and are read line by line
+(see common.records.iter_records). Rows are validated with
+ProductImportRowSerializer, then upserted in chunks: one query loads the
+chunk's existing products and bulk_create(update_conflicts=True) writes them.
+Columns missing from a row keep their current values; new SKUs must provide
+every required field. Later rows for the same SKU win.
+
+Uploads up to PRODUCT_IMPORTS['INLINE_MAX_BYTES'] are imported during the
+request. Larger ones are saved under PRODUCT_IMPORTS['DIRECTORY'] and left
+pending for the run_product_imports command. Either way the ProductImport
+records progress after every chunk and keeps a CSV report of rejected rows.
+"""
+import csv
+import io
+import logging
+import os
+import shutil
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from catalog.models import Brand, Category
+from common.records import RECORD_CONTENT_TYPES, NameResolver, iter_records
+from rest_framework import serializers
+from .models import Product, ProductImport
+from .serializers import ProductImportRowSerializer
+
+logger = logging.getLogger(__name__)
+
+IMPORT_CONTENT_TYPES = RECORD_CONTENT_TYPES
+IMPORT_CHUNK_SIZE = 2000
+IMPORT_FIELDS = [
+    'name', 'description', 'price', 'mrp', 'category_id', 'brand_id',
+    'status', 'image_url', 'weight',
+]
+# Catalog rows are written by name, like the product API does.
+CATALOG_RELATIONS = {'category': (Category, 'category_id'), 'brand': (Brand, 'brand_id')}
+# Product columns without a model default; status and image_url may be omitted.
+REQUIRED_FOR_INSERT = ['name', 'description', 'price', 'mrp', 'category', 'brand', 'weight']
+PROGRESS_FIELDS = ['bytes_processed', 'rows_processed', 'inserted', 'updated', 'failed']
+ERROR_REPORT_HEADER = ['line', 'sku', 'field', 'message']
+
+
+def import_options():
+    options = getattr(settings, 'PRODUCT_IMPORTS', {})
+    return {
+        'INLINE_MAX_BYTES': options.get('INLINE_MAX_BYTES', 1024 * 1024),
+        'DIRECTORY': os.fspath(options.get('DIRECTORY', os.path.join(settings.BASE_DIR, 'imports'))),
+    }
+
+
+class CountingStream:
+    """Iterates a byte stream line by line, counting the bytes read."""
+    
+    def __init__(self, stream):
+        self.stream = stream
+        self.bytes_read = 0
+    
+    def __iter__(self):
+        for line in self.stream:
+            self.bytes_read += len(line)
+            yield line
+
+
+class ProductImporter:
+    """Validates and upserts the rows of one ProductImport, updating its counts."""
+    
+    def __init__(self, job, chunk_size=IMPORT_CHUNK_SIZE):
+        self.job = job
+        self.chunk_size = chunk_size
+        # (line, sku, field, message) rows for the error report
+        self.errors = []
+        self.validator = ProductImportRowSerializer(partial=True)
+    
+    def run(self, stream, encoding='utf-8'):
+        counted = CountingStream(stream)
+        chunk = {}
+        for line_number, record in iter_records(counted, self.job.content_type, encoding):
+            self.job.rows_processed += 1
+            data = self.validate(line_number, record)
+            if data is None:
+                continue
+            chunk[data['sku']] = (line_number, data)
+            if len(chunk) >= self.chunk_size:
+                self.apply(chunk)
+                chunk = {}
+                self.save_progress(counted.bytes_read)
+        if chunk:
+            self.apply(chunk)
+        self.save_progress(counted.bytes_read)
+        return self
+    
+    def error(self, line_number, sku, errors):
+        self.job.failed += 1
+        for field, messages in errors.items():
+            for message in messages if isinstance(messages, list) else [messages]:
+                self.errors.append((line_number, sku, field, str(message)))
+    
+    def validate(self, line_number, record):
+        if isinstance(record, Exception):
+            self.error(line_number, '', {'non_field_errors': [str(record)]})
+            return None
+        sku = record.get('sku', '') if isinstance(record, dict) else ''
+        try:
+            data = self.validator.run_validation(record)
+        except serializers.ValidationError as exc:
+            detail = exc.detail if isinstance(exc.detail, dict) else {'non_field_errors': exc.detail}
+            self.error(line_number, sku, detail)
+            return None
+        # The validator is partial so existing SKUs can omit columns, but every row needs a SKU.
+        if 'sku' not in data:
+            self.error(line_number, sku, {'sku': ['This field is required.']})
+            return None
+        return data
+    
+    def apply(self, chunk):
+        with transaction.atomic():
+            existing = {
+                row['sku']: row
+                for row in Product.objects.filter(sku__in=list(chunk)).order_by().values('sku', *IMPORT_FIELDS)
+            }
+            accepted = []
+            for sku, (line_number, data) in chunk.items():
+                if sku not in existing:
+                    missing = [field for field in REQUIRED_FOR_INSERT if field not in data]
+                    if missing:
+                        self.error(line_number, sku, {field: ['This field is required for new SKUs.'] for field in missing})
+                        continue
+                accepted.append((sku, data))
+            # Only rows that will be written may create the categories and brands they name.
+            catalog = NameResolver(CATALOG_RELATIONS, (data for _, data in accepted))
+            upserts = []
+            for sku, data in accepted:
+                data = catalog.resolve(data)
+                current = existing.get(sku)
+                if current is None:
+                    upserts.append(Product(**data))
+                    self.job.inserted += 1
+                else:
+                    upserts.append(Product(**{**current, **data}))
+                    self.job.updated += 1
+            Product.objects.bulk_create(
+                upserts,
+                update_conflicts=True,
+                unique_fields=['sku'],
+                update_fields=[*IMPORT_FIELDS, 'updated_at'],
+            )
+    
+    def save_progress(self, bytes_read):
+        self.job.bytes_processed = bytes_read
+        self.job.save(update_fields=PROGRESS_FIELDS)
+    
+    def error_report(self):
+        if not self.errors:
+            return ''
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(ERROR_REPORT_HEADER)
+        writer.writerows(self.errors)
+        return buffer.getvalue()
+
+
+def run_import(job, stream, encoding='utf-8'):
+    """Import `stream` into the catalog, recording the outcome on `job`."""
+    job.status = 'running'
+    job.started_at = timezone.now()
+    job.save(update_fields=['status', 'started_at'])
+    importer = ProductImporter(job)
+    try:
+        importer.run(stream, encoding)
+    except Exception as exc:
+        # Chunks applied before the failure stay imported.
+        logger.exception('Product import %s failed', job.pk)
+        job.status = 'failed'
+        job.detail = str(exc)
+    else:
+        job.status = 'completed'
+    job.error_report = importer.error_report()
+    job.finished_at = timezone.now()
+    job.save()
+    return job
+
+
+def start_import(stream, content_type, size, encoding='utf-8'):
+    """
+    Create a ProductImport for an upload.
+    
+    Small uploads are imported right away; larger ones are written to disk
+    and left pending for run_pending_imports.
+    """
+    options = import_options()
+    job = ProductImport.objects.create(content_type=content_type, size_bytes=size)
+    if size <= options['INLINE_MAX_BYTES']:
+        return run_import(job, stream, encoding)
+    
+    os.makedirs(options['DIRECTORY'], exist_ok=True)
+    extension = 'csv' if content_type == 'text/csv' else 'ndjson'
+    job.source_path = os.path.join(options['DIRECTORY'], f'product-import-{job.pk}.{extension}')
+    with open(job.source_path, 'wb') as destination:
+        shutil.copyfileobj(stream, destination)
+    job.size_bytes = os.path.getsize(job.source_path)
+    job.save(update_fields=['source_path', 'size_bytes'])
+    return job
+
+
+def run_pending_imports():
+    """Process queued imports in the order they arrived; return the jobs run."""
+    processed = []
+    for job in ProductImport.objects.filter(status='pending').exclude(source_path='').order_by('id'):
+        # Claim the job so a concurrent runner skips it.
+        if not ProductImport.objects.filter(pk=job.pk, status='pending').update(status='running'):
+            continue
+        try:
+            with open(job.source_path, 'rb') as source:
+                run_import(job, source)
+        except OSError as exc:
+            job.status = 'failed'
+            job.detail = str(exc)
+            job.finished_at = timezone.now()
+            job.save()
+        else:
+            os.remove(job.source_path)
+            job.source_path = ''
+            job.save(update_fields=['source_path'])
+        processed.append(job)
+    return processed
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from products.imports import run_pending_imports
+
+
+class Command(BaseCommand):
+    help = 'Import queued product catalog uploads'
+
+    def handle(self, *args, **options):
+        jobs = run_pending_imports()
+        for job in jobs:
+            message = (
+                f'Import {job.pk}: {job.status}, {job.inserted} inserted, '
+                f'{job.updated} updated, {job.failed} failed'
+            )
+            self.stdout.write(self.style.SUCCESS(message) if job.status == 'completed' else self.style.ERROR(message))
+        self.stdout.write(f'Processed {len(jobs)} import(s).')
@@ -0,0 +1,37 @@
+# Generated by Django 6.0 on 2026-10-18 16:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductImport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('content_type', models.CharField(max_length=50)),
+                ('source_path', models.CharField(blank=True, help_text='Uploaded file awaiting processing', max_length=500)),
+                ('size_bytes', models.PositiveBigIntegerField(default=0)),
+                ('bytes_processed', models.PositiveBigIntegerField(default=0)),
+                ('rows_processed', models.PositiveIntegerField(default=0)),
+                ('inserted', models.PositiveIntegerField(default=0)),
+                ('updated', models.PositiveIntegerField(default=0)),
+                ('failed', models.PositiveIntegerField(default=0)),
+                ('error_report', models.TextField(blank=True, help_text='CSV of rejected rows')),
+                ('detail', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'id'], name='product_import_status_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 6.0 on 2026-10-18 16:14
+
+import django.db.models.deletion
+import products.models
+import products.search
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0002_product_import'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductSearchIndex',
+            fields=[
+                ('product', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to='products.product')),
+                ('name', models.TextField()),
+                ('sku', models.TextField()),
+                ('description', models.TextField()),
+                ('document', products.models.FullTextField(db_column='products_product_fts')),
+            ],
+            options={
+                'db_table': 'products_product_fts',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(products.search.install_search_index, products.search.remove_search_index),
+    ]
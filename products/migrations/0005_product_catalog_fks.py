@@ -0,0 +1,103 @@
+# Generated by Django 6.0 on 2026-10-18 16:31
+
+import django.db.models.deletion
+import products.search
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def match_names(Model, names):
+    """
+    Map product strings to catalog ids: exact name first, then a single
+    case-insensitive match, else a new entry named after the string.
+    """
+    ids = {}
+    for name in names:
+        cleaned = name.strip()
+        match = Model.objects.filter(name=cleaned).first()
+        if match is None:
+            candidates = list(Model.objects.filter(name__iexact=cleaned)[:2])
+            match = candidates[0] if len(candidates) == 1 else Model.objects.create(name=cleaned)
+        ids[name] = match.id
+    return ids
+
+
+def backfill_catalog(apps, schema_editor):
+    Product = apps.get_model('products', 'Product')
+    for field, Model in [('category', apps.get_model('catalog', 'Category')), ('brand', apps.get_model('catalog', 'Brand'))]:
+        names = Product.objects.order_by().values_list(field, flat=True).distinct()
+        for name, pk in match_names(Model, list(names)).items():
+            Product.objects.filter(**{field: name}).update(**{f'{field}_ref': pk})
+
+
+def restore_catalog_names(apps, schema_editor):
+    Product = apps.get_model('products', 'Product')
+    for field, Model in [('category', apps.get_model('catalog', 'Category')), ('brand', apps.get_model('catalog', 'Brand'))]:
+        Product.objects.update(**{field: Subquery(
+            Model.objects.filter(id=OuterRef(f'{field}_ref_id')).values('name')[:1]
+        )})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0002_brand_updated_at'),
+        ('products', '0004_product_updated_indexes'),
+    ]
+
+    operations = [
+        # Rebuilding products_product on SQLite drops the search index
+        # triggers, so they are reinstalled after the rebuild either way.
+        migrations.RunPython(migrations.RunPython.noop, products.search.install_search_index),
+        migrations.AddField(
+            model_name='product',
+            name='category_ref',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='catalog.category'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='brand_ref',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='catalog.brand'),
+        ),
+        migrations.RunPython(backfill_catalog, restore_catalog_names),
+        # Defaults let the columns be re-added before they are restored on reverse.
+        migrations.AlterField(
+            model_name='product',
+            name='category',
+            field=models.CharField(default='', max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='product',
+            name='brand',
+            field=models.CharField(default='', max_length=100),
+        ),
+        migrations.RemoveField(
+            model_name='product',
+            name='category',
+        ),
+        migrations.RemoveField(
+            model_name='product',
+            name='brand',
+        ),
+        migrations.RenameField(
+            model_name='product',
+            old_name='category_ref',
+            new_name='category',
+        ),
+        migrations.RenameField(
+            model_name='product',
+            old_name='brand_ref',
+            new_name='brand',
+        ),
+        migrations.AlterField(
+            model_name='product',
+            name='category',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='products', to='catalog.category'),
+        ),
+        migrations.AlterField(
+            model_name='product',
+            name='brand',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='products', to='catalog.brand'),
+        ),
+        migrations.RunPython(products.search.install_search_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-18 16:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0002_brand_updated_at'),
+        ('products', '0005_product_catalog_fks'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['category', 'brand', 'status'], name='product_facet_idx'),
+        ),
+    ]
@@ -15,8 +15,8 @@ class Product(models.Model):
     description = models.TextField()
     price = models.DecimalField(max_digits=10, decimal_places=2)
     mrp = models.DecimalField(max_digits=10, decimal_places=2)
-    category = models.CharField(max_length=100)
-    brand = models.CharField(max_length=100)
+    category = models.ForeignKey('catalog.Category', on_delete=models.PROTECT, related_name='products')
+    brand = models.ForeignKey('catalog.Brand', on_delete=models.PROTECT, related_name='products')
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='active')
     image_url = models.URLField(blank=True)
     weight = models.DecimalField(max_digits=10, decimal_places=2, help_text="Weight in kg")
@@ -25,6 +25,93 @@ class Product(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Listing validators read the latest updated_at (see catalog/conditional.py).
+            models.Index(fields=['updated_at'], name='product_updated_idx'),
+            models.Index(fields=['status', 'updated_at'], name='product_status_updated_idx'),
+            # Covers the grouped facet count (see products/facets.py).
+            models.Index(fields=['category', 'brand', 'status'], name='product_facet_idx'),
+        ]
     
     def __str__(self):
         return f"{self.name} ({self.sku})"
+
+
+class FullTextField(models.TextField):
+    """The hidden column of an FTS5 table, named after the table itself."""
+
+
+@FullTextField.register_lookup
+class Match(models.Lookup):
+    lookup_name = 'match'
+    
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', [*lhs_params, *rhs_params]
+
+
+class ProductSearchIndex(models.Model):
+    """
+    Read-only view of the products_product_fts full-text index (SQLite only).
+    
+    The table and the triggers that keep it in sync are created by migrations;
+    see products/search.py.
+    """
+    
+    product = models.OneToOneField(
+        Product, primary_key=True, db_column='rowid',
+        on_delete=models.DO_NOTHING, related_name='search_index'
+    )
+    name = models.TextField()
+    sku = models.TextField()
+    description = models.TextField()
+    document = FullTextField(db_column='products_product_fts')
+    
+    class Meta:
+        managed = False
+        db_table = 'products_product_fts'
+
+
+class ProductImport(models.Model):
+    """A bulk catalog import and its progress (see products/imports.py)."""
+    
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    content_type = models.CharField(max_length=50)
+    source_path = models.CharField(max_length=500, blank=True, help_text="Uploaded file awaiting processing")
+    size_bytes = models.PositiveBigIntegerField(default=0)
+    bytes_processed = models.PositiveBigIntegerField(default=0)
+    rows_processed = models.PositiveIntegerField(default=0)
+    inserted = models.PositiveIntegerField(default=0)
+    updated = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    error_report = models.TextField(blank=True, help_text="CSV of rejected rows")
+    detail = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'id'], name='product_import_status_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Product import {self.pk} ({self.status})"
+    
+    @property
+    def progress(self):
+        """Share of the upload processed, from 0 to 100."""
+        if self.status == 'completed':
+            return 100
+        if not self.size_bytes:
+            return 0
+        return min(100, round(100 * self.bytes_processed / self.size_bytes))
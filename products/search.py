@@ -0,0 +1,157 @@
+"""
+Full-text product search for ?q=.
+
+On SQLite, name, sku and description are indexed in products_product_fts, an
+FTS5 table that reads its text from products_product (external content).
+Triggers on products_product keep the index in sync, so saves, deletes,
+bulk_create upserts and queryset updates are all covered without Python
+hooks. Matching rows are joined back through ProductSearchIndex, ranked with
+BM25 (name weighted above sku above description) and returned with
+highlighted names and description snippets. FTS5 wraps the matches in
+private-use marker characters; render_highlights() escapes the product text
+and only then turns the markers into <mark> tags, so stored HTML is never
+passed through.
+
+Every word in the query must match, as a prefix ("chi sal" finds "Salted
+Chips"). Other database backends fall back to case-insensitive containment
+without ranking or snippets.
+"""
+import re
+
+from django.db import connection
+from django.db.models import F, FloatField, Func, Q, TextField, Value
+from django.utils.html import escape
+from rest_framework.filters import BaseFilterBackend
+
+FTS_TABLE = 'products_product_fts'
+# BM25 column weights for name, sku and description.
+RANK_WEIGHTS = (10.0, 5.0, 1.0)
+# Unicode private-use characters FTS5 puts around matches, replaced after escaping.
+HIGHLIGHT_START = '\ue000'
+HIGHLIGHT_END = '\ue001'
+SNIPPET_TOKENS = 12
+
+CREATE_SEARCH_INDEX = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        name, sku, description,
+        content='products_product', content_rowid='id',
+        tokenize="unicode61 remove_diacritics 2", prefix='2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert AFTER INSERT ON products_product BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, sku, description)
+        VALUES (new.id, new.name, new.sku, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete AFTER DELETE ON products_product BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, sku, description)
+        VALUES ('delete', old.id, old.name, old.sku, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update AFTER UPDATE OF name, sku, description ON products_product BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, sku, description)
+        VALUES ('delete', old.id, old.name, old.sku, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, name, sku, description)
+        VALUES (new.id, new.name, new.sku, new.description);
+    END
+    """,
+    # Index the rows that already exist.
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+DROP_SEARCH_INDEX = [
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_insert',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_delete',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_update',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+]
+
+
+def install_search_index(apps, schema_editor):
+    """
+    Create the FTS5 table and its triggers, and index existing products.
+    
+    Migrations that rebuild products_product on SQLite drop its triggers
+    with the old table, so they must run this again afterwards.
+    """
+    if schema_editor.connection.vendor == 'sqlite':
+        for statement in CREATE_SEARCH_INDEX:
+            schema_editor.execute(statement)
+
+
+def remove_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for statement in DROP_SEARCH_INDEX:
+            schema_editor.execute(statement)
+
+
+def match_expression(query):
+    """Turn free text into an FTS5 query matching every word as a prefix."""
+    return ' '.join(f'"{word}"*' for word in re.findall(r'\w+', query))
+
+
+def render_highlights(text):
+    """Escape highlight() or snippet() output and mark the matches with <mark>."""
+    return escape(text).replace(HIGHLIGHT_START, '<mark>').replace(HIGHLIGHT_END, '</mark>')
+
+
+class BM25(Func):
+    function = 'bm25'
+    output_field = FloatField()
+
+
+class Highlight(Func):
+    function = 'highlight'
+    output_field = TextField()
+
+
+class Snippet(Func):
+    function = 'snippet'
+    output_field = TextField()
+
+
+def search_products(queryset, query):
+    """
+    Filter `queryset` to products matching `query`, best matches first.
+    
+    Annotates search_rank (lower is better), name_highlight and snippet;
+    the last two are raw text to pass through render_highlights().
+    """
+    expression = match_expression(query)
+    if not expression:
+        return queryset.none()
+    if connection.vendor != 'sqlite':
+        words = re.findall(r'\w+', query)
+        condition = Q()
+        for word in words:
+            condition &= Q(name__icontains=word) | Q(sku__icontains=word) | Q(description__icontains=word)
+        return queryset.filter(condition).annotate(
+            search_rank=Value(None, FloatField()),
+            name_highlight=F('name'),
+            snippet=Value(None, TextField()),
+        )
+    
+    document = F('search_index__document')
+    return queryset.filter(search_index__document__match=expression).annotate(
+        search_rank=BM25(document, *[Value(weight) for weight in RANK_WEIGHTS]),
+        name_highlight=Highlight(document, Value(0), Value(HIGHLIGHT_START), Value(HIGHLIGHT_END)),
+        snippet=Snippet(
+            document, Value(2), Value(HIGHLIGHT_START), Value(HIGHLIGHT_END), Value('…'), Value(SNIPPET_TOKENS)
+        ),
+    ).order_by('search_rank', 'pk')
+
+
+class FullTextSearchFilter(BaseFilterBackend):
+    """Applies search_products() when the request has ?q=."""
+    
+    search_param = 'q'
+    
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query:
+            return queryset
+        return search_products(queryset, query)
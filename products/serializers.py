@@ -1,10 +1,19 @@
+from catalog.models import Brand, Category
+from common.serializers import NamedRelationsMixin
 from rest_framework import serializers
-from .models import Product
+from rest_framework.reverse import reverse
+from .models import Product, ProductImport
+from .search import render_highlights
 
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(NamedRelationsMixin, serializers.ModelSerializer):
     """Serializer for Product model."""
     
+    named_relations = {'category': Category, 'brand': Brand}
+    
+    category = serializers.CharField(source='category.name', max_length=100)
+    brand = serializers.CharField(source='brand.name', max_length=100)
+    
     class Meta:
         model = Product
         fields = '__all__'
@@ -14,14 +23,42 @@ class ProductSerializer(serializers.ModelSerializer):
 class ProductListSerializer(serializers.ModelSerializer):
     """Lightweight serializer for product listings."""
     
+    category = serializers.CharField(source='category.name', read_only=True)
+    
     class Meta:
         model = Product
         fields = ('id', 'name', 'sku', 'price', 'status', 'category')
 
 
-class ProductCreateUpdateSerializer(serializers.ModelSerializer):
+class HighlightField(serializers.CharField):
+    """Read-only search highlight, HTML-escaped with <mark> around the matches."""
+    
+    def __init__(self, **kwargs):
+        super().__init__(read_only=True, **kwargs)
+    
+    def to_representation(self, value):
+        return render_highlights(super().to_representation(value))
+
+
+class ProductSearchSerializer(ProductListSerializer):
+    """Product listing with full-text search rank, highlighted name and snippet."""
+    
+    search_rank = serializers.FloatField(read_only=True)
+    name_highlight = HighlightField()
+    snippet = HighlightField()
+    
+    class Meta(ProductListSerializer.Meta):
+        fields = ProductListSerializer.Meta.fields + ('search_rank', 'name_highlight', 'snippet')
+
+
+class ProductCreateUpdateSerializer(NamedRelationsMixin, serializers.ModelSerializer):
     """Serializer for creating and updating products."""
     
+    named_relations = {'category': Category, 'brand': Brand}
+    
+    category = serializers.CharField(source='category.name', max_length=100)
+    brand = serializers.CharField(source='brand.name', max_length=100)
+    
     class Meta:
         model = Product
         fields = '__all__'
@@ -42,3 +79,34 @@ class ProductCreateUpdateSerializer(serializers.ModelSerializer):
         if value <= 0:
             raise serializers.ValidationError("MRP must be greater than zero.")
         return value
+
+
+class ProductImportRowSerializer(ProductCreateUpdateSerializer):
+    """
+    Validates one row of a catalog import.
+    
+    Runs the same field rules as ProductCreateUpdateSerializer, but leaves SKU
+    uniqueness to the importer, which checks a whole chunk in one query.
+    """
+    
+    class Meta(ProductCreateUpdateSerializer.Meta):
+        extra_kwargs = {'sku': {'validators': []}}
+
+
+class ProductImportSerializer(serializers.ModelSerializer):
+    """Serializer for import job status."""
+    
+    progress = serializers.IntegerField(read_only=True)
+    error_report_url = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = ProductImport
+        exclude = ('source_path', 'error_report')
+    
+    def get_error_report_url(self, obj):
+        """Link to the CSV of rejected rows, if there are any."""
+        if not obj.error_report:
+            return None
+        url = reverse('product-import-errors', args=[obj.pk])
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
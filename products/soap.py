@@ -1,6 +1,7 @@
 from django.http import HttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from lxml import etree
+from catalog.models import Brand, Category
 from products.models import Product
 
 
@@ -156,8 +157,8 @@ def handle_create_product(body):
         description=description,
         price=float(price),
         mrp=float(mrp),
-        category=category,
-        brand="Default",
+        category=Category.objects.get_or_create(name=category)[0],
+        brand=Brand.objects.get_or_create(name="Default")[0],
         weight=0
     )
     
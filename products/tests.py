@@ -1,3 +1,268 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import shutil
+import tempfile
+from decimal import Decimal
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from catalog.models import Brand, Category
+from rest_framework.test import APIClient
+from .models import Product, ProductImport
+
+
+def create_product(sku, **fields):
+    defaults = {
+        'name': sku,
+        'description': 'Test product',
+        'price': Decimal('10.00'),
+        'mrp': Decimal('12.00'),
+        'category': 'Snacks',
+        'brand': 'Acme',
+        'weight': Decimal('0.50'),
+    }
+    defaults.update(fields)
+    defaults['category'] = Category.objects.get_or_create(name=defaults['category'])[0]
+    defaults['brand'] = Brand.objects.get_or_create(name=defaults['brand'])[0]
+    return Product.objects.create(sku=sku, **defaults)
+
+
+def ndjson(rows):
+    return ''.join(json.dumps(row) + '\n' for row in rows)
+
+
+class ProductImportTests(TestCase):
+    """Streaming CSV/NDJSON catalog import keyed on sku."""
+    
+    def setUp(self):
+        self.client = APIClient()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+    
+    def post(self, body, content_type='application/x-ndjson'):
+        return self.client.generic('POST', '/api/products/import/', body, content_type=content_type)
+    
+    def test_csv_import_inserts_and_updates(self):
+        create_product('SKU-1', price=Decimal('10.00'))
+        body = (
+            'sku,name,description,price,mrp,category,brand,weight\n'
+            'sku-1,,,15.00,,,,\n'
+            'SKU-2,Chips,Salted,20.00,25.00,Snacks,Acme,0.10\n'
+        )
+        # Job insert and status; per chunk, in a savepoint, category and brand
+        # lookups, the SKU lookup and the upsert; then progress and result.
+        with self.assertNumQueries(10):
+            response = self.post(body, content_type='text/csv')
+        
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['status'], 'completed')
+        self.assertEqual((response.data['inserted'], response.data['updated'], response.data['failed']), (1, 1, 0))
+        self.assertIsNone(response.data['error_report_url'])
+        updated = Product.objects.get(sku='SKU-1')
+        self.assertEqual(updated.price, Decimal('15.00'))
+        self.assertEqual(updated.name, 'SKU-1')
+        self.assertEqual(Product.objects.get(sku='SKU-2').name, 'Chips')
+    
+    def test_rejected_rows_are_reported(self):
+        response = self.post(ndjson([
+            {'sku': 'SKU-1', 'name': 'Chips', 'description': 'Salted', 'price': '0', 'mrp': '5',
+             'category': 'Snacks', 'brand': 'Acme', 'weight': '0.1'},
+            {'sku': 'SKU-2', 'name': 'Soda'},
+            {'name': 'No SKU'},
+        ]) + '{not json\n')
+        
+        self.assertEqual(response.data['failed'], 4)
+        self.assertFalse(Product.objects.exists())
+        report = self.client.get(response.data['error_report_url'])
+        self.assertEqual(report['Content-Type'], 'text/csv')
+        rows = list(csv.DictReader(io.StringIO(report.content.decode())))
+        reported = {(row['line'], row['sku'], row['field']) for row in rows}
+        self.assertLessEqual(
+            {('1', 'SKU-1', 'price'), ('2', 'SKU-2', 'brand'), ('3', '', 'sku'), ('4', '', 'non_field_errors')},
+            reported
+        )
+    
+    def test_rejected_rows_create_no_catalog_entries(self):
+        create_product('SKU-1')
+        response = self.post(ndjson([
+            {'sku': 'NEW', 'category': 'Typo', 'brand': 'Nobody'},
+            {'sku': 'SKU-1', 'price': '11.00'},
+        ]))
+        self.assertEqual((response.data['updated'], response.data['failed']), (1, 1))
+        self.assertFalse(Category.objects.filter(name='Typo').exists())
+        self.assertFalse(Brand.objects.filter(name='Nobody').exists())
+    
+    def test_rejects_unsupported_content_type(self):
+        response = self.client.post('/api/products/import/', {'sku': 'SKU-1'}, format='json')
+        self.assertEqual(response.status_code, 415)
+    
+    def test_large_upload_is_queued(self):
+        rows = [
+            {'sku': f'SKU-{index}', 'name': 'Item', 'description': 'Bulk', 'price': '1.00', 'mrp': '2.00',
+             'category': 'Snacks', 'brand': 'Acme', 'weight': '1'}
+            for index in range(30)
+        ]
+        with override_settings(PRODUCT_IMPORTS={'INLINE_MAX_BYTES': 100, 'DIRECTORY': self.directory}):
+            response = self.post(ndjson(rows))
+            self.assertEqual(response.status_code, 202)
+            self.assertEqual(response.data['status'], 'pending')
+            self.assertFalse(Product.objects.exists())
+            
+            call_command('run_product_imports', stdout=io.StringIO())
+        
+        job = ProductImport.objects.get(pk=response.data['id'])
+        self.assertEqual((job.status, job.inserted, job.progress, job.source_path), ('completed', 30, 100, ''))
+        self.assertEqual(job.bytes_processed, job.size_bytes)
+        self.assertEqual(Product.objects.count(), 30)
+        status = self.client.get(response['Location'])
+        self.assertEqual(status.data['status'], 'completed')
+
+
+class CatalogRelationTests(TestCase):
+    """Category and brand are catalog rows but are still read and written by name."""
+    
+    def setUp(self):
+        self.client = APIClient()
+        self.chips = create_product('SKU-CHIPS', category='Snacks', brand='Acme')
+    
+    def test_create_by_name(self):
+        response = self.client.post('/api/products/', {
+            'name': 'Cola', 'sku': 'sku-cola', 'description': 'Fizzy', 'price': '40.00', 'mrp': '45.00',
+            'category': 'Drinks', 'brand': 'Acme', 'weight': '0.3',
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data['category'], response.data['brand']), ('Drinks', 'Acme'))
+        cola = Product.objects.get(sku='SKU-COLA')
+        self.assertEqual((cola.category.name, cola.brand_id), ('Drinks', self.chips.brand_id))
+    
+    def test_filters_and_listing_follow_renames(self):
+        create_product('SKU-COLA', category='Drinks')
+        response = self.client.get('/api/products/', {'category': 'Snacks'})
+        self.assertEqual([product['sku'] for product in response.data['results']], ['SKU-CHIPS'])
+        by_id = self.client.get('/api/products/', {'category_id': self.chips.category_id})
+        self.assertEqual(by_id.data['count'], 1)
+        
+        Category.objects.filter(pk=self.chips.category_id).update(name='Crisps', updated_at=timezone.now())
+        renamed = self.client.get('/api/products/', {'category': 'Crisps'})
+        self.assertEqual(renamed.data['results'][0]['category'], 'Crisps')
+        unfiltered = self.client.get('/api/products/')
+        self.client.patch(f'/api/categories/{self.chips.category_id}/', {'name': 'Chips'}, format='json')
+        self.assertEqual(self.client.get('/api/products/', HTTP_IF_NONE_MATCH=unfiltered['ETag']).status_code, 200)
+    
+    def test_import_by_name(self):
+        self.client.generic('POST', '/api/products/import/', ndjson([
+            {'sku': 'SKU-CHIPS', 'category': 'Crisps'},
+            {'sku': 'SKU-SODA', 'name': 'Soda', 'description': 'Fizzy', 'price': '1', 'mrp': '2',
+             'category': 'Drinks', 'brand': 'Fizz', 'weight': '1'},
+        ]), content_type='application/x-ndjson')
+        self.assertEqual(
+            set(Product.objects.values_list('sku', 'category__name', 'brand__name')),
+            {('SKU-CHIPS', 'Crisps', 'Acme'), ('SKU-SODA', 'Drinks', 'Fizz')}
+        )
+
+
+@override_settings(PRODUCT_FACETS={'TTL': 30, 'CACHE': 'default'})
+class ProductFacetTests(TestCase):
+    """Grouped per-category, per-brand and per-status counts."""
+    
+    def setUp(self):
+        self.client = APIClient()
+        cache.clear()
+        create_product('SKU-1', name='Salted Chips', category='Snacks', brand='Acme')
+        create_product('SKU-2', name='Masala Chips', category='Snacks', brand='Crunch', status='inactive')
+        create_product('SKU-3', name='Cola', category='Drinks', brand='Acme')
+    
+    def facets(self, **params):
+        return self.client.get('/api/products/facets/', params).data
+    
+    def test_counts_every_facet_in_two_queries(self):
+        # The grouped count, then the category and brand names.
+        with self.assertNumQueries(2):
+            data = self.facets()
+        self.assertEqual(data['count'], 3)
+        self.assertEqual(data['facets']['category'], [{'value': 'Snacks', 'count': 2}, {'value': 'Drinks', 'count': 1}])
+        self.assertEqual(data['facets']['brand'], [{'value': 'Acme', 'count': 2}, {'value': 'Crunch', 'count': 1}])
+        self.assertEqual(data['facets']['status'], [{'value': 'active', 'count': 2}, {'value': 'inactive', 'count': 1}])
+    
+    def test_applies_filters_and_search(self):
+        self.assertEqual(self.facets(brand='Acme')['facets']['category'], [
+            {'value': 'Drinks', 'count': 1}, {'value': 'Snacks', 'count': 1},
+        ])
+        data = self.facets(q='chips', status='active')
+        self.assertEqual((data['count'], data['facets']['brand']), (1, [{'value': 'Acme', 'count': 1}]))
+    
+    def test_cached_per_filter_set(self):
+        self.facets(status='active')
+        create_product('SKU-4', category='Snacks')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.facets(status='active', page=2)['count'], 2)
+        self.assertEqual(self.facets(category='Snacks')['count'], 3)
+
+
+class ProductSearchTests(TestCase):
+    """Full-text ?q= search over the FTS5 index."""
+    
+    def setUp(self):
+        self.client = APIClient()
+        self.chips = create_product('SKU-CHIPS', name='Salted Potato Chips', description='Crunchy and light.')
+        self.dip = create_product('SKU-DIP', name='Onion Dip', description='Goes well with potato chips.')
+    
+    def search(self, query, **params):
+        return self.client.get('/api/products/', {'q': query, **params})
+    
+    def skus(self, query, **params):
+        return [product['sku'] for product in self.search(query, **params).data['results']]
+    
+    def test_ranks_name_matches_first_with_highlights(self):
+        response = self.search('potato chip')
+        self.assertEqual(response.status_code, 200)
+        first, second = response.data['results']
+        self.assertEqual((first['sku'], second['sku']), ('SKU-CHIPS', 'SKU-DIP'))
+        self.assertLess(first['search_rank'], second['search_rank'])
+        self.assertEqual(first['name_highlight'], 'Salted <mark>Potato</mark> <mark>Chips</mark>')
+        self.assertIn('<mark>potato</mark> <mark>chips</mark>', second['snippet'])
+    
+    def test_highlights_escape_product_text(self):
+        create_product('SKU-XSS', name='<img src=x onerror=alert(1)> Nachos', description='<b>Nachos</b> & dip')
+        result, = self.search('nachos').data['results']
+        self.assertEqual(result['name_highlight'], '&lt;img src=x onerror=alert(1)&gt; <mark>Nachos</mark>')
+        self.assertEqual(result['snippet'], '&lt;b&gt;<mark>Nachos</mark>&lt;/b&gt; &amp; dip')
+    
+    def test_unchanged_listing_is_not_modified(self):
+        response = self.client.get('/api/products/active/')
+        # Count and latest product, latest category and latest brand.
+        with self.assertNumQueries(4):
+            again = self.client.get('/api/products/active/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(again.status_code, 304)
+        
+        listing = self.client.get('/api/products/')
+        self.assertNotEqual(listing['ETag'], response['ETag'])
+        self.client.post(f'/api/products/{self.dip.pk}/deactivate/')
+        self.assertEqual(self.client.get('/api/products/', HTTP_IF_NONE_MATCH=listing['ETag']).status_code, 200)
+    
+    def test_combines_with_filters(self):
+        self.dip.status = 'inactive'
+        self.dip.save()
+        self.assertEqual(self.skus('chips', status='active'), ['SKU-CHIPS'])
+        self.assertEqual(self.skus('"; DROP'), [])
+    
+    def test_index_follows_saves_updates_and_deletes(self):
+        self.chips.name = 'Masala Crisps'
+        self.chips.save()
+        self.assertEqual(self.skus('masala'), ['SKU-CHIPS'])
+        Product.objects.filter(pk=self.dip.pk).update(name='Cheese Dip', description='Creamy.')
+        self.assertEqual(self.skus('chee'), ['SKU-DIP'])
+        self.assertEqual(self.skus('onion'), [])
+        self.chips.delete()
+        self.assertEqual(self.skus('masala'), [])
+    
+    def test_index_follows_bulk_import(self):
+        self.client.generic(
+            'POST', '/api/products/import/', ndjson([{'sku': 'SKU-DIP', 'name': 'Tangy Salsa'}]),
+            content_type='application/x-ndjson'
+        )
+        self.assertEqual(self.skus('salsa'), ['SKU-DIP'])
+        self.assertEqual(self.skus('onion'), [])
@@ -1,9 +1,10 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ProductViewSet
+from .views import ProductImportViewSet, ProductViewSet
 
 router = DefaultRouter()
 router.register(r'products', ProductViewSet, basename='product')
+router.register(r'product-imports', ProductImportViewSet, basename='product-import')
 
 urlpatterns = [
     path('', include(router.urls)),
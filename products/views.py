@@ -1,40 +1,57 @@
+from django.http import HttpResponse
 from rest_framework import viewsets, filters, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.reverse import reverse
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import Product
+from catalog.conditional import ConditionalListMixin
+from catalog.models import Brand, Category
+from .facets import cached_facet_counts
+from .filters import ProductFilter
+from .imports import IMPORT_CONTENT_TYPES, start_import
+from .models import Product, ProductImport
+from .search import FullTextSearchFilter
 from .serializers import (
     ProductSerializer, 
     ProductListSerializer, 
-    ProductCreateUpdateSerializer
+    ProductSearchSerializer,
+    ProductCreateUpdateSerializer,
+    ProductImportSerializer
 )
 
 
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(ConditionalListMixin, viewsets.ModelViewSet):
     """
     ViewSet for Product CRUD operations.
     
     Endpoints:
     - GET /api/products/ - List all products
+    - GET /api/products/?q= - Full-text search, best matches first
     - POST /api/products/ - Create a new product
     - GET /api/products/{id}/ - Retrieve a product
     - PUT /api/products/{id}/ - Update a product
     - PATCH /api/products/{id}/ - Partial update a product
     - DELETE /api/products/{id}/ - Delete a product
     - GET /api/products/active/ - List active products
+    - GET /api/products/facets/ - Product counts per category, brand and status
     - POST /api/products/{id}/deactivate/ - Deactivate a product
+    - POST /api/products/import/ - Import products from CSV or NDJSON
     """
     
-    queryset = Product.objects.all()
+    queryset = Product.objects.select_related('category', 'brand')
     serializer_class = ProductSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['status', 'category', 'brand']
+    filter_backends = [DjangoFilterBackend, filters.SearchFilter, FullTextSearchFilter, filters.OrderingFilter]
+    filterset_class = ProductFilter
+    # Listings show category and brand names, so renaming one changes them too.
+    conditional_dependencies = [Category, Brand]
     search_fields = ['name', 'sku', 'description']
     ordering_fields = ['created_at', 'price', 'name']
     
     def get_serializer_class(self):
         """Return appropriate serializer based on action."""
         if self.action == 'list':
+            if self.request.query_params.get('q', '').strip():
+                return ProductSearchSerializer
             return ProductListSerializer
         elif self.action in ['create', 'update', 'partial_update']:
             return ProductCreateUpdateSerializer
@@ -44,8 +61,20 @@ class ProductViewSet(viewsets.ModelViewSet):
     def active(self, request):
         """Get all active products."""
         active_products = self.queryset.filter(status='active')
-        serializer = ProductListSerializer(active_products, many=True)
-        return Response(serializer.data)
+        return self.conditional_list(
+            request, active_products, lambda: Response(ProductListSerializer(active_products, many=True).data)
+        )
+    
+    @action(detail=False, methods=['get'])
+    def facets(self, request):
+        """
+        Count products per category, brand and status.
+        
+        Accepts the list filters, ?search= and ?q=. Counts come from one
+        grouped query and are cached briefly per filter set.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        return Response(cached_facet_counts(queryset, request.query_params))
     
     @action(detail=True, methods=['post'])
     def deactivate(self, request, pk=None):
@@ -54,3 +83,52 @@ class ProductViewSet(viewsets.ModelViewSet):
         product.status = 'inactive'
         product.save()
         return Response({'status': 'product deactivated'}, status=status.HTTP_200_OK)
+    
+    @action(detail=False, methods=['post'], url_path='import', url_name='import')
+    def import_products(self, request):
+        """
+        Upsert products keyed on sku from a CSV or NDJSON upload.
+        
+        The body is streamed as CSV (text/csv, with a header row) or NDJSON
+        (application/x-ndjson). Small uploads are imported before responding
+        (201); larger ones are queued for run_product_imports (202). Both
+        return the import job.
+        """
+        content_type = request.content_type.split(';')[0].strip()
+        if content_type not in IMPORT_CONTENT_TYPES:
+            return Response(
+                {'detail': f"Content type must be one of: {', '.join(IMPORT_CONTENT_TYPES)}"},
+                status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+            )
+        stream = request.stream if request.stream is not None else []
+        size = int(request.META.get('CONTENT_LENGTH') or 0)
+        job = start_import(stream, content_type, size, request.encoding or 'utf-8')
+        return Response(
+            ProductImportSerializer(job, context={'request': request}).data,
+            status=status.HTTP_202_ACCEPTED if job.status == 'pending' else status.HTTP_201_CREATED,
+            headers={'Location': reverse('product-import-detail', args=[job.pk], request=request)}
+        )
+
+
+class ProductImportViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    ViewSet for tracking product imports.
+    
+    Endpoints:
+    - GET /api/product-imports/ - List imports
+    - GET /api/product-imports/{id}/ - Import status and progress
+    - GET /api/product-imports/{id}/errors/ - Download rejected rows as CSV
+    """
+    
+    queryset = ProductImport.objects.all()
+    serializer_class = ProductImportSerializer
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['status']
+    
+    @action(detail=True, methods=['get'])
+    def errors(self, request, pk=None):
+        """Download the rejected rows with their line numbers and messages."""
+        job = self.get_object()
+        response = HttpResponse(job.error_report, content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="product-import-{job.pk}-errors.csv"'
+        return response